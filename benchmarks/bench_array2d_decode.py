@@ -0,0 +1,73 @@
+"""
+对比 Array2D 两种解码方式的耗时：
+
+- 旧方式：生成二维字符串数组，再用 ``astype`` 转换数值列
+- 新方式：按列解码为类型化数组
+
+运行方式::
+
+    python benchmarks/bench_array2d_decode.py --rows 200000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from nuwe_cmadaas.music import Array2D
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+
+
+ELEMENT_NAMES = (
+    "Station_Id_d,Lat,Lon,Alti,Year,Mon,Day,Hour,PRS_Sea,TEM,DPT,WIN_D_INST,WIN_S_INST,PRE_1h,PRE_6h,PRE_24h,PRS"
+).split(",")
+
+
+def _create_content(row_count: int) -> bytes:
+    ret = pb.RetArray2D()
+    ret.elementNames.extend(ELEMENT_NAMES)
+    values = []
+    for i in range(row_count):
+        values.append(f"{50000 + i % 10000}")
+        values.extend(["39.8", "116.4", "50.1", "2024", "1", "1", f"{i % 24}"])
+        values.extend([f"{(i % 300) / 10}"] * 9)
+    ret.data.extend(values)
+    ret.request.rowCount = row_count
+    ret.request.colCount = len(ELEMENT_NAMES)
+    return ret.SerializeToString()
+
+
+def _decode_legacy(content: bytes) -> pd.DataFrame:
+    ret = pb.RetArray2D()
+    ret.ParseFromString(content)
+    data = np.array(ret.data).reshape([ret.request.rowCount, ret.request.colCount])
+    df = pd.DataFrame(data, columns=list(ret.elementNames))
+    df[ELEMENT_NAMES[1:]] = df[ELEMENT_NAMES[1:]].astype(float)
+    return df
+
+
+def _decode_columnar(content: bytes) -> pd.DataFrame:
+    return Array2D.create_from_protobuf(content).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = _create_content(args.rows)
+    print(f"{args.rows} rows, {len(ELEMENT_NAMES)} columns, {len(content) / 1024 / 1024:.1f} MB")
+
+    for name, decode in (("legacy", _decode_legacy), ("columnar", _decode_columnar)):
+        times = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            df = decode(content)
+            times.append(time.perf_counter() - start_time)
+        memory = df.memory_usage(deep=True).sum() / 1024 / 1024
+        print(f"{name:>10}: {min(times):.3f}s, DataFrame {memory:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
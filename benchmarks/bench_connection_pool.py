@@ -0,0 +1,90 @@
+"""
+对比每次新建连接与复用连接池两种方式访问本地模拟 MUSIC 服务的单次请求耗时。
+
+本地回环网络的握手开销很小，访问远程 MUSIC 服务时节省的时间随网络往返时延增加。
+
+运行方式::
+
+    python benchmarks/bench_connection_pool.py --count 500
+"""
+import argparse
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from nuwe_cmadaas.music import CMADaaSClient
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+
+
+def _create_content() -> bytes:
+    ret = pb.RetArray2D()
+    ret.elementNames.extend(["Station_Id_d", "Lat", "Lon", "TEM"])
+    for i in range(100):
+        ret.data.extend([f"{54000 + i}", "39.8", "116.4", "12.5"])
+    ret.request.rowCount = 100
+    ret.request.colCount = 4
+    return ret.SerializeToString()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    content = _create_content()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _run(name: str, fetch, count: int) -> float:
+    fetch()
+    start = time.perf_counter()
+    for _ in range(count):
+        fetch()
+    per_request = (time.perf_counter() - start) / count * 1000
+    print(f"{name:<24} {per_request:8.3f} ms/request")
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    def create_client(keep_alive: bool) -> CMADaaSClient:
+        return CMADaaSClient(
+            server_ip=host, server_port=port, server_id="bench",
+            connection_timeout=3, read_timeout=30,
+            user="user", password="password",
+            keep_alive=keep_alive,
+        )
+
+    url = f"http://{host}:{port}/music-ws/api"
+    params = {"dataCode": "SURF_CHN_MUL_HOR"}
+    pooled_client = create_client(keep_alive=True)
+    closed_client = create_client(keep_alive=False)
+
+    baseline = _run("requests.get", lambda: requests.get(url, timeout=(3, 30)).content, args.count)
+    _run("session, no keep-alive", lambda: closed_client.callAPI_to_array2D("getSurfEle", params), args.count)
+    pooled = _run("session, keep-alive", lambda: pooled_client.callAPI_to_array2D("getSurfEle", params), args.count)
+    print(f"saved per request: {baseline - pooled:.3f} ms")
+
+    pooled_client.close()
+    closed_client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+对比格点数据两种解码方式的耗时：
+
+- 旧方式：protobuf 完整解析后使用 ``np.array`` 转换 ``repeated float`` 字段
+- 新方式：直接从 packed float32 字节读取数组
+
+默认使用 0.125° 全球格点 (1441 x 2880)。
+
+旧方式的耗时与 protobuf 的实现有关：upb 实现 (protobuf>=4.21) 的数组字段支持 buffer 协议，耗时与新方式接近；
+纯 Python 实现逐个元素转换，耗时为秒级。可以设置环境变量 ``PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python`` 对比。
+
+运行方式::
+
+    python benchmarks/bench_grid_decode.py --lat-count 1441 --lon-count 2880
+"""
+import argparse
+import time
+
+import numpy as np
+
+from nuwe_cmadaas.music import GridArray2D
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+
+
+def _create_content(lat_count: int, lon_count: int) -> bytes:
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = lat_count
+    ret.request.colCount = lon_count
+    ret.startLat = -90
+    ret.endLat = 90
+    ret.startLon = 0
+    ret.endLon = 360 - 360 / lon_count
+    ret.latCount = lat_count
+    ret.lonCount = lon_count
+    ret.lats.extend(np.linspace(-90, 90, lat_count).tolist())
+    ret.lons.extend(np.linspace(0, 360, lon_count, endpoint=False).tolist())
+    ret.data.extend(np.random.rand(lat_count * lon_count).astype(np.float32).tolist())
+    return ret.SerializeToString()
+
+
+def _decode_legacy(content: bytes) -> np.ndarray:
+    ret = pb.RetGridArray2D()
+    ret.ParseFromString(content)
+    lats = np.array(ret.lats)
+    lons = np.array(ret.lons)
+    return np.array(ret.data).reshape([ret.request.rowCount, ret.request.colCount])
+
+
+def _decode_packed(content: bytes) -> np.ndarray:
+    return GridArray2D.create_from_protobuf(content).data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lat-count", type=int, default=1441)
+    parser.add_argument("--lon-count", type=int, default=2880)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = _create_content(args.lat_count, args.lon_count)
+    print(f"{args.lat_count} x {args.lon_count}, {len(content) / 1024 / 1024:.1f} MB")
+
+    for name, decode in (("legacy", _decode_legacy), ("packed", _decode_packed)):
+        times = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            data = decode(content)
+            times.append(time.perf_counter() - start_time)
+        print(f"{name:>8}: {min(times):.3f}s, {data.dtype}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+统计导入 nuwe_cmadaas 的耗时。
+
+每条导入语句在新的 Python 进程中使用 ``python -X importtime`` 运行多次，取最短耗时，
+并列出自身耗时最长的模块，以及是否导入了 pandas、xarray 等耗时较长的库。
+
+运行方式::
+
+    python benchmarks/bench_import_time.py --repeat 5 --top 5
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+STATEMENTS = [
+    "import nuwe_cmadaas",
+    "from nuwe_cmadaas import CMADaaSClient",
+    "from nuwe_cmadaas.obs import retrieve_obs_station",
+    "from nuwe_cmadaas.model import retrieve_model_grid",
+]
+
+HEAVY_MODULES = ["numpy", "pandas", "xarray", "requests", "google.protobuf"]
+
+
+def _run_importtime(statement: str) -> List[Tuple[str, int, int]]:
+    """
+    返回 (模块名, 自身耗时, 累计耗时) 列表，单位微秒
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        records.append((name.rstrip(), int(self_time), int(cumulative_time)))
+    return records
+
+
+def _get_total_time(records: List[Tuple[str, int, int]]) -> int:
+    # 顶层导入的模块名前只有一个空格，其累计耗时之和为总耗时
+    return sum(cumulative for name, _, cumulative in records if not name.startswith("  "))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        runs = [_run_importtime(statement) for _ in range(args.repeat)]
+        best = min(runs, key=_get_total_time)
+
+        imported: Dict[str, bool] = {
+            module: any(name.strip() == module for name, _, _ in best) for module in HEAVY_MODULES
+        }
+        print(f"{statement}: {_get_total_time(best) / 1000:.1f} ms")
+        print("    heavy modules: " + ", ".join(f"{m}={'yes' if v else 'no'}" for m, v in imported.items()))
+        for name, self_time, _ in sorted(best, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"    {self_time / 1000:8.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,25 @@
-from .music import (
-    Array2D,
-    GridArray2D,
-    FilesInfo,
-    FileInfo,
-    GridScalar2D,
-    GridVector2D,
-    DataBlock,
-    CMADaaSClient
-)
+from ._lazy import attach
 
-from .config import CMADaasConfig
-
-from .obs import (
-    retrieve_obs_station
-)
-from .model import (
-    retrieve_model_point,
-    retrieve_model_grid,
-)
+# 子模块在第一次访问时导入，参见 nuwe_cmadaas._lazy
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "Array2D": ".music",
+    "GridArray2D": ".music",
+    "FilesInfo": ".music",
+    "FileInfo": ".music",
+    "GridScalar2D": ".music",
+    "GridVector2D": ".music",
+    "DataBlock": ".music",
+    "CMADaaSClient": ".music",
+    "AsyncCMADaaSClient": ".music",
+    "RetryPolicy": ".music",
+    "RetryStats": ".music",
+    "CMADaasConfig": ".config",
+    "retrieve_obs_station": ".obs",
+    "retrieve_obs_station_async": ".obs",
+    "retrieve_model_point": ".model",
+    "retrieve_model_grid": ".model",
+    "retrieve_model_grid_async": ".model",
+})
 
 from importlib.metadata import version, PackageNotFoundError
 
@@ -0,0 +1,43 @@
+"""
+包的延迟导入。
+
+包的 ``__init__.py`` 中不直接导入子模块，而是通过模块 ``__getattr__`` (PEP 562) 在第一次访问属性时导入，
+因此 ``import nuwe_cmadaas`` 不会导入 pandas、xarray 等耗时较长的库。
+"""
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def attach(package_name: str, attributes: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """
+    生成包的 ``__getattr__``、``__dir__`` 和 ``__all__``
+
+    Parameters
+    ----------
+    package_name
+        包名，即 ``__name__``
+    attributes
+        属性名到子模块的映射，子模块名相对于 ``package_name``，例如 ``{"CMADaaSClient": ".music"}``
+
+    Returns
+    -------
+    Tuple
+        ``__getattr__``、``__dir__`` 和 ``__all__``
+
+    Examples
+    --------
+    >>> __getattr__, __dir__, __all__ = attach(__name__, {"CMADaaSClient": ".client"})
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        module = importlib.import_module(attributes[name], package_name)
+        value = getattr(module, name)
+        # 写入包的命名空间，之后的访问不再调用 __getattr__
+        setattr(importlib.import_module(package_name), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package_name))) | set(attributes))
+
+    return __getattr__, __dir__, list(attributes)
@@ -1,5 +1,5 @@
 import os
-from typing import Optional, Dict, Union, TypedDict
+from typing import Optional, Dict, Union, List, TypedDict, NotRequired
 from pathlib import Path
 
 import yaml
@@ -19,6 +19,21 @@ class ServerItem(TypedDict):
     music_connTimeout: int
     music_readTimeout: int
     music_ServiceId: int
+    music_poolSize: NotRequired[int]
+    music_keepAlive: NotRequired[bool]
+    music_maxAttempts: NotRequired[int]
+    music_retryBackoff: NotRequired[float]
+    music_rateLimit: NotRequired[float]
+    music_rateBurst: NotRequired[int]
+    music_maxConcurrency: NotRequired[int]
+    music_servers: NotRequired[List[str]]
+    music_loadBalance: NotRequired[str]
+    music_ejectTime: NotRequired[float]
+    music_slowThreshold: NotRequired[float]
+    music_cacheDir: NotRequired[str]
+    music_cacheMaxSize: NotRequired[float]
+    music_cacheTTL: NotRequired[Union[float, Dict[str, float]]]
+    music_resultCacheSize: NotRequired[float]
 
 
 class CMADaasConfig(TypedDict):
@@ -1,3 +1,11 @@
-from .grid import retrieve_model_grid
-from .point import retrieve_model_point
-from .file import download_model_file
+from nuwe_cmadaas._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "retrieve_model_grid": ".grid",
+    "retrieve_model_grid_async": ".grid",
+    "retrieve_model_grid_cube": ".grid",
+    "retrieve_model_grid_cube_async": ".grid",
+    "retrieve_model_point": ".point",
+    "download_model_file": ".file",
+    "download_model_file_async": ".file",
+})
@@ -1,4 +1,4 @@
-from typing import Union, Optional, Dict, List, TypedDict
+from typing import Union, Optional, Dict, List, Tuple, TypedDict
 from pathlib import Path
 
 import pandas as pd
@@ -8,7 +8,14 @@ from nuwe_cmadaas.util import (
     get_time_range_string,
     get_region_params,
 )
-from nuwe_cmadaas.music import MusicError, FileInfo, get_or_create_client, CMADaaSClient
+from nuwe_cmadaas.music import (
+    MusicError,
+    FilesInfo,
+    CMADaaSClient,
+    AsyncCMADaaSClient,
+    get_or_create_client,
+    get_or_create_async_client,
+)
 from nuwe_cmadaas.config import CMADaasConfig
 from nuwe_cmadaas._log import logger
 
@@ -32,9 +39,83 @@ def download_model_file(
         region: Dict = None,
         data_type: str = None,
         output_dir: Union[Path, str] = None,
+        max_workers: Optional[int] = None,
+        resume: bool = False,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
 ) -> Union[List[Path], MusicError]:
+    if output_dir is None:
+        output_dir = "./"
+
+    interface_id, params = _get_file_request(
+        data_code=data_code,
+        parameter=parameter,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        level_type=level_type,
+        level=level,
+        region=region,
+        data_type=data_type,
+    )
+
+    cmadaas_client = get_or_create_client(config, client)
+    result = cmadaas_client.callAPI_to_downFile(
+        interface_id, params, file_dir=output_dir, max_workers=max_workers, resume=resume
+    )
+    return _get_file_result(result, output_dir)
+
+
+async def download_model_file_async(
+        data_code: str,
+        parameter: Union[str, List[str]] = None,
+        start_time: Union[pd.Interval, pd.Timestamp, List, pd.Timedelta] = None,
+        forecast_time: Union[str, pd.Timedelta] = None,
+        level_type: Union[str, int] = None,
+        level: Union[int, float] = None,
+        region: Dict = None,
+        data_type: str = None,
+        output_dir: Union[Path, str] = None,
+        max_workers: Optional[int] = None,
+        resume: bool = False,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+) -> Union[List[Path], MusicError]:
+    """
+    ``download_model_file`` 的异步版本，使用 ``AsyncCMADaaSClient`` 下载数值模式文件。
+
+    参数和返回值与 ``download_model_file`` 相同。
+    """
+    if output_dir is None:
+        output_dir = "./"
+
+    interface_id, params = _get_file_request(
+        data_code=data_code,
+        parameter=parameter,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        level_type=level_type,
+        level=level,
+        region=region,
+        data_type=data_type,
+    )
+
+    async with get_or_create_async_client(config, client) as cmadaas_client:
+        result = await cmadaas_client.callAPI_to_downFile(
+            interface_id, params, file_dir=output_dir, max_workers=max_workers, resume=resume
+        )
+    return _get_file_result(result, output_dir)
+
+
+def _get_file_request(
+        data_code: str,
+        parameter: Union[str, List[str]],
+        start_time: Union[pd.Interval, pd.Timestamp, List, pd.Timedelta],
+        forecast_time: Union[str, pd.Timedelta],
+        level_type: Union[str, int],
+        level: Union[int, float],
+        region: Dict,
+        data_type: str,
+) -> Tuple[str, Dict]:
     interface_config = InterfaceConfig(
         name="getNafpFile",
         element=None,
@@ -44,9 +125,6 @@ def download_model_file(
         valid_time=None,
     )
 
-    if output_dir is None:
-        output_dir = "./"
-
     if data_type is None:
         data_type = "forecast"
     # data_type_mapper = {
@@ -98,19 +176,29 @@ def download_model_file(
 
     interface_id = _get_interface_id(interface_config)
     logger.info(f"interface_id: {interface_id}")
+    return interface_id, params
 
-    cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_downFile(interface_id, params, file_dir=output_dir)
 
-    if result.request.error_code != 0:
+def _get_file_result(result: FilesInfo, output_dir: Union[str, Path]) -> Union[List[Path], MusicError]:
+    files_info = result.files_info
+    failed_files = [f for f in files_info if f.download_error is not None]
+    if result.request.error_code != 0 and len(failed_files) in (0, len(files_info)):
+        # 检索出错或全部文件下载失败
         logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
         music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
         return music_error
 
-    files_info = result.files_info
+    if len(failed_files) > 0:
+        # 部分文件下载失败时返回下载成功的文件，每个文件的错误信息保存在 FileInfo.download_error 中
+        logger.warning(
+            f"{len(failed_files)}/{len(files_info)} files failed to download: "
+            f"{', '.join(f.file_name for f in failed_files)}"
+        )
+
     file_list = []
     for f in files_info:
-        file_list.append(Path(output_dir, f.file_name))
+        if f.download_error is None:
+            file_list.append(Path(output_dir, f.file_name))
 
     return file_list
 
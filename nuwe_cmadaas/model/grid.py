@@ -1,12 +1,26 @@
-from typing import Union, Optional, Dict, Literal, TypedDict
+import functools
+import itertools
+from typing import Union, Optional, Dict, Literal, TypedDict, Tuple, List, Sequence, Any
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import xarray as xr
+from numpy.typing import DTypeLike
 
 from nuwe_cmadaas.util import get_time_string, get_region_params
-from nuwe_cmadaas.music import MusicError, get_or_create_client, CMADaaSClient
+from nuwe_cmadaas.music import (
+    MusicError,
+    GridArray2D,
+    CMADaaSClient,
+    AsyncCMADaaSClient,
+    get_or_create_client,
+    get_or_create_async_client,
+)
+from nuwe_cmadaas.music.batch import iter_concurrently, iter_concurrently_async
+from nuwe_cmadaas.music.result_cache import get_result_cache_key, get_cached_result, get_cached_result_async
 from nuwe_cmadaas.config import CMADaasConfig
+from nuwe_cmadaas.dataset import load_dataset_config
 from nuwe_cmadaas._log import logger
 
 
@@ -27,8 +41,11 @@ def retrieve_model_grid(
         level_type: Optional[Union[str, int]] = None,
         level: Optional[Union[int, float]] = None,
         region: Optional[Dict] = None,
-        number: Optional[int] = None,
+        number: Optional[Union[int, Sequence[int]]] = None,
         data_type: Optional[Literal["analysis", "forecast"]] = None,
+        dtype: Optional[DTypeLike] = None,
+        use_cache: bool = True,
+        max_workers: Optional[int] = None,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
 ) -> Union[xr.DataArray, MusicError]:
@@ -52,9 +69,23 @@ def retrieve_model_grid(
     region
         区域
     number
-        集合预报成员编号
+        集合预报成员编号，或成员编号列表、``range``。
+
+        数据集配置文件 (``nuwe_cmadaas/data/datasets/model.yaml``) 中配置了 ``ensemble`` 的集合预报资料，
+        控制预报和扰动成员使用不同的资料代码，根据成员编号自动选择，``data_code`` 可以使用其中任意一个。
+
+        设为列表时并发检索所有成员，返回增加 ``member`` 维度的要素场，所有成员写入一次分配的数组，
+        成员顺序与 ``number`` 一致。注意维度名为 ``member``，而 ``retrieve_model_grid_cube`` 的成员维度名为 ``number``。
     data_type
         数据类型，预报场 (`forecast`) 或者分析场 (`analysis`)
+    dtype
+        要素场的数据类型，`float64` 或 `float32`，默认使用客户端的 ``dtype`` 设置 (默认为 `float64`)。
+        设为 `float32` 时要素值和经纬度坐标均为 float32，内存占用减半。
+    use_cache
+        是否使用客户端的检索结果内存缓存 (``result_cache_size``)，默认使用。
+        缓存中的要素场为只读，需要修改时先调用 ``copy()``。``number`` 为列表时不使用缓存。
+    max_workers
+        ``number`` 为列表时的最大并发请求数，默认为 8
     config
         配置，配置对象或配置文件路径。默认自动查找配置文件
     client
@@ -64,7 +95,373 @@ def retrieve_model_grid(
     -------
     Union[xr.DataArray, MusicError]
         检索成功返回 ``xarray.DataArray`` 格式的要素场，检索失败返回包含错误信息的 ``MusicError`` 对象。
+
+    Examples
+    --------
+    获取 CMA-REPS 控制预报和 30 个扰动成员，维度为 ``(member, latitude, longitude)``
+
+    >>> retrieve_model_grid(
+    ...     "NAFP_GRAPESREPS_FOR_FTM_CHN",
+    ...     parameter="TEM",
+    ...     start_time=pd.Timestamp("2024-01-01 00:00"),
+    ...     forecast_time="24h",
+    ...     level_type=100,
+    ...     level=850,
+    ...     number=range(0, 31),
+    ... )
+    """
+    if _is_sequence(number):
+        field = retrieve_model_grid_cube(
+            data_code,
+            parameter=parameter,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            level_type=level_type,
+            level=level,
+            region=region,
+            number=number,
+            data_type=data_type,
+            dtype=dtype,
+            max_workers=max_workers,
+            config=config,
+            client=client,
+        )
+        return _get_member_result(field)
+
+    interface_id, params = _get_grid_request(
+        data_code=data_code,
+        parameter=parameter,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        level_type=level_type,
+        level=level,
+        region=region,
+        number=number,
+        data_type=data_type,
+    )
+
+    cmadaas_client = get_or_create_client(config, client)
+    return get_cached_result(
+        cmadaas_client.get_result_cache(use_cache),
+        _get_result_cache_key(cmadaas_client, interface_id, params, dtype),
+        lambda: _get_grid_result(cmadaas_client.callAPI_to_gridArray2D(interface_id, params, dtype=dtype)),
+    )
+
+
+async def retrieve_model_grid_async(
+        data_code: str,
+        parameter: str,
+        start_time: Optional[pd.Timestamp] = None,
+        forecast_time: Optional[Union[str, pd.Timedelta]] = None,
+        level_type: Optional[Union[str, int]] = None,
+        level: Optional[Union[int, float]] = None,
+        region: Optional[Dict] = None,
+        number: Optional[Union[int, Sequence[int]]] = None,
+        data_type: Optional[Literal["analysis", "forecast"]] = None,
+        dtype: Optional[DTypeLike] = None,
+        use_cache: bool = True,
+        max_workers: Optional[int] = None,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+) -> Union[xr.DataArray, MusicError]:
+    """
+    ``retrieve_model_grid`` 的异步版本，使用 ``AsyncCMADaaSClient`` 获取数值模式的二维网格数据。
+
+    参数和返回值与 ``retrieve_model_grid`` 相同。
+    """
+    if _is_sequence(number):
+        field = await retrieve_model_grid_cube_async(
+            data_code,
+            parameter=parameter,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            level_type=level_type,
+            level=level,
+            region=region,
+            number=number,
+            data_type=data_type,
+            dtype=dtype,
+            max_workers=max_workers,
+            config=config,
+            client=client,
+        )
+        return _get_member_result(field)
+
+    interface_id, params = _get_grid_request(
+        data_code=data_code,
+        parameter=parameter,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        level_type=level_type,
+        level=level,
+        region=region,
+        number=number,
+        data_type=data_type,
+    )
+
+    async def retrieve():
+        result = await cmadaas_client.callAPI_to_gridArray2D(interface_id, params, dtype=dtype)
+        return _get_grid_result(result)
+
+    async with get_or_create_async_client(config, client) as cmadaas_client:
+        return await get_cached_result_async(
+            cmadaas_client.get_result_cache(use_cache),
+            _get_result_cache_key(cmadaas_client, interface_id, params, dtype),
+            retrieve,
+        )
+
+
+def retrieve_model_grid_cube(
+        data_code: str,
+        parameter: Union[str, Sequence[str]],
+        start_time: Optional[pd.Timestamp] = None,
+        forecast_time: Optional[Union[str, pd.Timedelta, Sequence[Union[str, pd.Timedelta, int]]]] = None,
+        level_type: Optional[Union[str, int]] = None,
+        level: Optional[Union[int, float, Sequence[Union[int, float]]]] = None,
+        region: Optional[Dict] = None,
+        number: Optional[Union[int, Sequence[int]]] = None,
+        data_type: Optional[Literal["analysis", "forecast"]] = None,
+        dtype: Optional[DTypeLike] = None,
+        max_workers: Optional[int] = None,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[CMADaaSClient] = None,
+) -> Union[xr.DataArray, MusicError]:
+    """
+    批量获取数值模式的网格数据，组合为多维要素场
+
+    ``parameter``、``forecast_time``、``level`` 和 ``number`` 可以是单个值，也可以是列表或 ``range``。
+    每个列表参数对应结果中的一个维度，维度名与参数名相同，按参数顺序排列在 ``latitude`` 和 ``longitude`` 之前。
+    所有组合的二维要素场并发检索，直接写入预先分配的多维数组，不再使用 ``xr.concat`` 拼接。
+
+    Parameters
+    ----------
+    data_code
+        CMADaaS 数据编码
+    parameter
+        要素名称或要素名称列表
+    start_time
+        起报时间
+    forecast_time
+        预报时效或预报时效列表，``pandas.Timedelta`` 支持的字符串，例如 `"24h"`，整数表示小时数，
+        例如 ``range(0, 73, 3)``
+    level_type
+        层次类型
+    level
+        层次值或层次值列表
+    region
+        区域
+    number
+        集合预报成员编号或编号列表，控制预报和扰动成员的资料代码自动选择，参见 ``retrieve_model_grid``
+    data_type
+        数据类型，预报场 (`forecast`) 或者分析场 (`analysis`)
+    dtype
+        要素场的数据类型，`float64` 或 `float32`，默认使用客户端的 ``dtype`` 设置
+    max_workers
+        最大并发请求数，默认为 8，同时受客户端的 ``max_concurrency`` 限制
+    config
+        配置，配置对象或配置文件路径。默认自动查找配置文件
+    client
+        客户端对象，默认新建。如果设置，则直接使用该对象，会导致 config 参数被忽略
+
+    Returns
+    -------
+    Union[xr.DataArray, MusicError]
+        检索成功返回多维 ``xarray.DataArray``，任意一个要素场检索失败则返回包含错误信息的 ``MusicError`` 对象。
+
+    Examples
+    --------
+    获取 850、700、500 hPa 温度场 0-72 小时逐 3 小时预报，维度为 ``(forecast_time, level, latitude, longitude)``
+
+    >>> retrieve_model_grid_cube(
+    ...     "NAFP_FOR_FTM_GRAPES_GFS_25KM_GLB",
+    ...     parameter="TEM",
+    ...     start_time=pd.Timestamp("2024-01-01 00:00"),
+    ...     forecast_time=range(0, 73, 3),
+    ...     level_type=100,
+    ...     level=[850, 700, 500],
+    ... )
+    """
+    axes = _get_cube_axes(parameter=parameter, forecast_time=forecast_time, level=level, number=number)
+    requests = _get_cube_requests(
+        axes,
+        data_code=data_code,
+        start_time=start_time,
+        level_type=level_type,
+        region=region,
+        data_type=data_type,
+    )
+
+    cmadaas_client = get_or_create_client(config, client)
+    builder = _GridCubeBuilder(axes)
+    results = iter_concurrently(
+        lambda request: cmadaas_client.callAPI_to_gridArray2D(*request, dtype=dtype),
+        requests,
+        max_workers=max_workers,
+    )
+    for index, result in enumerate(results):
+        music_error = builder.add(index, result)
+        if music_error is not None:
+            results.close()
+            return music_error
+    return builder.to_xarray()
+
+
+async def retrieve_model_grid_cube_async(
+        data_code: str,
+        parameter: Union[str, Sequence[str]],
+        start_time: Optional[pd.Timestamp] = None,
+        forecast_time: Optional[Union[str, pd.Timedelta, Sequence[Union[str, pd.Timedelta, int]]]] = None,
+        level_type: Optional[Union[str, int]] = None,
+        level: Optional[Union[int, float, Sequence[Union[int, float]]]] = None,
+        region: Optional[Dict] = None,
+        number: Optional[Union[int, Sequence[int]]] = None,
+        data_type: Optional[Literal["analysis", "forecast"]] = None,
+        dtype: Optional[DTypeLike] = None,
+        max_workers: Optional[int] = None,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+) -> Union[xr.DataArray, MusicError]:
+    """
+    ``retrieve_model_grid_cube`` 的异步版本，使用 ``AsyncCMADaaSClient`` 批量获取数值模式的网格数据。
+
+    参数和返回值与 ``retrieve_model_grid_cube`` 相同。
+    """
+    axes = _get_cube_axes(parameter=parameter, forecast_time=forecast_time, level=level, number=number)
+    requests = _get_cube_requests(
+        axes,
+        data_code=data_code,
+        start_time=start_time,
+        level_type=level_type,
+        region=region,
+        data_type=data_type,
+    )
+
+    async with get_or_create_async_client(config, client) as cmadaas_client:
+        builder = _GridCubeBuilder(axes)
+        results = iter_concurrently_async(
+            lambda request: cmadaas_client.callAPI_to_gridArray2D(*request, dtype=dtype),
+            requests,
+            max_workers=max_workers,
+        )
+        index = 0
+        async for result in results:
+            music_error = builder.add(index, result)
+            if music_error is not None:
+                await results.aclose()
+                return music_error
+            index += 1
+        return builder.to_xarray()
+
+
+class _CubeAxis:
+    """
+    多维要素场的一个维度，``is_dim`` 为 False 表示单个值，不生成维度
+    """
+    def __init__(self, name: str, values: List[Any], is_dim: bool):
+        self.name = name
+        self.values = values
+        self.is_dim = is_dim
+
+
+def _is_sequence(value: Any) -> bool:
+    return isinstance(value, (list, tuple, range, np.ndarray, pd.Index))
+
+
+def _get_forecast_time(forecast_time: Union[str, pd.Timedelta, int]) -> pd.Timedelta:
+    if isinstance(forecast_time, (int, np.integer)):
+        return pd.Timedelta(hours=int(forecast_time))
+    return pd.to_timedelta(forecast_time)
+
+
+def _get_cube_axes(**values) -> List[_CubeAxis]:
+    axes = []
+    for name, value in values.items():
+        is_dim = _is_sequence(value)
+        axis_values = list(value) if is_dim else [value]
+        if is_dim and len(axis_values) == 0:
+            raise ValueError(f"{name} is empty")
+        if name == "forecast_time":
+            axis_values = [None if v is None else _get_forecast_time(v) for v in axis_values]
+        axes.append(_CubeAxis(name, axis_values, is_dim))
+    return axes
+
+
+def _get_cube_requests(axes: List[_CubeAxis], **kwargs) -> List[Tuple[str, Dict]]:
+    requests = []
+    for values in itertools.product(*[axis.values for axis in axes]):
+        requests.append(_get_grid_request(**kwargs, **{axis.name: value for axis, value in zip(axes, values)}))
+    return requests
+
+
+class _GridCubeBuilder:
+    """
+    将二维要素场依次写入预先分配的多维数组。
+
+    第一个要素场确定经纬度坐标和数据类型，之后一次分配整个数组，每个要素场只复制一次。
     """
+    def __init__(self, axes: List[_CubeAxis]):
+        self.axes = axes
+        self.shape = tuple(len(axis.values) for axis in axes)
+        self.data: Optional[np.ndarray] = None
+        self.template: Optional[xr.DataArray] = None
+        self.units: Dict[str, str] = dict()
+
+    def add(self, index: int, result: GridArray2D) -> Optional[MusicError]:
+        if result.request.error_code != 0:
+            logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
+            return MusicError(code=result.request.error_code, message=result.request.error_message)
+
+        if self.data is None:
+            self.template = result.to_xarray()
+            self.data = np.empty(self.shape + self.template.shape, dtype=self.template.dtype)
+
+        field_data = result.data
+        if field_data.shape != self.template.shape:
+            raise ValueError(f"grid shape {field_data.shape} is different from {self.template.shape}")
+
+        position = np.unravel_index(index, self.shape)
+        self.data[position] = field_data
+        self.units.setdefault(self.axes[0].values[position[0]], result.units)
+        return None
+
+    def to_xarray(self) -> xr.DataArray:
+        dim_axes = [axis for axis in self.axes if axis.is_dim]
+        # 单个值的参数不生成维度，取第 0 个元素
+        data = self.data[tuple(slice(None) if axis.is_dim else 0 for axis in self.axes)]
+
+        coords = {axis.name: axis.values for axis in dim_axes}
+        if "forecast_time" in coords:
+            coords["forecast_time"] = pd.TimedeltaIndex(coords["forecast_time"])
+        coords.update(self.template.coords)
+
+        attrs = dict(self.template.attrs)
+        parameter_axis = self.axes[0]
+        units = [self.units[parameter] for parameter in parameter_axis.values]
+        if len(set(units)) > 1:
+            # 不同要素的单位不同时，单位作为 parameter 维度的坐标
+            attrs.pop("units", None)
+            coords["units"] = ("parameter", units)
+
+        return xr.DataArray(
+            data,
+            dims=[axis.name for axis in dim_axes] + list(self.template.dims),
+            coords=coords,
+            attrs=attrs,
+            name=None if parameter_axis.is_dim else self.template.name,
+        )
+
+
+def _get_grid_request(
+        data_code: str,
+        parameter: str,
+        start_time: Optional[pd.Timestamp],
+        forecast_time: Optional[Union[str, pd.Timedelta]],
+        level_type: Optional[Union[str, int]],
+        level: Optional[Union[int, float]],
+        region: Optional[Dict],
+        number: Optional[int],
+        data_type: Optional[Literal["analysis", "forecast"]],
+) -> Tuple[str, Dict]:
     interface_config = InterfaceConfig(
         name="getNafpEleGrid",
         region=None,
@@ -83,7 +480,7 @@ def retrieve_model_grid(
     interface_config["name"] = data_type_mapper.get(data_type)
 
     params = {
-        "dataCode": data_code,
+        "dataCode": _get_member_data_code(data_code, number),
         "fcstEle": parameter,
     }
 
@@ -115,10 +512,48 @@ def retrieve_model_grid(
 
     interface_id = _get_interface_id(interface_config)
     logger.info(f"interface_id: {interface_id}")
+    return interface_id, params
+
+
+@functools.lru_cache(maxsize=1)
+def _load_model_dataset_config() -> Dict:
+    return load_dataset_config("model")
+
+
+def _get_member_data_code(data_code: str, number: Optional[int]) -> str:
+    """
+    返回集合预报成员对应的资料代码，控制预报和扰动成员分别使用数据集配置中的 ``control`` 和 ``perturbed``
+    """
+    ensemble_config = _load_model_dataset_config().get(data_code, {}).get("ensemble", None)
+    if number is None or ensemble_config is None:
+        return data_code
+    if int(number) == ensemble_config["control_number"]:
+        return ensemble_config["control"]
+    return ensemble_config["perturbed"]
+
+
+def _get_member_result(field: Union[xr.DataArray, MusicError]) -> Union[xr.DataArray, MusicError]:
+    if isinstance(field, MusicError):
+        return field
+    return field.rename({"number": "member"})
+
+
+def _get_result_cache_key(
+        cmadaas_client: CMADaaSClient,
+        interface_id: str,
+        params: Dict,
+        dtype: Optional[DTypeLike],
+) -> Optional[Tuple[str, str]]:
+    return get_result_cache_key(
+        "retrieve_model_grid",
+        interface_id,
+        params,
+        cmadaas_client.server_id,
+        dtype=np.dtype(cmadaas_client._get_dtype(dtype)),
+    )
 
-    cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_gridArray2D(interface_id, params)
 
+def _get_grid_result(result: GridArray2D) -> Union[xr.DataArray, MusicError]:
     if result.request.error_code != 0:
         logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
         music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
@@ -0,0 +1,166 @@
+"""
+规则经纬度网格到站点的插值。
+
+插值分两步：先根据网格坐标和站点坐标计算每个站点使用的格点序号和权重 (``InterpolationTable``)，
+再对要素场做一次向量化的取值和加权求和。同一网格和同一组站点的插值表只计算一次。
+"""
+from functools import lru_cache
+from typing import Literal, Sequence, Tuple
+
+import numpy as np
+
+
+INTERPOLATION_METHODS = ("nearest", "bilinear")
+
+# 缓存的插值表个数
+INTERPOLATION_TABLE_CACHE_SIZE = 32
+
+
+class InterpolationTable:
+    """
+    插值表
+
+    Attributes
+    ----------
+    indices : np.ndarray
+        每个站点使用的格点在展平后的二维网格中的序号，形状为 ``(站点数, k)``，最近邻插值 k 为 1，双线性插值 k 为 4
+    weights : np.ndarray
+        格点权重，形状与 ``indices`` 相同
+    valid : np.ndarray
+        站点是否在网格范围内，范围外的站点插值结果为 NaN
+    """
+    def __init__(self, indices: np.ndarray, weights: np.ndarray, valid: np.ndarray):
+        self.indices = indices
+        self.weights = weights
+        self.valid = valid
+
+    def interpolate(self, data: np.ndarray) -> np.ndarray:
+        """
+        对最后两维为 ``(纬度, 经度)`` 的数组插值
+
+        Parameters
+        ----------
+        data
+            要素场，形状为 ``(..., 纬度数, 经度数)``
+
+        Returns
+        -------
+        np.ndarray
+            形状为 ``(..., 站点数)``，数据类型与 ``data`` 相同
+        """
+        flat_data = data.reshape(data.shape[:-2] + (-1,))
+        values = np.einsum(
+            "...pk,pk->...p",
+            flat_data[..., self.indices],
+            self.weights.astype(data.dtype, copy=False),
+        )
+        values[..., ~self.valid] = np.nan
+        return values
+
+
+def get_interpolation_table(
+        lats: np.ndarray,
+        lons: np.ndarray,
+        points: Sequence[Tuple[float, float]],
+        method: Literal["nearest", "bilinear"] = "bilinear",
+) -> InterpolationTable:
+    """
+    返回插值表，相同的网格坐标、站点和插值方法使用缓存的插值表
+
+    Parameters
+    ----------
+    lats
+        网格纬度，单调递增或递减
+    lons
+        网格经度，单调递增。全球网格在经度方向循环
+    points
+        站点坐标列表，每项为 ``(纬度, 经度)``
+    method
+        插值方法，最近邻 (`nearest`) 或双线性 (`bilinear`)
+
+    Returns
+    -------
+    InterpolationTable
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"interpolation method is not supported: {method}")
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return _get_interpolation_table(
+        lats.tobytes(),
+        lons.tobytes(),
+        tuple((float(lat), float(lon)) for lat, lon in points),
+        method,
+    )
+
+
+@lru_cache(maxsize=INTERPOLATION_TABLE_CACHE_SIZE)
+def _get_interpolation_table(
+        lats_bytes: bytes,
+        lons_bytes: bytes,
+        points: Tuple[Tuple[float, float], ...],
+        method: str,
+) -> InterpolationTable:
+    lats = np.frombuffer(lats_bytes, dtype=np.float64)
+    lons = np.frombuffer(lons_bytes, dtype=np.float64)
+    point_array = np.array(points, dtype=np.float64).reshape(-1, 2)
+
+    lat_index, lat_weight, lat_valid = _locate(lats, point_array[:, 0], periodic=False)
+    lon_index, lon_weight, lon_valid = _locate(lons, point_array[:, 1], periodic=_is_global(lons))
+    valid = lat_valid & lon_valid
+
+    if method == "nearest":
+        lat_nearest = np.where(lat_weight[:, 1] > 0.5, lat_index[:, 1], lat_index[:, 0])
+        lon_nearest = np.where(lon_weight[:, 1] > 0.5, lon_index[:, 1], lon_index[:, 0])
+        indices = (lat_nearest * len(lons) + lon_nearest)[:, np.newaxis]
+        weights = np.ones(indices.shape, dtype=np.float64)
+    else:
+        # 四个格点依次为 (lat0, lon0), (lat0, lon1), (lat1, lon0), (lat1, lon1)
+        indices = (lat_index[:, :, np.newaxis] * len(lons) + lon_index[:, np.newaxis, :]).reshape(-1, 4)
+        weights = (lat_weight[:, :, np.newaxis] * lon_weight[:, np.newaxis, :]).reshape(-1, 4)
+
+    indices[~valid] = 0
+    weights[~valid] = 0
+    indices.flags.writeable = False
+    weights.flags.writeable = False
+    valid.flags.writeable = False
+    return InterpolationTable(indices, weights, valid)
+
+
+def _is_global(lons: np.ndarray) -> bool:
+    if len(lons) < 2:
+        return False
+    step = lons[1] - lons[0]
+    return abs(lons[-1] - lons[0] + step - 360) < abs(step) * 0.5
+
+
+def _locate(axis: np.ndarray, values: np.ndarray, periodic: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    返回每个值两侧的坐标序号、线性插值权重和是否在坐标范围内，序号和权重的形状为 ``(值个数, 2)``
+    """
+    size = len(axis)
+    descending = size > 1 and axis[0] > axis[-1]
+    ascending_axis = axis[::-1] if descending else axis
+
+    if periodic:
+        # 全球网格在最后一个经度和第一个经度 + 360 之间插值
+        values = (values - ascending_axis[0]) % 360 + ascending_axis[0]
+        ascending_axis = np.append(ascending_axis, ascending_axis[0] + 360)
+
+    right = np.searchsorted(ascending_axis, values, side="right")
+    right = np.clip(right, 1, len(ascending_axis) - 1)
+    left = right - 1
+    span = ascending_axis[right] - ascending_axis[left]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(span > 0, (values - ascending_axis[left]) / span, 0.0)
+    valid = (values >= ascending_axis[0]) & (values <= ascending_axis[-1]) & ~np.isnan(values)
+    fraction = np.clip(fraction, 0, 1)
+
+    if periodic:
+        right = right % size
+    if descending:
+        left, right = size - 1 - left, size - 1 - right
+
+    index = np.stack([left, right], axis=1)
+    weight = np.stack([1 - fraction, fraction], axis=1)
+    return index, weight, valid
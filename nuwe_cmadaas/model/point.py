@@ -1,13 +1,18 @@
-from typing import Union, Optional, Dict, List, Tuple, TypedDict
+from typing import Union, Optional, Dict, List, Tuple, TypedDict, Literal
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from nuwe_cmadaas.util import get_time_string
 from nuwe_cmadaas.music import MusicError, get_or_create_client, CMADaaSClient
+from nuwe_cmadaas.music.batch import split_list_params, call_array2D_batch
 from nuwe_cmadaas.config import CMADaasConfig
 from nuwe_cmadaas._log import logger
 
+from .grid import retrieve_model_grid_cube
+from .interpolate import get_interpolation_table
+
 
 class InterfaceConfig(TypedDict):
     name: str
@@ -27,9 +32,63 @@ def retrieve_model_point(
         level: Union[int, float],
         point: Union[Tuple[float, float], List[Tuple[float, float]]] = None,
         station: Union[List[str], str] = None,
+        max_workers: Optional[int] = None,
+        method: Optional[Literal["nearest", "bilinear"]] = None,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
 ) -> Union[pd.DataFrame, MusicError]:
+    """
+    获取数值模式站点 (经纬度点) 要素值
+
+    Parameters
+    ----------
+    data_code
+        CMADaaS 数据编码
+    parameter
+        要素名称
+    start_time
+        起报时间
+    forecast_time
+        预报时效，``pandas.Timedelta`` 支持的字符串，例如 `"24h"`，或二元组表示的预报时效范围。
+        本地插值时可以是预报时效列表，整数表示小时数，不支持范围
+    level_type
+        层次类型
+    level
+        层次值
+    point
+        经纬度点 ``(纬度, 经度)`` 或经纬度点列表
+    station
+        站号或站号列表，只用于服务端检索
+    max_workers
+        最大并发请求数，默认为 8
+    method
+        本地插值方法，最近邻 (`nearest`) 或双线性 (`bilinear`)，默认为 ``None``，使用 ``getNafpEleAtPoint`` 系列接口由服务端插值。
+        设置后使用 ``retrieve_model_grid_cube`` 获取每个预报时效的要素场，在本地对所有经纬度点向量化插值。
+        同一网格和同一组经纬度点的插值序号和权重只计算一次，重复检索同一组站点时直接使用。
+        返回表格的列为 ``Lat``、``Lon``、``Validtime`` 和要素名称，每个预报时效、每个点一行，与服务端检索的表格相同。
+    config
+        配置，配置对象或配置文件路径。默认自动查找配置文件
+    client
+        客户端对象，默认新建。如果设置，则直接使用该对象，会导致 config 参数被忽略
+
+    Returns
+    -------
+    Union[pd.DataFrame, MusicError]
+    """
+    if method is not None:
+        return _interpolate_model_point(
+            data_code=data_code,
+            parameter=parameter,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            level_type=level_type,
+            level=level,
+            point=point,
+            method=method,
+            max_workers=max_workers,
+            cmadaas_client=get_or_create_client(config, client),
+        )
+
     interface_config = InterfaceConfig(
         name="getNafpEle",
         point=None,
@@ -72,7 +131,12 @@ def retrieve_model_point(
     logger.info(f"interface_id: {interface_id}")
 
     cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_array2D(interface_id, params)
+    # 站点或坐标过多时拆分为多个请求，避免 URL 过长
+    params_list = split_list_params(params)
+    if len(params_list) == 1:
+        result = cmadaas_client.callAPI_to_array2D(interface_id, params)
+    else:
+        result = call_array2D_batch(cmadaas_client, interface_id, params_list, max_workers=max_workers)
 
     if result.request.error_code != 0:
         logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
@@ -83,6 +147,53 @@ def retrieve_model_point(
     return df
 
 
+def _interpolate_model_point(
+        data_code: str,
+        parameter: str,
+        start_time: pd.Timestamp,
+        forecast_time: Union[str, pd.Timedelta, int, List],
+        level_type: Union[str, int],
+        level: Union[int, float],
+        point: Union[Tuple[float, float], List[Tuple[float, float]]],
+        method: Literal["nearest", "bilinear"],
+        max_workers: Optional[int],
+        cmadaas_client: CMADaaSClient,
+) -> Union[pd.DataFrame, MusicError]:
+    if point is None:
+        raise ValueError("point is required for local interpolation")
+    if isinstance(forecast_time, Tuple):
+        raise ValueError("forecast time range is not supported for local interpolation, use a list of forecast times")
+
+    points = [point] if isinstance(point, Tuple) else list(point)
+    forecast_times = forecast_time if isinstance(forecast_time, (List, range)) else [forecast_time]
+
+    field = retrieve_model_grid_cube(
+        data_code,
+        parameter=parameter,
+        start_time=start_time,
+        forecast_time=list(forecast_times),
+        level_type=level_type,
+        level=level,
+        max_workers=max_workers,
+        client=cmadaas_client,
+    )
+    if isinstance(field, MusicError):
+        return field
+
+    table = get_interpolation_table(field.latitude.values, field.longitude.values, points, method)
+    values = table.interpolate(field.values)
+
+    point_array = np.array(points, dtype=np.float64).reshape(-1, 2)
+    valid_times = (field.indexes["forecast_time"] / pd.Timedelta(hours=1)).to_numpy().astype(np.int32)
+    df = pd.DataFrame({
+        "Lat": np.tile(point_array[:, 0], len(valid_times)),
+        "Lon": np.tile(point_array[:, 1], len(valid_times)),
+        "Validtime": np.repeat(valid_times, len(points)),
+        parameter: values.ravel(),
+    })
+    return df
+
+
 def _get_interface_id(interface_config: InterfaceConfig) -> str:
     interface_id = interface_config["name"]
 
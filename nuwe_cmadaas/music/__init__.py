@@ -1,18 +1,43 @@
-from typing import Optional, Union
+from __future__ import annotations
+
+import contextlib
+from typing import Optional, Union, AsyncIterator, TYPE_CHECKING
 from pathlib import Path
 
-from .data import (
-    Array2D,
-    GridArray2D,
-    FilesInfo,
-    FileInfo,
-    GridScalar2D,
-    GridVector2D,
-    DataBlock,
-    MusicError,
-)
+from nuwe_cmadaas._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "Array2D": ".data",
+    "GridArray2D": ".data",
+    "FilesInfo": ".data",
+    "FileInfo": ".data",
+    "GridScalar2D": ".data",
+    "GridVector2D": ".data",
+    "DataBlock": ".data",
+    "MusicError": ".data",
+    "CMADaaSClient": ".client",
+    "RetryPolicy": ".retry",
+    "RetryStats": ".retry",
+    "Array2DBatchReader": ".stream",
+    "Array2DBatches": ".stream",
+    "write_parquet": ".arrow",
+    "ResponseCache": ".cache",
+    "CacheStats": ".cache",
+    "ResultCache": ".result_cache",
+    "get_shared_client": ".registry",
+    "clear_shared_clients": ".registry",
+    "AsyncCMADaaSClient": ".async_client",
+})
+__all__ += [
+    "create_client",
+    "get_or_create_client",
+    "create_async_client",
+    "get_or_create_async_client",
+]
 
-from .client import CMADaaSClient
+if TYPE_CHECKING:
+    from .client import CMADaaSClient
+    from .async_client import AsyncCMADaaSClient
 
 from nuwe_cmadaas.config import load_cmadaas_config, CMADaasConfig
 from nuwe_cmadaas._log import logger
@@ -37,6 +62,7 @@ def create_client(config: Optional[Union[CMADaasConfig, str, Path]]) -> CMADaaSC
     else:
         cmadaas_config = load_cmadaas_config(config)
 
+    from .client import CMADaaSClient
     cmadaas_client = CMADaaSClient(config=cmadaas_config)
     return cmadaas_client
 
@@ -45,10 +71,58 @@ def get_or_create_client(
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None
 ) -> CMADaaSClient:
+    """
+    返回 ``client``，没有设置时返回与 ``config`` 对应的共享客户端，参见 ``get_shared_client``。
+    """
     if client is None:
-        cmadaas_client = create_client(config)
+        from .registry import get_shared_client
+        cmadaas_client = get_shared_client(config)
     else:
         if config is not None:
             logger.warning("client is set, use client in argument, config is ignored.")
         cmadaas_client = client
     return cmadaas_client
+
+
+def create_async_client(config: Optional[Union[CMADaasConfig, str, Path]]) -> AsyncCMADaaSClient:
+    """
+    从配置中创建异步客户端 AsyncCMADaaSClient
+
+    Parameters
+    ----------
+    config
+        配置，配置对象或配置文件路径
+
+    Returns
+    -------
+    AsyncCMADaaSClient
+        CMADaaS 异步访问客户端
+    """
+    if isinstance(config, dict):
+        cmadaas_config = config
+    else:
+        cmadaas_config = load_cmadaas_config(config)
+
+    from .async_client import AsyncCMADaaSClient
+    return AsyncCMADaaSClient(config=cmadaas_config)
+
+
+@contextlib.asynccontextmanager
+async def get_or_create_async_client(
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None
+) -> AsyncIterator[AsyncCMADaaSClient]:
+    """
+    异步客户端上下文管理器。如果没有设置 ``client`` 则新建客户端，并在退出时关闭。
+    """
+    if client is not None:
+        if config is not None:
+            logger.warning("client is set, use client in argument, config is ignored.")
+        yield client
+        return
+
+    cmadaas_client = create_async_client(config)
+    try:
+        yield cmadaas_client
+    finally:
+        await cmadaas_client.close()
@@ -0,0 +1,87 @@
+"""
+Apache Arrow 和 Parquet 格式输出。
+
+需要安装可选依赖 ``pyarrow``。
+"""
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .element import STATION_ID_ELEMENTS
+
+
+def columns_to_arrow(columns: Sequence[np.ndarray], element_names: Sequence[str]):
+    """
+    将按列解码的数组转换为 ``pyarrow.Table``
+
+    数值列直接使用 numpy 数组的内存，字符串列转换为 Arrow ``string`` 类型。
+
+    Parameters
+    ----------
+    columns
+        各列数据，参见 ``Array2D.columns``
+    element_names
+        要素名称
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    import pyarrow as pa
+
+    arrays = []
+    for column in columns:
+        if column.dtype == np.dtype(object):
+            arrays.append(pa.array(column, type=pa.string()))
+        else:
+            arrays.append(pa.array(column))
+    return pa.Table.from_arrays(arrays, names=list(element_names))
+
+
+def write_parquet(
+        table,
+        path: Union[str, Path],
+        dictionary_columns: Optional[List[str]] = None,
+        **kwargs,
+):
+    """
+    将表格数据保存为 Parquet 文件，站号列使用字典编码。
+
+    站号在观测数据中大量重复，字典编码可以显著减小文件大小，读取时直接得到 Arrow 字典类型的列。
+
+    Parameters
+    ----------
+    table
+        ``pyarrow.Table`` 或 ``pd.DataFrame``
+    path
+        文件路径
+    dictionary_columns
+        使用字典编码的列，默认为表格中包含的站号列，例如 ``Station_Id_C``、``Station_Id_d``
+    kwargs
+        其他需要传递给 ``pyarrow.parquet.write_table`` 的参数，例如 ``compression``
+
+    Examples
+    --------
+    >>> table = retrieve_obs_station("SURF_CHN_MUL_HOR", time=pd.Timestamp("2024-01-01"), output="arrow")
+    >>> write_parquet(table, "surf.parquet")
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+
+    if dictionary_columns is None:
+        dictionary_columns = [name for name in table.column_names if name in STATION_ID_ELEMENTS]
+
+    for name in dictionary_columns:
+        index = table.schema.get_field_index(name)
+        column = table.column(index)
+        if not pa.types.is_dictionary(column.type):
+            table = table.set_column(index, name, pc.dictionary_encode(column))
+
+    kwargs.setdefault("use_dictionary", list(dictionary_columns))
+    pq.write_table(table, path, **kwargs)
@@ -0,0 +1,393 @@
+import asyncio
+import json
+import pathlib
+import warnings
+from typing import Callable, Any, Dict, Optional, Union, List, Tuple, AsyncIterator
+from urllib.parse import urlsplit
+
+from numpy.typing import DTypeLike
+
+from .client import CMADaaSClient
+from .connection import Connection
+from .async_connection import AsyncConnection, run_in_executor
+from .download import DownloadExecutor, DownloadTask, get_file_size, get_download_outcome
+from .retry import RetryLoop
+from .element import ElementSchema
+from .data import (
+    Array2D,
+    DataBlock,
+    GridArray2D,
+    FilesInfo,
+    GridScalar2D,
+    GridVector2D,
+    MusicError,
+)
+from nuwe_cmadaas._log import logger
+
+
+class AsyncCMADaaSClient(CMADaaSClient):
+    """
+    CMADaaS 异步客户端
+
+    ``CMADaaSClient`` 的 asyncio 版本，``callAPI_to_*`` 方法均为协程，参数和返回值与同步版本相同。
+    配置方式、URL 签名和数据解码与 ``CMADaaSClient`` 共用。
+    单个事件循环中可以同时发起大量请求，最大并发连接数由 ``pool_size`` 控制，默认为 100。
+
+    需要安装可选依赖 ``aiohttp``。
+
+    .. code-block:: python
+
+        async with AsyncCMADaaSClient(config=config) as client:
+            results = await asyncio.gather(*[
+                client.callAPI_to_array2D(interface_id, params) for params in params_list
+            ])
+
+    ``callAPI_to_array2D_batches`` 的返回值使用 ``async for`` 遍历。
+    """
+
+    def create_connect(self, user: str, password: str):
+        self.user = user
+        self.password = password
+        self._connection = AsyncConnection(
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            pool_size=self.pool_size,
+            keep_alive=self.keep_alive,
+            download_chunk_size=self.download_chunk_size,
+        )
+        self._download_executor = None
+
+    async def close(self):
+        """
+        关闭客户端，释放所有 HTTP 连接。
+        """
+        if self._connection is not None:
+            await self._connection.close()
+
+    def __enter__(self):
+        raise TypeError("AsyncCMADaaSClient should be used with 'async with'")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def __aenter__(self) -> "AsyncCMADaaSClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def callAPI_to_array2D(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None,
+            schema: Optional[ElementSchema] = None,
+    ) -> Array2D:
+        return await self._do_pack_request(
+            Array2D(schema=schema, lazy=self.lazy_decode),
+            interface_id,
+            CMADaaSClient.callAPI_to_array2D.__name__,
+            params,
+            server_id,
+        )
+
+    async def callAPI_to_gridArray2D(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
+    ) -> GridArray2D:
+        return await self._do_pack_request(
+            GridArray2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode),
+            interface_id,
+            CMADaaSClient.callAPI_to_gridArray2D.__name__,
+            params,
+            server_id,
+        )
+
+    async def callAPI_to_fileList(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None
+    ) -> FilesInfo:
+        return await self._do_pack_request(
+            FilesInfo(), interface_id, CMADaaSClient.callAPI_to_fileList.__name__, params, server_id
+        )
+
+    async def callAPI_to_serializedStr(
+            self,
+            interface_id: str,
+            params: Dict,
+            data_format: str,
+            server_id: str = None
+    ) -> str:
+        if "dataFormat" not in params:
+            params["dataFormat"] = data_format
+
+        method = CMADaaSClient.callAPI_to_serializedStr.__name__
+
+        def handle_success(content: bytes) -> str:
+            return content.decode("utf8")
+
+        def handle_failure(content: bytes) -> str:
+            getway_info = json.loads(content)
+            if getway_info is None:
+                return "parse getway return string error:" + content.decode("utf8")
+            else:
+                return "getway error: returnCode={return_code} returnMessage={return_message}".format(
+                    return_code=getway_info["returnCode"],
+                    return_message=getway_info["returnMessage"],
+                )
+
+        def handle_exception(exception: Exception):
+            logger.warning("Error retrieving data: " + str(exception))
+            return "Error retrieving data"
+
+        return await self._do_request(
+            interface_id,
+            method,
+            params,
+            server_id,
+            success_handler=handle_success,
+            failure_handler=handle_failure,
+            exception_handler=handle_exception,
+        )
+
+    async def callAPI_to_saveAsFile(
+        self,
+        interface_id: str,
+        params: Dict,
+        data_format: str,
+        file_name: str,
+        server_id: str = None,
+        resume: bool = False,
+    ) -> FilesInfo:
+        data = FilesInfo()
+
+        if "dataFormat" not in params:
+            params["dataFormat"] = data_format
+
+        method = CMADaaSClient.callAPI_to_saveAsFile.__name__
+
+        if file_name is None:
+            data.request.error_code = Connection.otherError
+            data.request.error_message = (
+                "error:savePath can't null, the format is dir/file.formart. "
+                "For example /data/saveas.xml)")
+            return data
+
+        params["savepath"] = file_name
+
+        loaded_data = await self._do_pack_request(data, interface_id, method, params, server_id)
+        if loaded_data.request.error_code != 0:
+            return loaded_data
+
+        file_info = loaded_data.files_info[0]
+        result = await self._connection.download_file(
+            file_info.file_url,
+            file_name,
+            resume=resume,
+            expected_size=get_file_size(file_info.size),
+        )
+        if result[0] != 0:
+            loaded_data.request.error_code = result[0]
+            loaded_data.request.error_message = result[1]
+        return loaded_data
+
+    async def callAPI_to_downFile(
+        self,
+        interface_id: str,
+        params: Dict,
+        file_dir: Union[str, pathlib.Path],
+        server_id: str = None,
+        max_workers: Optional[int] = None,
+        resume: bool = False,
+    ) -> FilesInfo:
+        """
+        检索文件列表并并发下载全部文件到 ``file_dir`` 目录，参见 ``CMADaaSClient.callAPI_to_downFile``。
+        """
+        file_dir_path = pathlib.Path(file_dir)
+
+        method = CMADaaSClient.callAPI_to_fileList.__name__
+
+        files_info = await self._do_pack_request(FilesInfo(), interface_id, method, params, server_id)
+        if files_info.request.error_code != 0:
+            return files_info
+
+        tasks = [
+            DownloadTask(
+                file_info.file_url,
+                file_dir_path.joinpath(file_info.file_name),
+                get_file_size(file_info.size),
+            )
+            for file_info in files_info.files_info
+        ]
+        results = await self._download_files(tasks, max_workers=max_workers, resume=resume)
+
+        for file_info, (error_code, error_message) in zip(files_info.files_info, results):
+            if error_code == 0:
+                continue
+            logger.warning(f"download failed {file_info.file_name}: {error_code} {error_message}")
+            file_info.download_error = MusicError(code=error_code, message=error_message)
+            if files_info.request.error_code == 0:
+                files_info.request.error_code = error_code
+                files_info.request.error_message = error_message
+
+        return files_info
+
+    async def callAPI_to_dataBlock(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None
+    ) -> DataBlock:
+        warnings.warn("callAPI_to_dataBlock is not tested")
+        return await self._do_pack_request(
+            DataBlock(lazy=self.lazy_decode),
+            interface_id,
+            CMADaaSClient.callAPI_to_dataBlock.__name__,
+            params,
+            server_id,
+        )
+
+    async def callAPI_to_gridScalar2D(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
+    ) -> GridScalar2D:
+        warnings.warn("callAPI_to_gridScalar2D is not tested")
+        return await self._do_pack_request(
+            GridScalar2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode),
+            interface_id,
+            CMADaaSClient.callAPI_to_gridScalar2D.__name__,
+            params,
+            server_id,
+        )
+
+    async def callAPI_to_gridVector2D(
+            self,
+            interface_id: str,
+            params: Dict,
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
+    ) -> GridVector2D:
+        return await self._do_pack_request(
+            GridVector2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode),
+            interface_id,
+            CMADaaSClient.callAPI_to_gridVector2D.__name__,
+            params,
+            server_id,
+        )
+
+    async def _do_pack_request(self, data, interface_id: str, method: str, params: Dict, server_id: str):
+        return await self._do_request(
+            interface_id,
+            method,
+            params,
+            server_id,
+            success_handler=Connection.generate_pack_success_handler(data),
+            failure_handler=Connection.generate_pack_failure_handler(data),
+            exception_handler=Connection.generate_exception_handler(data),
+        )
+
+    async def _do_request(
+            self,
+            interface_id: str,
+            method: str,
+            params: Dict,
+            server_id: str,
+            success_handler: Callable[[bytes], Any],
+            failure_handler: Callable[[bytes], Any],
+            exception_handler: Callable[[Exception], Any],
+    ):
+        content, success_handler = self._prepare_cache(interface_id, method, params, server_id, success_handler)
+        if content is not None:
+            return await run_in_executor(success_handler, content)
+
+        retry_loop = RetryLoop(self.retry_policy, self.retry_stats)
+        failed_endpoints = []
+        while True:
+            attempt = self._create_attempt(interface_id, method, params, server_id, exclude=failed_endpoints)
+            async with attempt.async_slot():
+                attempt.start(retry_loop)
+                result = await self._connection.make_request(
+                    attempt.fetch_url,
+                    success_handler,
+                    attempt.outcome.wrap_failure_handler(failure_handler),
+                    attempt.outcome.wrap_exception_handler(exception_handler),
+                )
+                delay = self._finish_attempt(attempt, result, retry_loop, failed_endpoints)
+            if delay is None:
+                return result
+            await asyncio.sleep(delay)
+
+    async def _iter_response(
+            self,
+            interface_id: str,
+            method: str,
+            params: Dict,
+            server_id: str,
+    ) -> AsyncIterator[bytes]:
+        import aiohttp
+
+        attempt = self._create_attempt(interface_id, method, params, server_id)
+        async with attempt.async_slot():
+            attempt.start(RetryLoop(self.retry_policy, self.retry_stats))
+            reported = False
+            try:
+                async for chunk in self._connection.iter_response(attempt.fetch_url):
+                    if not reported:
+                        self._endpoint_pool.report_success(attempt.endpoint, attempt.get_elapsed_time())
+                        reported = True
+                    yield chunk
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self._endpoint_pool.report_failure(attempt.endpoint)
+                raise
+
+    async def _download_files(
+            self,
+            tasks: List[DownloadTask],
+            max_workers: Optional[int] = None,
+            resume: bool = False,
+    ) -> List[Tuple[int, Optional[str]]]:
+        if max_workers is None:
+            max_workers = self.download_workers
+        if max_workers is None:
+            max_workers = DownloadExecutor.defaultMaxWorkers
+        max_per_host = self.download_host_limit
+        if max_per_host is None:
+            max_per_host = max_workers
+
+        semaphore = asyncio.Semaphore(max_workers)
+        host_semaphores: Dict[str, asyncio.Semaphore] = dict()
+
+        async def download_once(task: DownloadTask) -> Tuple[int, Optional[str]]:
+            host = urlsplit(task.file_url).netloc
+            host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(max_per_host))
+            async with semaphore, host_semaphore:
+                try:
+                    return await self._connection.download_file(
+                        task.file_url,
+                        task.save_file,
+                        resume=resume,
+                        expected_size=task.expected_size,
+                    )
+                except Exception as e:
+                    logger.warning(f"download error: {task.file_url}: {e}")
+                    return Connection.otherError, f"download error: {e}"
+
+        async def download_one(task: DownloadTask) -> Tuple[int, Optional[str]]:
+            retry_loop = RetryLoop(self.retry_policy, self.retry_stats, f"download {task.file_url}")
+            while True:
+                retry_loop.start_attempt()
+                result = await download_once(task)
+                delay = retry_loop.get_retry_delay(get_download_outcome(result))
+                if delay is None:
+                    return result
+                await asyncio.sleep(delay)
+
+        return list(await asyncio.gather(*[download_one(task) for task in tasks]))
@@ -0,0 +1,179 @@
+import asyncio
+import pathlib
+from typing import Callable, Any, Union, Tuple, Optional, AsyncIterator
+
+from nuwe_cmadaas._log import logger
+
+from .connection import Connection, PartialDownload
+from .data import ResponseData
+
+
+class AsyncConnection:
+    """
+    基于 ``aiohttp`` 的异步连接类，接口与 ``Connection`` 一致。
+
+    需要安装可选依赖 ``aiohttp``。HTTP 会话在首次请求时于当前事件循环中创建。
+
+    Attributes
+    ----------
+    connect_timeout : float
+        连接超时，单位秒
+    read_timeout : float
+        读取超时，单位秒
+    pool_size : int
+        最大并发连接数
+    keep_alive : bool
+        是否复用 HTTP 连接 (keep-alive)
+    download_chunk_size : int
+        下载文件时每次读取的字节数
+    """
+    defaultPoolSize = 100
+
+    def __init__(
+            self,
+            connect_timeout: float,
+            read_timeout: float,
+            pool_size: Optional[int] = None,
+            keep_alive: bool = True,
+            download_chunk_size: Optional[int] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        if pool_size is None:
+            pool_size = AsyncConnection.defaultPoolSize
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+
+        if download_chunk_size is None:
+            download_chunk_size = Connection.defaultDownloadChunkSize
+        self.download_chunk_size = download_chunk_size
+
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        共享的 ``aiohttp.ClientSession``，首次访问时创建。
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    async def close(self):
+        """
+        关闭 HTTP 会话，释放所有连接。
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _create_session(self):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            force_close=not self.keep_alive,
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def make_request(
+            self,
+            fetch_url: str,
+            success_handler: Callable[[bytes], ResponseData],
+            failure_handler: Callable[[bytes], ResponseData],
+            exception_handler: Callable[[Exception], Any],
+    ) -> ResponseData:
+        """
+        从URL获取响应并处理结果，参见 ``Connection.make_request``。
+
+        ``success_handler`` 负责解码 protobuf 数据，耗时与数据量成正比，在默认线程池中运行，不阻塞事件循环。
+        """
+        import aiohttp
+
+        try:
+            async with self.session.get(fetch_url) as response:
+                response_content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:  # http error
+            return exception_handler(e)
+
+        if Connection._check_getway_flag(response_content):
+            return failure_handler(response_content)
+
+        return await run_in_executor(success_handler, response_content)
+
+    async def iter_response(self, fetch_url: str, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        流式读取响应内容，参见 ``Connection.iter_response``。
+        """
+        if chunk_size is None:
+            chunk_size = self.download_chunk_size
+
+        async with self.session.get(fetch_url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def download_file(
+        self,
+        file_url: str,
+        save_file: Union[str, pathlib.Path],
+        chunk_size: Optional[int] = None,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> Tuple[int, Optional[str]]:
+        """
+        流式下载文件，参见 ``Connection.download_file``。
+        """
+        import aiohttp
+
+        if chunk_size is None:
+            chunk_size = self.download_chunk_size
+
+        download = PartialDownload(save_file, resume=resume, expected_size=expected_size)
+        if download.is_complete():
+            return 0, None
+
+        headers = download.prepare()
+        if download.is_part_complete():
+            return download.finish()
+
+        try:
+            async with self.session.get(file_url, headers=headers) as response:
+                if response.status == 416 and download.offset > 0:
+                    download.restart()
+                    return await self.download_file(
+                        file_url, save_file, chunk_size=chunk_size, resume=resume, expected_size=expected_size
+                    )
+
+                response.raise_for_status()
+                first_chunk = await response.content.read(chunk_size)
+
+                is_partial = response.status == 206
+                if not is_partial and Connection._check_getway_flag(first_chunk):
+                    return Connection._parse_getway_error(first_chunk + await response.read())
+
+                with download.open(is_partial) as f:
+                    download.write(f, first_chunk)
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        download.write(f, chunk)
+
+            return download.finish()
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:  # http error
+            logger.warning(f"download error: {e}")
+            return download.fail("request error")
+        except IOError:
+            return download.fail("create file error")
+
+
+async def run_in_executor(func: Callable[..., Any], *args) -> Any:
+    """
+    在事件循环的默认线程池中运行 ``func``，用于解码等 CPU 密集的操作
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
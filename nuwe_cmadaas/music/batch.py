@@ -0,0 +1,216 @@
+"""
+并发执行多个检索请求，按输入顺序返回结果。
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from nuwe_cmadaas._log import logger
+
+from .data import Array2D
+
+if TYPE_CHECKING:
+    from .client import CMADaaSClient
+    from .async_client import AsyncCMADaaSClient
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_WORKERS = 8
+
+# 逗号分隔的列表参数，过长时拆分为多个请求
+LIST_PARAMS = ("staIds", "latLons")
+
+# 列表参数的最大长度 (字符数)，避免 GET 请求的 URL 超过网关限制
+MAX_LIST_PARAM_LENGTH = 2000
+
+# MUSIC 服务检索成功但没有数据时返回的错误码
+NO_RECORD_ERROR_CODE = -1
+
+
+def iter_concurrently(
+        function: Callable[[T], R],
+        items: Sequence[T],
+        max_workers: Optional[int] = None,
+) -> Iterator[R]:
+    """
+    使用线程池并发调用 ``function``，按 ``items`` 的顺序返回结果。
+
+    结果在生成后立即返回，调用者可以边接收边处理，不需要等待所有请求完成。
+    ``CMADaaSClient`` 是线程安全的，最大并发请求数同时受客户端的 ``max_concurrency`` 限制。
+
+    Parameters
+    ----------
+    function
+        检索函数
+    items
+        检索函数的参数列表
+    max_workers
+        最大线程数，默认为 ``DEFAULT_MAX_WORKERS``
+
+    Yields
+    ------
+    R
+        检索函数的返回值
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+
+    if len(items) <= 1 or max_workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(function, item) for item in items]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # 提前退出时取消未开始的请求
+            for future in futures:
+                future.cancel()
+
+
+async def iter_concurrently_async(
+        function: Callable[[T], Awaitable[R]],
+        items: Sequence[T],
+        max_workers: Optional[int] = None,
+) -> AsyncIterator[R]:
+    """
+    ``iter_concurrently`` 的异步版本，``function`` 为协程函数，最多同时运行 ``max_workers`` 个协程。
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+    async def run(item):
+        async with semaphore:
+            return await function(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def split_list_params(params: Dict, max_length: Optional[int] = None) -> List[Dict]:
+    """
+    将过长的逗号分隔列表参数 (``LIST_PARAMS``，例如 ``staIds``) 拆分为多组请求参数，
+    每组参数中列表参数的长度不超过 ``max_length``。
+
+    Parameters
+    ----------
+    params
+        请求参数
+    max_length
+        列表参数的最大长度，默认为 ``MAX_LIST_PARAM_LENGTH``
+
+    Returns
+    -------
+    List[Dict]
+        请求参数列表，不需要拆分时只包含 ``params``
+    """
+    if max_length is None:
+        max_length = MAX_LIST_PARAM_LENGTH
+
+    params_list = [params]
+    for key in LIST_PARAMS:
+        value = params.get(key, None)
+        if not isinstance(value, str) or len(value) <= max_length:
+            continue
+        chunks = _split_list_string(value, max_length)
+        logger.info(f"split {key} into {len(chunks)} requests")
+        params_list = [{**p, key: chunk} for p in params_list for chunk in chunks]
+    return params_list
+
+
+def _split_list_string(value: str, max_length: int) -> List[str]:
+    chunks = []
+    items = []
+    length = -1
+    for item in value.split(","):
+        if len(items) > 0 and length + 1 + len(item) > max_length:
+            chunks.append(",".join(items))
+            items = []
+            length = -1
+        items.append(item)
+        length += 1 + len(item)
+    chunks.append(",".join(items))
+    return chunks
+
+
+def call_array2D_batch(
+        client: "CMADaaSClient",
+        interface_id: str,
+        params_list: Sequence[Dict],
+        max_workers: Optional[int] = None,
+        server_id: Optional[str] = None,
+) -> Array2D:
+    """
+    并发调用 ``callAPI_to_array2D`` 检索多组参数，按参数顺序拼接结果的行。
+
+    每个请求单独使用客户端的重试策略 (``CMADaaSClient.retry_policy``)，失败时只重试该请求。
+    没有数据的请求 (错误码 ``NO_RECORD_ERROR_CODE``) 不参与拼接，所有请求都没有数据时返回第一个请求的结果。
+    其他请求最终失败时返回该请求的结果，其中包含错误信息。
+
+    Parameters
+    ----------
+    client
+        客户端
+    interface_id
+        接口名称
+    params_list
+        请求参数列表，例如按时间段或站点列表拆分后的参数
+    max_workers
+        最大并发请求数，默认为 ``DEFAULT_MAX_WORKERS``
+    server_id
+        服务 ID
+
+    Returns
+    -------
+    Array2D
+    """
+    def fetch(params: Dict) -> Array2D:
+        return client.callAPI_to_array2D(interface_id, dict(params), server_id=server_id)
+
+    return _merge_results(iter_concurrently(fetch, params_list, max_workers=max_workers))
+
+
+async def call_array2D_batch_async(
+        client: "AsyncCMADaaSClient",
+        interface_id: str,
+        params_list: Sequence[Dict],
+        max_workers: Optional[int] = None,
+        server_id: Optional[str] = None,
+) -> Array2D:
+    """
+    ``call_array2D_batch`` 的异步版本，使用 ``AsyncCMADaaSClient``。
+    """
+    async def fetch(params: Dict) -> Array2D:
+        return await client.callAPI_to_array2D(interface_id, dict(params), server_id=server_id)
+
+    results = [result async for result in iter_concurrently_async(fetch, params_list, max_workers=max_workers)]
+    return _merge_results(results)
+
+
+def _merge_results(results: Iterable[Array2D]) -> Array2D:
+    empty_result = None
+    non_empty_results = []
+    for result in results:
+        error_code = result.request.error_code
+        if error_code == NO_RECORD_ERROR_CODE:
+            if empty_result is None:
+                empty_result = result
+        elif error_code != 0:
+            return result
+        else:
+            non_empty_results.append(result)
+
+    if len(non_empty_results) == 0:
+        return empty_result
+    return Array2D.concat(non_empty_results)
@@ -0,0 +1,290 @@
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Union, Iterator
+
+from nuwe_cmadaas._log import logger
+
+
+# 签名相关参数，每次请求都不同，不参与缓存键计算
+CACHE_KEY_EXCLUDED_PARAMS = {"timestamp", "nonce", "sign"}
+
+
+# 返回文件 URL 的方法不缓存，文件 URL 可能已失效
+UNCACHED_METHODS = {"callAPI_to_fileList", "callAPI_to_saveAsFile"}
+
+# 相对时间参数，相同参数在不同时刻的检索结果不同
+RELATIVE_TIME_PARAMS = {"latestTime"}
+
+
+def is_cacheable_request(interface_id: str, method: str, params: Dict) -> bool:
+    """
+    请求结果是否可以缓存
+
+    只缓存历史资料的检索结果。以下请求不缓存：
+
+    - 文件列表、下载文件 (``callAPI_to_fileList``、``callAPI_to_saveAsFile`` 和 ``callAPI_to_downFile``)
+    - 最新时次接口 (接口名称包含 ``Latest``，例如 ``getSurfLatestTime``) 和带有 ``latestTime`` 参数的请求
+    """
+    if method in UNCACHED_METHODS:
+        return False
+    if "latest" in interface_id.lower():
+        return False
+    return not any(name in params for name in RELATIVE_TIME_PARAMS)
+
+
+def make_cache_key(interface_id: str, method: str, params: Dict, server_id: str) -> str:
+    """
+    根据请求内容生成缓存键
+
+    参数按名称排序，参数值转换为字符串，忽略 ``timestamp``、``nonce`` 和 ``sign`` 等签名参数，
+    因此相同的请求总是得到相同的缓存键。
+
+    Parameters
+    ----------
+    interface_id
+    method
+    params
+    server_id
+
+    Returns
+    -------
+    str
+        SHA-256 十六进制字符串
+    """
+    normalized = {
+        "interfaceId": interface_id,
+        "method": method,
+        "serverId": server_id,
+        "params": sorted(
+            (str(key), str(value)) for key, value in params.items()
+            if key not in CACHE_KEY_EXCLUDED_PARAMS
+        ),
+    }
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """
+    缓存统计，线程安全
+
+    Attributes
+    ----------
+    hits : int
+        命中次数
+    misses : int
+        未命中次数，包括已过期的缓存
+    stores : int
+        写入次数
+    evictions : int
+        因超过容量而删除的缓存数
+    expirations : int
+        因过期而删除的缓存数
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stores = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def record(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __repr__(self):
+        return f"CacheStats({self.to_dict()})"
+
+
+class ResponseCache:
+    """
+    MUSIC 返回结果的磁盘缓存，线程安全
+
+    缓存服务器返回的原始 protobuf 字节串，读取时与网络请求使用相同的解码流程。
+    每个结果保存为 ``cache_dir`` 中的一个文件，索引保存在 ``cache_dir/index.sqlite`` 中，
+    多个进程可以共用同一个缓存目录。
+
+    总大小超过 ``max_size`` 时按最近最少使用 (LRU) 顺序删除。
+    客户端不缓存文件列表和最新时次等结果随时间变化的请求，参见 ``is_cacheable_request``。
+
+    Attributes
+    ----------
+    cache_dir : pathlib.Path
+        缓存目录
+    max_size : int
+        最大缓存大小，单位字节
+    ttl : float or Dict[str, float]
+        缓存有效期，单位秒，None 表示永不过期。
+        字典形式时按资料代码 (``dataCode``) 设置，``default`` 项为其余资料的有效期，例如实时资料设置较短的有效期：
+        ``{"SURF_CHN_MUL_HOR": 600, "default": None}``
+    stats : CacheStats
+        命中统计
+    """
+    defaultMaxSize = 1024 * 1024 * 1024
+    indexFileName = "index.sqlite"
+
+    def __init__(
+            self,
+            cache_dir: Union[str, pathlib.Path],
+            max_size: Optional[int] = None,
+            ttl: Optional[Union[float, Dict[str, Optional[float]]]] = None,
+    ):
+        if max_size is None:
+            max_size = ResponseCache.defaultMaxSize
+
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, data_code TEXT, size INTEGER, created REAL, accessed REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get_ttl(self, data_code: Optional[str] = None) -> Optional[float]:
+        """
+        返回资料的缓存有效期，单位秒，None 表示永不过期
+        """
+        if isinstance(self.ttl, dict):
+            return self.ttl.get(data_code, self.ttl.get("default", None))
+        return self.ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存，不存在或已过期时返回 None
+        """
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT data_code, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats.record("misses")
+                return None
+
+            data_code, created = row
+            ttl = self.get_ttl(data_code)
+            if ttl is not None and now - created > ttl:
+                self._remove(db, key)
+                self.stats.record("expirations")
+                self.stats.record("misses")
+                return None
+
+            try:
+                content = self._get_path(key).read_bytes()
+            except OSError:
+                self._remove(db, key)
+                self.stats.record("misses")
+                return None
+
+            db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+
+        self.stats.record("hits")
+        return content
+
+    def put(self, key: str, content: bytes, data_code: Optional[str] = None):
+        """
+        写入缓存，总大小超过 ``max_size`` 时删除最近最少使用的缓存
+        """
+        if len(content) > self.max_size:
+            logger.debug(f"response is larger than cache size, skip cache: {len(content)} bytes")
+            return
+
+        path = self._get_path(key)
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        now = time.time()
+        with self._lock, self._connect() as db:
+            try:
+                temp_path.write_bytes(content)
+                os.replace(temp_path, path)
+            except OSError as e:
+                logger.warning(f"write cache error: {e}")
+                temp_path.unlink(missing_ok=True)
+                return
+
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, data_code, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data_code, len(content), now, now),
+            )
+            self.stats.record("stores")
+            self._evict(db)
+
+    def clear(self):
+        """
+        删除所有缓存
+        """
+        with self._lock, self._connect() as db:
+            for (key,) in db.execute("SELECT key FROM entries").fetchall():
+                self._remove(db, key)
+
+    @property
+    def size(self) -> int:
+        """
+        当前缓存大小，单位字节
+        """
+        with self._lock, self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, db: sqlite3.Connection):
+        total_size = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            self._remove(db, key)
+            self.stats.record("evictions")
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+    def _remove(self, db: sqlite3.Connection, key: str):
+        db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            self._get_path(key).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def _get_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.pb"
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3.Connection 本身的上下文管理器只提交事务，不关闭连接
+        db = sqlite3.connect(self.cache_dir / ResponseCache.indexFileName, timeout=30)
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def __repr__(self):
+        return f"ResponseCache({self.cache_dir}, max_size={self.max_size}, ttl={self.ttl})"
+
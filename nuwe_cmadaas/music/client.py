@@ -1,4 +1,5 @@
 import configparser
+import contextlib
 import json
 import pathlib
 import warnings
@@ -6,9 +7,21 @@ import hashlib
 import time
 import uuid
 from copy import deepcopy
-from typing import Callable, Any, Dict, Optional, Union
+from typing import Callable, Any, Dict, Optional, Union, List, Tuple, Iterator, Iterable
+
+import numpy as np
+import requests
+from numpy.typing import DTypeLike
 
 from .connection import Connection
+from .download import DownloadExecutor, DownloadTask, get_file_size
+from .retry import RetryPolicy, RetryStats, RequestOutcome, RetryLoop
+from .throttle import ServerThrottle, get_server_throttle
+from .endpoint import Endpoint, EndpointPool, parse_endpoints
+from .cache import ResponseCache, make_cache_key, is_cacheable_request
+from .result_cache import ResultCache
+from .element import ElementSchema
+from .stream import Array2DBatchReader, Array2DBatches
 from .data import (
     Array2D,
     DataBlock,
@@ -16,6 +29,7 @@ from .data import (
     FilesInfo,
     GridScalar2D,
     GridVector2D,
+    MusicError,
 )
 from nuwe_cmadaas._log import logger
 from nuwe_cmadaas.config import CMADaasConfig
@@ -42,6 +56,38 @@ class CMADaaSClient:
         连接超时，单位秒
     read_timeout : float
         连接超时，单位秒
+    pool_size : int
+        HTTP 连接池大小
+    keep_alive : bool
+        是否复用 HTTP 连接
+    download_chunk_size : int
+        下载文件时每次读取的字节数
+    download_workers : int
+        下载多个文件时的最大并发数
+    download_host_limit : int
+        同一文件服务器的最大并发下载数
+    retry_policy : RetryPolicy
+        请求重试策略
+    retry_stats : RetryStats
+        重试统计，记录请求次数、重试次数和重试等待时间
+    rate_limit : float
+        每个 MUSIC 服务每秒最大请求数
+    rate_burst : int
+        每个 MUSIC 服务允许的最大突发请求数
+    max_concurrency : int
+        每个 MUSIC 服务的最大并发请求数
+    endpoints : List[Tuple[str, int]]
+        MUSIC 服务节点 (ip, 端口) 列表
+    load_balance : str
+        多个节点的负载均衡策略
+    dtype : np.dtype
+        格点数据的数据类型
+    lazy_decode : bool
+        是否延迟解码返回结果
+    cache : ResponseCache
+        磁盘缓存，None 表示不使用缓存
+    result_cache : ResultCache
+        检索结果内存缓存，None 表示不使用缓存
     """
     clientLanguage = "Python"
     clientVersion = "V2.0.0"
@@ -57,6 +103,23 @@ class CMADaaSClient:
             password: Optional[str] = None,
             config: Optional[CMADaasConfig] = None,
             config_file: Optional[Union[pathlib.Path, str]] = None,
+            pool_size: Optional[int] = None,
+            keep_alive: Optional[bool] = None,
+            download_chunk_size: Optional[int] = None,
+            download_workers: Optional[int] = None,
+            download_host_limit: Optional[int] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            rate_limit: Optional[float] = None,
+            rate_burst: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+            endpoints: Optional[Union[str, List[Union[str, Tuple[str, int]]]]] = None,
+            load_balance: Optional[str] = None,
+            eject_time: Optional[float] = None,
+            slow_threshold: Optional[float] = None,
+            dtype: Optional[DTypeLike] = None,
+            lazy_decode: bool = False,
+            cache: Optional[Union[ResponseCache, str, pathlib.Path]] = None,
+            result_cache_size: Optional[int] = None,
     ):
         """
         Notes
@@ -81,6 +144,54 @@ class CMADaaSClient:
 
         config_file : pathlib.Path or str
             MUSIC原生接口配置文件路径，INI格式，通常名为 ``client.config``。
+        pool_size
+            HTTP 连接池大小，即与每个服务器保持的最大连接数，默认为 10。
+            多线程并发访问时应不小于线程数。
+        keep_alive
+            是否复用 HTTP 连接 (keep-alive)，默认为 ``True``
+        download_chunk_size
+            下载文件时每次读取的字节数，默认为 1MB。下载过程的内存占用只与该值有关。
+        download_workers
+            ``callAPI_to_downFile`` 下载多个文件时的最大并发数，默认为 4
+        download_host_limit
+            同一文件服务器的最大并发下载数，默认与 ``download_workers`` 相同
+        retry_policy
+            请求重试策略，默认不重试。每次重试都会重新生成带有新 ``timestamp`` 和 ``nonce`` 的签名 URL。
+        rate_limit
+            每个 MUSIC 服务 (``server_ip``, ``server_id``) 每秒最大请求数，默认不限速。
+            使用令牌桶算法，同一进程中访问同一服务的所有客户端和线程共用限额。
+        rate_burst
+            允许的最大突发请求数，即令牌桶容量，默认与 ``rate_limit`` 相同
+        max_concurrency
+            每个 MUSIC 服务的最大并发请求数，默认不限制。同一进程中访问同一服务的所有客户端和线程共用限额。
+        endpoints
+            多个 MUSIC 服务节点，每项为 ``"ip:port"`` 字符串或 ``(ip, port)`` 元组，字符串形式时以逗号分隔。
+            默认只使用 ``server_ip`` 和 ``server_port``。设置后 ``server_ip`` 和 ``server_port`` 默认为第一个节点。
+        load_balance
+            负载均衡策略，``round_robin`` (默认) 或 ``least_latency``
+        eject_time
+            节点连续 3 次请求出错或超过 ``slow_threshold`` 后暂时不再使用的时间，单位秒，默认 30 秒。
+            请求重试时优先选择其他可用节点。
+        slow_threshold
+            慢请求阈值，单位秒，默认不检查
+        dtype
+            格点数据 (``callAPI_to_gridArray2D`` 等) 的数据类型，``float64`` (默认) 或 ``float32``。
+            MUSIC 服务以 float32 传输格点数据，设为 ``float32`` 时数据和经纬度坐标均不转换，内存占用减半。
+            可以在调用 ``callAPI_to_grid*`` 方法时单独设置。
+        lazy_decode
+            是否延迟解码，默认为 ``False``。设为 ``True`` 时返回结果只解析请求信息 ``request`` 等少量字段，
+            数据字段 (``Array2D.columns``、``GridArray2D.data`` 等) 在首次访问时才解码，
+            也可以调用 ``decode()`` 方法在其他线程中解码。只检查 ``request.error_code`` 和 ``row_count`` 后丢弃的结果不需要解码。
+        cache
+            磁盘缓存，``ResponseCache`` 对象或缓存目录，默认不使用缓存。
+            缓存键由接口、方法、``server_id`` 和请求参数确定，不包括签名参数。
+            命中缓存时直接解码缓存的原始数据，不发送请求。只缓存成功的请求。
+            文件列表、下载文件和最新时次 (``latestTime``) 等结果随时间变化的请求不使用缓存。
+        result_cache_size
+            检索结果内存缓存的最大大小，单位字节，默认不使用。
+            设置后 ``retrieve_obs_station``、``retrieve_model_grid`` 等函数使用该客户端时，
+            相同参数的检索直接返回缓存中已解码的 ``pd.DataFrame`` 或 ``xr.DataArray``，参见 ``ResultCache``。
+            最新时次 (``time`` 为 ``pd.Timedelta``) 的检索不使用缓存。
         """
         self.server_ip = server_ip
         self.server_port = server_port
@@ -92,7 +203,33 @@ class CMADaaSClient:
         self.user = user
         self.password = password
 
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.download_chunk_size = download_chunk_size
+        self.download_workers = download_workers
+        self.download_host_limit = download_host_limit
+
+        self.retry_policy = retry_policy
+        self.retry_stats = RetryStats()
+
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.max_concurrency = max_concurrency
+
+        self.endpoints = endpoints
+        self.load_balance = load_balance
+        self.eject_time = eject_time
+        self.slow_threshold = slow_threshold
+
+        self.dtype = np.dtype(np.float64) if dtype is None else np.dtype(dtype)
+        self.lazy_decode = lazy_decode
+
+        self.cache = cache
+        self.result_cache_size = result_cache_size
+        self.result_cache: Optional[ResultCache] = None
+
         self._connection = None
+        self._download_executor = None
 
         # 数据读取URL
         #   http://ip:port/music-ws/api?serviceNodeId=serverId&
@@ -106,20 +243,81 @@ class CMADaaSClient:
         if config is not None:
             self._load_config(config)
 
+        if self.keep_alive is None:
+            self.keep_alive = True
+
+        if self.retry_policy is None:
+            self.retry_policy = RetryPolicy(max_attempts=1)
+
+        if self.server_ip is None and self.endpoints is not None:
+            self.server_ip, self.server_port = self._get_endpoints()[0]
+
+        if isinstance(self.cache, (str, pathlib.Path)):
+            self.cache = ResponseCache(self.cache)
+
+        if self.result_cache_size is not None:
+            self.result_cache = ResultCache(self.result_cache_size)
+
+        self._endpoint_pool = self._create_endpoint_pool()
+
         self.create_connect(self.user, self.password)
 
     def create_connect(self, user: str, password: str):
         self.user = user
         self.password = password
-        self._connection = Connection(connect_timeout=self.connect_timeout, read_timeout=self.read_timeout)
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = Connection(
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            pool_size=self.pool_size,
+            keep_alive=self.keep_alive,
+            download_chunk_size=self.download_chunk_size,
+        )
+        self._download_executor = DownloadExecutor(
+            self._connection,
+            max_workers=self.download_workers,
+            max_per_host=self.download_host_limit,
+            retry_policy=self.retry_policy,
+            retry_stats=self.retry_stats,
+        )
+
+    def close(self):
+        """
+        关闭客户端，释放连接池中的 HTTP 连接。
+        """
+        if self._connection is not None:
+            self._connection.close()
+
+    def __enter__(self) -> "CMADaaSClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def callAPI_to_array2D(
             self,
             interface_id: str,
             params: Dict,
-            server_id: str = None
+            server_id: str = None,
+            schema: Optional[ElementSchema] = None,
     ) -> Array2D:
-        array_2d = Array2D()
+        """
+        检索二维表格数据
+
+        Parameters
+        ----------
+        interface_id
+        params
+        server_id
+        schema
+            要素类型表，键为要素名称，值为 numpy 数据类型。未设置的要素根据名称确定类型，参见 ``get_element_dtype``。
+
+        Returns
+        -------
+        Array2D
+        """
+        array_2d = Array2D(schema=schema, lazy=self.lazy_decode)
 
         method = self.callAPI_to_array2D.__name__
 
@@ -133,13 +331,73 @@ class CMADaaSClient:
             exception_handler=Connection.generate_exception_handler(array_2d),
         )
 
+    def callAPI_to_array2D_batches(
+            self,
+            interface_id: str,
+            params: Dict,
+            batch_size: Optional[int] = None,
+            element_names: Optional[List[str]] = None,
+            server_id: str = None,
+            schema: Optional[ElementSchema] = None,
+            output: str = "pandas",
+    ) -> Array2DBatches:
+        """
+        流式检索二维表格数据，在接收数据的同时按行分批返回结果
+
+        内存占用与 ``batch_size`` 有关，与总行数无关，适合检索大量站点数据。
+        遍历返回值时才发送请求，数据传输开始后出错不会重试。
+
+        Parameters
+        ----------
+        interface_id
+        params
+        batch_size
+            每批的行数
+        element_names
+            要素名称。返回数据中要素名称位于数据之后，需要提前确定列数，默认使用 ``params["elements"]``。
+            没有设置时只能在全部数据接收完成后返回结果。
+        server_id
+        schema
+            要素类型表，参见 ``callAPI_to_array2D``
+        output
+            批次格式，``pandas`` 返回 ``pd.DataFrame``，``records`` 返回 ``np.recarray``
+
+        Returns
+        -------
+        Array2DBatches
+            可迭代对象，遍历结束后检查 ``request.error_code``
+
+        Examples
+        --------
+        >>> batches = client.callAPI_to_array2D_batches("getSurfEleByTime", params, batch_size=100000)
+        >>> for df in batches:
+        ...     process(df)
+        >>> assert batches.request.error_code == 0
+        """
+        if element_names is None and "elements" in params:
+            element_names = params["elements"].split(",")
+
+        reader = Array2DBatchReader(
+            element_names=element_names,
+            batch_size=batch_size,
+            schema=schema,
+            output=output,
+        )
+        method = self.callAPI_to_array2D.__name__
+
+        return Array2DBatches(
+            reader,
+            lambda: self._iter_response(interface_id, method, params, server_id),
+        )
+
     def callAPI_to_gridArray2D(
             self,
             interface_id: str,
             params: Dict,
-            server_id: str = None
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
     ) -> GridArray2D:
-        data = GridArray2D()
+        data = GridArray2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode)
 
         method = self.callAPI_to_gridArray2D.__name__
 
@@ -153,6 +411,11 @@ class CMADaaSClient:
             exception_handler=Connection.generate_exception_handler(data),
         )
 
+    def _get_dtype(self, dtype: Optional[DTypeLike] = None) -> DTypeLike:
+        if dtype is None:
+            return self.dtype
+        return dtype
+
     def callAPI_to_fileList(
             self,
             interface_id: str,
@@ -219,7 +482,27 @@ class CMADaaSClient:
         data_format: str,
         file_name: str,
         server_id: str = None,
+        resume: bool = False,
     ) -> FilesInfo:
+        """
+        将检索结果保存为服务器端文件，并下载到 ``file_name``。
+
+        Parameters
+        ----------
+        interface_id
+        params
+        data_format
+            文件格式
+        file_name
+            保存路径
+        server_id
+        resume
+            是否启用断点续传，参见 ``callAPI_to_downFile``
+
+        Returns
+        -------
+        FilesInfo
+        """
         data = FilesInfo()
 
         if "dataFormat" not in params:
@@ -228,36 +511,39 @@ class CMADaaSClient:
         method = self.callAPI_to_saveAsFile.__name__
 
         if file_name is None:
-            data.request.errorCode = Connection.otherError
-            data.request.errorMessage = (
+            data.request.error_code = Connection.otherError
+            data.request.error_message = (
                 "error:savePath can't null, the format is dir/file.formart. "
                 "For example /data/saveas.xml)")
             return data
 
         params["savepath"] = file_name
 
-        def handle_success(content: bytes):
-            loaded_data = Connection.generate_pack_success_handler(data)(content)
-            if loaded_data.request.error_code != 0:
-                return loaded_data
-
-            result = self._connection.download_file(
-                loaded_data.files_info[0].file_url, file_name
-            )
-            if result[0] != 0:
-                loaded_data.request.errorCode = result[0]
-                loaded_data.request.errorMessage = result[1]
-            return loaded_data
-
-        return self._do_request(
+        loaded_data = self._do_request(
             interface_id,
             method,
             params,
             server_id,
-            success_handler=handle_success,
+            success_handler=Connection.generate_pack_success_handler(data),
             failure_handler=Connection.generate_pack_failure_handler(data),
             exception_handler=Connection.generate_exception_handler(data),
         )
+        if loaded_data.request.error_code != 0:
+            return loaded_data
+
+        file_info = loaded_data.files_info[0]
+        result = self._download_executor.download(
+            [DownloadTask(
+                file_info.file_url,
+                file_name,
+                get_file_size(file_info.size),
+            )],
+            resume=resume,
+        )[0]
+        if result[0] != 0:
+            loaded_data.request.error_code = result[0]
+            loaded_data.request.error_message = result[1]
+        return loaded_data
 
     def callAPI_to_downFile(
         self,
@@ -265,7 +551,33 @@ class CMADaaSClient:
         params: Dict,
         file_dir: Union[str, pathlib.Path],
         server_id: str = None,
+        max_workers: Optional[int] = None,
+        resume: bool = False,
     ) -> FilesInfo:
+        """
+        检索文件列表并下载全部文件到 ``file_dir`` 目录。
+
+        多个文件并发下载，每个文件的下载结果保存在 ``FileInfo.download_error`` 中，
+        某个文件下载失败不会中止其他文件的下载。
+        如有文件下载失败，返回对象的 ``request`` 中记录第一个失败文件的错误信息。
+
+        Parameters
+        ----------
+        interface_id
+        params
+        file_dir
+            保存目录
+        server_id
+        max_workers
+            最大并发下载数，默认使用 ``download_workers``
+        resume
+            是否启用断点续传。启用后保留未完成的 ``.part`` 临时文件，再次下载时从中断处继续，
+            已存在的完整文件不再重复下载。无论是否启用，下载完成后都检查文件大小是否与 ``FileInfo.size`` 一致。
+
+        Returns
+        -------
+        FilesInfo
+        """
         file_dir_path = file_dir
         if isinstance(file_dir_path, str):
             file_dir_path = pathlib.Path(file_dir)
@@ -274,31 +586,38 @@ class CMADaaSClient:
 
         method = self.callAPI_to_fileList.__name__
 
-        def success_handler(content: bytes):
-            files_info = Connection.generate_pack_success_handler(data)(content)
-            if files_info.request.error_code != 0:
-                return files_info
-
-            for file_info in files_info.files_info:
-                result = self._connection.download_file(
-                    file_info.file_url, file_dir_path.joinpath(file_info.file_name)
-                )
-                if result[0] != 0:
-                    files_info.request.errorCode = result[0]
-                    files_info.request.errorMessage = result[1]
-                    return files_info
-
-            return files_info
-
-        return self._do_request(
+        files_info = self._do_request(
             interface_id,
             method,
             params,
             server_id,
-            success_handler=success_handler,
+            success_handler=Connection.generate_pack_success_handler(data),
             failure_handler=Connection.generate_pack_failure_handler(data),
             exception_handler=Connection.generate_exception_handler(data),
         )
+        if files_info.request.error_code != 0:
+            return files_info
+
+        tasks = [
+            DownloadTask(
+                file_info.file_url,
+                file_dir_path.joinpath(file_info.file_name),
+                get_file_size(file_info.size),
+            )
+            for file_info in files_info.files_info
+        ]
+        results = self._download_executor.download(tasks, max_workers=max_workers, resume=resume)
+
+        for file_info, (error_code, error_message) in zip(files_info.files_info, results):
+            if error_code == 0:
+                continue
+            logger.warning(f"download failed {file_info.file_name}: {error_code} {error_message}")
+            file_info.download_error = MusicError(code=error_code, message=error_message)
+            if files_info.request.error_code == 0:
+                files_info.request.error_code = error_code
+                files_info.request.error_message = error_message
+
+        return files_info
 
     def callAPI_to_dataBlock(
             self,
@@ -307,7 +626,7 @@ class CMADaaSClient:
             server_id: str = None
     ) -> DataBlock:
         warnings.warn("callAPI_to_dataBlock is not tested")
-        data_block = DataBlock()
+        data_block = DataBlock(lazy=self.lazy_decode)
 
         method = self.callAPI_to_dataBlock.__name__
 
@@ -325,10 +644,11 @@ class CMADaaSClient:
             self,
             interface_id: str,
             params: Dict,
-            server_id: str = None
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
     ) -> GridScalar2D:
         warnings.warn("callAPI_to_gridScalar2D is not tested")
-        data = GridScalar2D()
+        data = GridScalar2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode)
 
         method = self.callAPI_to_gridScalar2D.__name__
 
@@ -346,10 +666,11 @@ class CMADaaSClient:
             self,
             interface_id: str,
             params: Dict,
-            server_id: str = None
+            server_id: str = None,
+            dtype: Optional[DTypeLike] = None,
     ) -> GridVector2D:
         # warnings.warn("callAPI_to_gridVector2D is not tested")
-        data = GridVector2D()
+        data = GridVector2D(dtype=self._get_dtype(dtype), lazy=self.lazy_decode)
 
         method = self.callAPI_to_gridVector2D.__name__
 
@@ -376,6 +697,24 @@ class CMADaaSClient:
         cf = configparser.ConfigParser()
         cf.read(config_file)
 
+        if self.endpoints is None and cf.has_option("Pb", "music_servers"):
+            self.endpoints = parse_endpoints(
+                cf.get("Pb", "music_servers"),
+                default_port=cf.getint("Pb", "music_port", fallback=None),
+            )
+
+        if self.load_balance is None and cf.has_option("Pb", "music_loadBalance"):
+            self.load_balance = cf.get("Pb", "music_loadBalance")
+
+        if self.eject_time is None and cf.has_option("Pb", "music_ejectTime"):
+            self.eject_time = cf.getfloat("Pb", "music_ejectTime")
+
+        if self.slow_threshold is None and cf.has_option("Pb", "music_slowThreshold"):
+            self.slow_threshold = cf.getfloat("Pb", "music_slowThreshold")
+
+        if self.server_ip is None and self.endpoints is not None:
+            self.server_ip, self.server_port = self._get_endpoints()[0]
+
         if self.server_ip is None:
             self.server_ip = cf.get("Pb", "music_server")
 
@@ -391,6 +730,38 @@ class CMADaaSClient:
         if self.read_timeout is None:
             self.read_timeout = int(cf.get("Pb", "music_readTimeout"))
 
+        if self.pool_size is None and cf.has_option("Pb", "music_poolSize"):
+            self.pool_size = cf.getint("Pb", "music_poolSize")
+
+        if self.keep_alive is None and cf.has_option("Pb", "music_keepAlive"):
+            self.keep_alive = cf.getboolean("Pb", "music_keepAlive")
+
+        if self.retry_policy is None and cf.has_option("Pb", "music_maxAttempts"):
+            self.retry_policy = RetryPolicy(
+                max_attempts=cf.getint("Pb", "music_maxAttempts"),
+                backoff_base=cf.getfloat("Pb", "music_retryBackoff", fallback=RetryPolicy.backoff_base),
+            )
+
+        if self.rate_limit is None and cf.has_option("Pb", "music_rateLimit"):
+            self.rate_limit = cf.getfloat("Pb", "music_rateLimit")
+
+        if self.rate_burst is None and cf.has_option("Pb", "music_rateBurst"):
+            self.rate_burst = cf.getint("Pb", "music_rateBurst")
+
+        if self.max_concurrency is None and cf.has_option("Pb", "music_maxConcurrency"):
+            self.max_concurrency = cf.getint("Pb", "music_maxConcurrency")
+
+        if self.cache is None and cf.has_option("Pb", "music_cacheDir"):
+            max_size = cf.getfloat("Pb", "music_cacheMaxSize", fallback=None)
+            self.cache = ResponseCache(
+                cf.get("Pb", "music_cacheDir"),
+                max_size=None if max_size is None else int(max_size * 1024 * 1024),
+                ttl=cf.getfloat("Pb", "music_cacheTTL", fallback=None),
+            )
+
+        if self.result_cache_size is None and cf.has_option("Pb", "music_resultCacheSize"):
+            self.result_cache_size = int(cf.getfloat("Pb", "music_resultCacheSize") * 1024 * 1024)
+
     def _load_config(self, config: Dict):
         auth_config = config["auth"]
         server_config = config["server"]
@@ -400,6 +771,24 @@ class CMADaaSClient:
         if self.password is None:
             self.password = auth_config["password"]
 
+        if self.endpoints is None and "music_servers" in server_config:
+            self.endpoints = parse_endpoints(
+                server_config["music_servers"],
+                default_port=server_config.get("music_port", None),
+            )
+
+        if self.load_balance is None:
+            self.load_balance = server_config.get("music_loadBalance", None)
+
+        if self.eject_time is None:
+            self.eject_time = server_config.get("music_ejectTime", None)
+
+        if self.slow_threshold is None:
+            self.slow_threshold = server_config.get("music_slowThreshold", None)
+
+        if self.server_ip is None and self.endpoints is not None:
+            self.server_ip, self.server_port = self._get_endpoints()[0]
+
         if self.server_ip is None:
             self.server_ip = server_config["music_server"]
 
@@ -415,18 +804,121 @@ class CMADaaSClient:
         if self.read_timeout is None:
             self.read_timeout = server_config["music_readTimeout"]
 
+        if self.pool_size is None:
+            self.pool_size = server_config.get("music_poolSize", None)
+
+        if self.keep_alive is None:
+            self.keep_alive = server_config.get("music_keepAlive", None)
+
+        if self.retry_policy is None and "music_maxAttempts" in server_config:
+            self.retry_policy = RetryPolicy(
+                max_attempts=server_config["music_maxAttempts"],
+                backoff_base=server_config.get("music_retryBackoff", RetryPolicy.backoff_base),
+            )
+
+        if self.rate_limit is None:
+            self.rate_limit = server_config.get("music_rateLimit", None)
+
+        if self.rate_burst is None:
+            self.rate_burst = server_config.get("music_rateBurst", None)
+
+        if self.max_concurrency is None:
+            self.max_concurrency = server_config.get("music_maxConcurrency", None)
+
+        if self.cache is None and "music_cacheDir" in server_config:
+            max_size = server_config.get("music_cacheMaxSize", None)
+            self.cache = ResponseCache(
+                server_config["music_cacheDir"],
+                max_size=None if max_size is None else int(max_size * 1024 * 1024),
+                ttl=server_config.get("music_cacheTTL", None),
+            )
+
+        if self.result_cache_size is None and "music_resultCacheSize" in server_config:
+            self.result_cache_size = int(server_config["music_resultCacheSize"] * 1024 * 1024)
+
+    def get_throttle(
+            self,
+            server_id: Optional[str] = None,
+            server_ip: Optional[str] = None,
+    ) -> Optional[ServerThrottle]:
+        """
+        返回 MUSIC 服务的限速对象，未设置限速和并发限制时返回 None
+
+        Parameters
+        ----------
+        server_id
+            服务节点 id，默认使用 ``self.server_id``
+        server_ip
+            服务器 ip，默认使用 ``self.server_ip``
+
+        Returns
+        -------
+        Optional[ServerThrottle]
+        """
+        if server_id is None:
+            server_id = self.server_id
+        if server_ip is None:
+            server_ip = self.server_ip
+        return get_server_throttle(
+            server_ip,
+            server_id,
+            rate_limit=self.rate_limit,
+            rate_burst=self.rate_burst,
+            max_concurrency=self.max_concurrency,
+        )
+
+    def get_endpoints(self) -> List[Endpoint]:
+        """
+        返回 MUSIC 服务节点列表，包含每个节点的健康状态
+        """
+        return self._endpoint_pool.endpoints
+
+    def _get_endpoints(self) -> List[Tuple[str, int]]:
+        if self.endpoints is None:
+            return [(self.server_ip, self.server_port)]
+        if isinstance(self.endpoints, str):
+            return parse_endpoints(self.endpoints, default_port=self.server_port)
+        return [
+            parse_endpoints([endpoint], default_port=self.server_port)[0] if isinstance(endpoint, str)
+            else (endpoint[0], int(endpoint[1]))
+            for endpoint in self.endpoints
+        ]
+
+    def _create_endpoint_pool(self) -> EndpointPool:
+        kwargs = dict()
+        if self.eject_time is not None:
+            kwargs["eject_time"] = self.eject_time
+        return EndpointPool(
+            [Endpoint(server_ip, server_port) for server_ip, server_port in self._get_endpoints()],
+            strategy=self.load_balance,
+            slow_threshold=self.slow_threshold,
+            **kwargs,
+        )
+
+    def _report_endpoint(self, endpoint: Endpoint, outcome: RequestOutcome, latency: float):
+        if outcome.is_connection_error:
+            self._endpoint_pool.report_failure(endpoint)
+        else:
+            self._endpoint_pool.report_success(endpoint, latency)
+
     def _get_fetch_url(
             self,
             interface_id: str,
             method: str,
             params: Dict,
             server_id: str = None,
+            endpoint: Optional[Endpoint] = None,
     ) -> str:
         if server_id is None:
             server_id = self.server_id
 
+        if endpoint is None:
+            server_ip, server_port = self.server_ip, self.server_port
+        else:
+            server_ip, server_port = endpoint.server_ip, endpoint.server_port
+
         basic_url = self.basic_url.format(
-            server_ip=self.server_ip, server_port=self.server_port, server_id=server_id
+            server_ip=server_ip, server_port=server_port, server_id=server_id
         )
 
         fetch_url = (
@@ -471,18 +963,139 @@ class CMADaaSClient:
             failure_handler: Callable[[bytes], Any],
             exception_handler: Callable[[Exception], Any],
     ):
+        content, success_handler = self._prepare_cache(interface_id, method, params, server_id, success_handler)
+        if content is not None:
+            return success_handler(content)
+
+        retry_loop = RetryLoop(self.retry_policy, self.retry_stats)
+        failed_endpoints = []
+        while True:
+            attempt = self._create_attempt(interface_id, method, params, server_id, exclude=failed_endpoints)
+            with attempt.slot():
+                attempt.start(retry_loop)
+                result = self._connection.make_request(
+                    attempt.fetch_url,
+                    success_handler,
+                    attempt.outcome.wrap_failure_handler(failure_handler),
+                    attempt.outcome.wrap_exception_handler(exception_handler),
+                )
+                delay = self._finish_attempt(attempt, result, retry_loop, failed_endpoints)
+            if delay is None:
+                return result
+            time.sleep(delay)
+
+    def _prepare_cache(
+            self,
+            interface_id: str,
+            method: str,
+            params: Dict,
+            server_id: str,
+            success_handler: Callable[[bytes], Any],
+    ) -> Tuple[Optional[bytes], Callable[[bytes], Any]]:
+        """
+        查找磁盘缓存，同步和异步客户端共用
+
+        Returns
+        -------
+        Tuple[Optional[bytes], Callable[[bytes], Any]]
+            缓存的原始数据和成功回调函数。没有命中缓存时原始数据为 None，回调函数会将结果写入缓存
+        """
+        cache_key = self._get_cache_key(interface_id, method, params, server_id)
+        if cache_key is None:
+            return None, success_handler
+        content = self.cache.get(cache_key)
+        if content is not None:
+            logger.info(f"load from cache: {interface_id} {method}")
+            return content, success_handler
+        return None, self._wrap_cache_handler(success_handler, cache_key, params)
+
+    def _create_attempt(
+            self,
+            interface_id: str,
+            method: str,
+            params: Dict,
+            server_id: str,
+            exclude: Iterable[Endpoint] = (),
+    ) -> "_RequestAttempt":
+        # 每次请求重新选择节点并重新生成签名，重试时优先选择其他节点
+        endpoint = self._endpoint_pool.select(exclude=exclude)
         fetch_url = self._get_fetch_url(
-            interface_id, method, params, server_id
+            interface_id, method, params, server_id, endpoint=endpoint
         )
         logger.info(f"fetch url: {fetch_url}")
+        return _RequestAttempt(endpoint, fetch_url, self.get_throttle(server_id, endpoint.server_ip))
 
-        result = self._connection.make_request(
-            fetch_url,
-            success_handler,
-            failure_handler,
-            exception_handler
-        )
-        return result
+    def _finish_attempt(
+            self,
+            attempt: "_RequestAttempt",
+            result: Any,
+            retry_loop: RetryLoop,
+            failed_endpoints: List[Endpoint],
+    ) -> Optional[float]:
+        """
+        记录节点状态，返回重试前的等待时间，不需要重试时返回 None
+        """
+        self._report_endpoint(attempt.endpoint, attempt.outcome, attempt.get_elapsed_time())
+        attempt.outcome.update_from_result(result)
+        if attempt.outcome.error_code not in (None, 0):
+            failed_endpoints.append(attempt.endpoint)
+        return retry_loop.get_retry_delay(attempt.outcome)
+
+    def get_result_cache(self, use_cache: bool = True) -> Optional[ResultCache]:
+        """
+        返回检索结果内存缓存，没有设置或 ``use_cache`` 为 ``False`` 时返回 None
+        """
+        if not use_cache:
+            return None
+        return self.result_cache
+
+    def _get_cache_key(self, interface_id: str, method: str, params: Dict, server_id: str) -> Optional[str]:
+        if self.cache is None or not is_cacheable_request(interface_id, method, params):
+            return None
+        if server_id is None:
+            server_id = self.server_id
+        return make_cache_key(interface_id, method, params, server_id)
+
+    def _wrap_cache_handler(
+            self,
+            success_handler: Callable[[bytes], Any],
+            cache_key: str,
+            params: Dict,
+    ) -> Callable[[bytes], Any]:
+        """
+        返回结果中的错误码为 0 时将原始数据写入缓存
+        """
+        def handle_success(content: bytes) -> Any:
+            result = success_handler(content)
+            outcome = RequestOutcome()
+            outcome.update_from_result(result)
+            if outcome.error_code in (None, 0):
+                self.cache.put(cache_key, content, data_code=params.get("dataCode", None))
+            return result
+
+        return handle_success
+
+    def _iter_response(
+            self,
+            interface_id: str,
+            method: str,
+            params: Dict,
+            server_id: str,
+    ) -> Iterator[bytes]:
+        attempt = self._create_attempt(interface_id, method, params, server_id)
+        with attempt.slot():
+            attempt.start(RetryLoop(self.retry_policy, self.retry_stats))
+            reported = False
+            try:
+                for chunk in self._connection.iter_response(attempt.fetch_url):
+                    if not reported:
+                        # 使用收到第一个数据块的耗时作为节点的响应时间
+                        self._endpoint_pool.report_success(attempt.endpoint, attempt.get_elapsed_time())
+                        reported = True
+                    yield chunk
+            except requests.exceptions.RequestException:
+                self._endpoint_pool.report_failure(attempt.endpoint)
+                raise
 
     @staticmethod
     def _get_sign(sign_params: Dict) -> str:
@@ -512,3 +1125,39 @@ class CMADaaSClient:
 
         sign = hashlib.md5(param_string.encode(encoding='UTF-8')).hexdigest().upper()
         return sign
+
+
+class _RequestAttempt:
+    """
+    一次请求尝试使用的节点、带签名的 URL 和限速对象，同步和异步客户端共用
+
+    Attributes
+    ----------
+    endpoint
+        服务节点
+    fetch_url
+        带签名的请求 URL
+    throttle
+        节点的限速对象，没有设置时为 None
+    outcome
+        记录本次请求的错误码
+    """
+    def __init__(self, endpoint: Endpoint, fetch_url: str, throttle: Optional[ServerThrottle]):
+        self.endpoint = endpoint
+        self.fetch_url = fetch_url
+        self.throttle = throttle
+        self.outcome = RequestOutcome()
+        self._start_time = None
+
+    def slot(self):
+        return self.throttle.slot() if self.throttle is not None else contextlib.nullcontext()
+
+    def async_slot(self):
+        return self.throttle.async_slot() if self.throttle is not None else contextlib.nullcontext()
+
+    def start(self, retry_loop: RetryLoop):
+        retry_loop.start_attempt()
+        self._start_time = time.perf_counter()
+
+    def get_elapsed_time(self) -> float:
+        return time.perf_counter() - self._start_time
@@ -1,8 +1,11 @@
 import json
 import pathlib
-from typing import Callable, Any, Union, Tuple, Optional
+import threading
+import time
+from typing import Callable, Any, Union, Tuple, Optional, Iterator, Dict, IO
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from nuwe_cmadaas._log import logger
 
@@ -21,18 +24,76 @@ class Connection:
         连接超时，单位秒
     read_timeout : float
         读取超时，单位秒
+    pool_size : int
+        连接池大小，即每个服务器保持的最大连接数
+    keep_alive : bool
+        是否复用 HTTP 连接 (keep-alive)
+    download_chunk_size : int
+        下载文件时每次读取的字节数
     """
     getwayFlag = b'"flag":"slb"'
     otherError = -10001
 
+    defaultPoolSize = 10
+    defaultDownloadChunkSize = 1024 * 1024
+
     def __init__(
             self,
             connect_timeout: float,
             read_timeout: float,
+            pool_size: Optional[int] = None,
+            keep_alive: bool = True,
+            download_chunk_size: Optional[int] = None,
     ):
         self.connect_timeout = connect_timeout
         self.read_timeout = read_timeout
 
+        if pool_size is None:
+            pool_size = Connection.defaultPoolSize
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+
+        if download_chunk_size is None:
+            download_chunk_size = Connection.defaultDownloadChunkSize
+        self.download_chunk_size = download_chunk_size
+
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        共享的 HTTP 会话，首次访问时创建。
+
+        会话底层的连接池是线程安全的，多个线程可以共用同一个 ``Connection`` 对象。
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def close(self):
+        """
+        关闭 HTTP 会话，释放连接池中的所有连接。
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
     def make_request(
             self,
             fetch_url: str,
@@ -59,7 +120,7 @@ class Connection:
         ResponseData
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 fetch_url,
                 timeout=(self.connect_timeout, self.read_timeout),
                 stream=True,
@@ -74,28 +135,129 @@ class Connection:
 
         return success_handler(response_content)
 
+    def iter_response(self, fetch_url: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        流式读取响应内容，每次返回一个数据块。
+
+        Parameters
+        ----------
+        fetch_url
+            由``CMADaaSClient``生成的URL
+        chunk_size
+            每次读取的字节数，默认使用 ``download_chunk_size``
+
+        Raises
+        ------
+        requests.exceptions.RequestException
+            网络错误
+        """
+        if chunk_size is None:
+            chunk_size = self.download_chunk_size
+
+        with self.session.get(
+            fetch_url,
+            timeout=(self.connect_timeout, self.read_timeout),
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=chunk_size)
+
     def download_file(
-        self, file_url: str, save_file: Union[str, pathlib.Path]
+        self,
+        file_url: str,
+        save_file: Union[str, pathlib.Path],
+        chunk_size: Optional[int] = None,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
     ) -> Tuple[int, Optional[str]]:
+        """
+        流式下载文件。
+
+        数据分块写入同目录下的临时文件 ``<save_file>.part``，下载完成后重命名为 ``save_file``，
+        内存占用只与 ``chunk_size`` 有关，与文件大小无关。
+
+        默认下载失败时删除临时文件。启用断点续传 (``resume=True``) 时保留临时文件，
+        再次下载时使用 HTTP Range 请求从临时文件末尾继续下载。服务器不支持 Range 请求时从头下载。
+
+        Parameters
+        ----------
+        file_url
+            文件 URL
+        save_file
+            保存路径
+        chunk_size
+            每次读取的字节数，默认使用 ``download_chunk_size``
+        resume
+            是否启用断点续传
+        expected_size
+            文件大小，单位字节。如果设置，下载完成后检查文件大小。
+            启用断点续传时，如果 ``save_file`` 已存在且大小一致，则跳过下载；
+            如果临时文件大小已经一致，则直接重命名为 ``save_file``。
+
+        Returns
+        -------
+        Tuple[int, Optional[str]]
+            错误码和错误信息，成功时返回 ``(0, None)``
+        """
+        if chunk_size is None:
+            chunk_size = self.download_chunk_size
+
+        download = PartialDownload(save_file, resume=resume, expected_size=expected_size)
+        if download.is_complete():
+            return 0, None
+
+        headers = download.prepare()
+        if download.is_part_complete():
+            return download.finish()
+
         try:
-            response = requests.get(file_url, stream=True)
-            response_content = response.content
-            if self._check_getway_flag(response_content):
-                getway_info = json.loads(response_content)
-                if getway_info is None:
-                    return Connection.otherError, "parse getway return string error!"
-                else:
-                    return getway_info["returnCode"], getway_info["returnMessage"]
+            with self.session.get(
+                file_url,
+                headers=headers,
+                timeout=(self.connect_timeout, self.read_timeout),
+                stream=True,
+            ) as response:
+                if response.status_code == 416 and download.offset > 0:
+                    download.restart()
+                    return self.download_file(
+                        file_url, save_file, chunk_size=chunk_size, resume=resume, expected_size=expected_size
+                    )
+
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size=chunk_size)
+                first_chunk = next(chunks, b"")
+
+                is_partial = response.status_code == 206
+                if not is_partial and self._check_getway_flag(first_chunk):
+                    return self._parse_getway_error(first_chunk + b"".join(chunks))
 
-            with open(save_file, "wb") as f:
-                f.write(response_content)
+                with download.open(is_partial) as f:
+                    download.write(f, first_chunk)
+                    for chunk in chunks:
+                        download.write(f, chunk)
+
+            return download.finish()
 
         except requests.exceptions.RequestException as e:  # http error
-            return Connection.otherError, "request error"
+            logger.warning(f"download error: {e}")
+            return download.fail("request error")
         except IOError:
-            return Connection.otherError, "create file error"
+            return download.fail("create file error")
 
-        return 0, None
+    @classmethod
+    def _parse_getway_error(cls, response_content: bytes) -> Tuple[int, str]:
+        getway_info = json.loads(response_content)
+        if getway_info is None:
+            return Connection.otherError, "parse getway return string error!"
+        else:
+            return getway_info["returnCode"], getway_info["returnMessage"]
+
+    @classmethod
+    def _remove_file(cls, file_path: pathlib.Path):
+        try:
+            file_path.unlink(missing_ok=True)
+        except OSError:
+            pass
 
     @classmethod
     def generate_pack_failure_handler(
@@ -110,13 +272,13 @@ class Connection:
         def failure_handler(response_content: bytes) -> ResponseData:
             getway_info = json.loads(response_content)
             if getway_info is None:
-                response_data.request.errorCode = Connection.otherError
-                response_data.request.errorMessage = (
+                response_data.request.error_code = Connection.otherError
+                response_data.request.error_message = (
                         "parse getway return string error:" + response_content.decode('utf-8')
                 )
             else:
-                response_data.request.errorCode = getway_info["returnCode"]
-                response_data.request.errorMessage = getway_info["returnMessage"]
+                response_data.request.error_code = getway_info["returnCode"]
+                response_data.request.error_message = getway_info["returnMessage"]
             return response_data
 
         return failure_handler
@@ -128,8 +290,8 @@ class Connection:
     ) -> Callable[[Exception], ResponseData]:
         def handle_exception(e: Exception) -> ResponseData:
             logger.warning(f"Error retrieving data: {e}")
-            response_data.request.errorCode = Connection.otherError
-            response_data.request.errorMessage = "Error retrieving data"
+            response_data.request.error_code = Connection.otherError
+            response_data.request.error_message = "Error retrieving data"
             return response_data
 
         return handle_exception
@@ -161,3 +323,127 @@ class Connection:
     @classmethod
     def _check_getway_flag(cls, response_data: bytes) -> bool:
         return Connection.getwayFlag in response_data
+
+
+class PartialDownload:
+    """
+    单个文件下载的临时文件和断点续传状态，``Connection`` 和 ``AsyncConnection`` 共用。
+
+    数据写入同目录下的临时文件 ``<save_file>.part``，下载完成后检查文件大小并重命名为 ``save_file``。
+    启用断点续传时保留临时文件，并从临时文件末尾继续下载。
+
+    Attributes
+    ----------
+    save_path : pathlib.Path
+        保存路径
+    part_path : pathlib.Path
+        临时文件路径
+    resume : bool
+        是否启用断点续传
+    expected_size : Optional[int]
+        文件大小，单位字节，未知时为 None
+    offset : int
+        续传的起始位置
+    total_bytes : int
+        本次下载的字节数
+    """
+    def __init__(
+            self,
+            save_file: Union[str, pathlib.Path],
+            resume: bool = False,
+            expected_size: Optional[int] = None,
+    ):
+        self.save_path = pathlib.Path(save_file)
+        self.part_path = self.save_path.with_name(self.save_path.name + ".part")
+        self.resume = resume
+        self.expected_size = expected_size
+        self.offset = 0
+        self.total_bytes = 0
+        self._start_time = None
+
+    def is_complete(self) -> bool:
+        """
+        启用断点续传且 ``save_file`` 已存在、大小一致时返回 True，不需要下载
+        """
+        if not self.resume or self.expected_size is None or not self.save_path.exists():
+            return False
+        if self.save_path.stat().st_size != self.expected_size:
+            return False
+        logger.info(f"file exists, skip download: {self.save_path}")
+        return True
+
+    def prepare(self) -> Dict[str, str]:
+        """
+        确定续传位置并删除无效的临时文件，返回请求头
+        """
+        self.offset = 0
+        if self.resume and self.part_path.exists():
+            self.offset = self.part_path.stat().st_size
+            if self.expected_size is not None and self.offset > self.expected_size:
+                Connection._remove_file(self.part_path)
+                self.offset = 0
+        elif self.part_path.exists():
+            Connection._remove_file(self.part_path)
+
+        headers = dict()
+        if self.offset > 0:
+            headers["Range"] = f"bytes={self.offset}-"
+
+        self.total_bytes = 0
+        self._start_time = time.perf_counter()
+        return headers
+
+    def is_part_complete(self) -> bool:
+        """
+        启用断点续传且临时文件大小已经等于 ``expected_size`` 时返回 True，不需要再请求服务器，
+        直接调用 ``finish`` 完成下载。需要在 ``prepare`` 之后调用
+        """
+        return self.expected_size is not None and self.offset > 0 and self.offset == self.expected_size
+
+    def restart(self):
+        """
+        服务器返回 416 时删除临时文件。临时文件可能已经完整或已失效，需要从头下载
+        """
+        logger.info(f"range not satisfiable, download from start: {self.save_path.name}")
+        Connection._remove_file(self.part_path)
+
+    def open(self, is_partial: bool) -> IO[bytes]:
+        """
+        打开临时文件。服务器返回部分内容 (206) 时追加写入，否则覆盖
+        """
+        if is_partial:
+            logger.info(f"resume download {self.save_path.name} from {self.offset} bytes")
+            return open(self.part_path, "ab")
+        return open(self.part_path, "wb")
+
+    def write(self, f: IO[bytes], chunk: bytes):
+        f.write(chunk)
+        self.total_bytes += len(chunk)
+
+    def finish(self) -> Tuple[int, Optional[str]]:
+        """
+        检查文件大小并将临时文件重命名为 ``save_file``
+        """
+        if self.expected_size is not None:
+            file_size = self.part_path.stat().st_size
+            if file_size != self.expected_size:
+                if not self.resume or file_size > self.expected_size:
+                    Connection._remove_file(self.part_path)
+                return Connection.otherError, f"file size error: expected {self.expected_size}, got {file_size}"
+
+        self.part_path.replace(self.save_path)
+
+        elapsed_time = time.perf_counter() - self._start_time
+        speed = self.total_bytes / elapsed_time if elapsed_time > 0 else float("inf")
+        logger.info(
+            f"download {self.save_path.name}: {self.total_bytes} bytes in {elapsed_time:.2f}s, {speed:.0f} bytes/s"
+        )
+        return 0, None
+
+    def fail(self, error_message: str) -> Tuple[int, str]:
+        """
+        下载出错，未启用断点续传时删除临时文件
+        """
+        if not self.resume:
+            Connection._remove_file(self.part_path)
+        return Connection.otherError, error_message
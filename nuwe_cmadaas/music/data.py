@@ -1,11 +1,23 @@
-from typing import List
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from typing import List, Optional, Dict, Iterable, Tuple, Callable, TYPE_CHECKING
 from dataclasses import dataclass
 
 import numpy as np
-import pandas as pd
-import xarray as xr
+from numpy.typing import DTypeLike
 
+from nuwe_cmadaas._log import logger
 from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.music.element import ElementSchema, DATETIME_ELEMENT, get_element_dtype, decode_column, get_time_column
+from nuwe_cmadaas.music.wire import WireFormatError, split_packed_fields, read_packed_float32
+from nuwe_cmadaas.music.arrow import columns_to_arrow
+
+if TYPE_CHECKING:
+    # pandas 和 xarray 导入较慢，只在转换结果时导入
+    import pandas as pd
+    import xarray as xr
 
 
 @dataclass
@@ -60,13 +72,77 @@ class RequestInfo:
 
 
 class ResponseData:
+    """
+    返回结果基类
+
+    延迟解码模式 (``lazy=True``) 下，``load_from_protobuf_content`` 只解析请求信息 ``request`` 等少量字段，
+    ``lazy_attributes`` 中列出的数据字段在首次访问时才解码。
+    可以调用 ``decode`` 方法提前解码，例如在工作线程中解码。
+
+    Attributes
+    ----------
+    request : RequestInfo
+        请求信息
+    lazy : bool
+        是否延迟解码
+    """
+    # 延迟解码的属性
+    lazy_attributes = ()
+
     def __init__(
             self,
-            request: RequestInfo = None
+            request: RequestInfo = None,
+            lazy: bool = False,
     ):
         if request is None:
             request = RequestInfo()
         self.request = request
+        self.lazy = lazy
+        self._lazy_loader = None
+        self._lazy_lock = None
+
+    @property
+    def is_decoded(self) -> bool:
+        """
+        数据字段是否已经解码
+        """
+        return self.__dict__.get("_lazy_loader") is None
+
+    def decode(self):
+        """
+        解码延迟解码的数据字段。已经解码或不是延迟解码模式时直接返回。线程安全。
+        """
+        lock = self.__dict__.get("_lazy_lock")
+        if lock is None:
+            return
+        with lock:
+            loader = self._lazy_loader
+            if loader is None:
+                return
+            loader()
+            self._lazy_loader = None
+
+    def _defer(self, loader: Callable[[], None]):
+        """
+        设置延迟解码函数，首次访问 ``lazy_attributes`` 中的属性时调用
+        """
+        for name in self.lazy_attributes:
+            self.__dict__.pop(name, None)
+        self._lazy_lock = threading.Lock()
+        self._lazy_loader = loader
+
+    def __getattr__(self, name: str):
+        # 只在属性不存在时调用
+        if name in type(self).lazy_attributes and self.__dict__.get("_lazy_loader") is not None:
+            self.decode()
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getstate__(self) -> Dict:
+        self.decode()
+        state = self.__dict__.copy()
+        state["_lazy_lock"] = None
+        return state
 
     def load_from_protobuf_content(self, content: bytes):
         raise NotImplementedError()
@@ -84,8 +160,126 @@ class ResponseData:
         raise NotImplementedError()
 
 
+@lru_cache(maxsize=None)
+def _get_header_type(protobuf_object_type, excluded_field_names: Tuple[str, ...]):
+    """
+    返回去除 ``excluded_field_names`` 字段的消息类型，字段编号与 ``protobuf_object_type`` 相同。
+
+    使用该类型解析完整消息时，去除的字段作为未知字段跳过，不生成 Python 对象，
+    用于延迟解码模式下只读取请求信息等少量字段。
+    """
+    from google.protobuf import descriptor_pb2, message_factory
+
+    descriptor = protobuf_object_type.DESCRIPTOR
+    message_proto = descriptor_pb2.DescriptorProto()
+    descriptor.CopyToProto(message_proto)
+    fields = [field for field in message_proto.field if field.name not in excluded_field_names]
+    del message_proto.field[:]
+    message_proto.field.extend(fields)
+    message_proto.name = f"{descriptor.name}Header"
+
+    # 与原消息使用相同的 package 和 syntax，依赖原文件中的其他消息类型
+    original_file_proto = descriptor_pb2.FileDescriptorProto()
+    descriptor.file.CopyToProto(original_file_proto)
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=f"nuwe_cmadaas/{message_proto.name}.proto",
+        package=original_file_proto.package,
+        syntax=original_file_proto.syntax,
+        dependency=[original_file_proto.name],
+    )
+    file_proto.message_type.add().CopyFrom(message_proto)
+
+    pool = descriptor.file.pool
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName(f"{file_proto.package}.{message_proto.name}"))
+
+
+def _parse_header(protobuf_object_type, content: bytes, excluded_field_names: Tuple[str, ...]):
+    """
+    解析消息中除 ``excluded_field_names`` 以外的字段，参见 ``_get_header_type``
+    """
+    header = _get_header_type(protobuf_object_type, tuple(excluded_field_names))()
+    header.ParseFromString(content)
+    return header
+
+
+def _parse_packed_float_content(
+        protobuf_object_type,
+        content: bytes,
+        field_names: Iterable[str],
+) -> Tuple[object, Optional[Dict[str, np.ndarray]]]:
+    """
+    解析格点数据消息，``field_names`` 中的 float 数组字段直接从字节串读取为 float32 数组。
+
+    Returns
+    -------
+    Tuple[object, Optional[Dict[str, np.ndarray]]]
+        protobuf 对象 (不包含数组字段) 和数组字段。无法快速解码时返回完整解析的 protobuf 对象和 None。
+    """
+    fields = protobuf_object_type.DESCRIPTOR.fields_by_name
+    field_numbers = {fields[name].number: name for name in field_names}
+
+    protobuf_object = protobuf_object_type()
+    try:
+        segments, remaining_content = split_packed_fields(content, field_numbers.keys())
+        arrays = {
+            field_numbers[number]: read_packed_float32(content, field_segments)
+            for number, field_segments in segments.items()
+        }
+    except WireFormatError:
+        protobuf_object.ParseFromString(content)
+        return protobuf_object, None
+
+    protobuf_object.ParseFromString(remaining_content)
+    return protobuf_object, arrays
+
+
+def _get_float_dtype(dtype: Optional[DTypeLike]) -> np.dtype:
+    if dtype is None:
+        return np.dtype(np.float64)
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError(f"dtype is not supported: {dtype}, should be float32 or float64")
+    return dtype
+
+
+def _as_float_array(array: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    转换为 ``dtype`` 类型的可写数组。类型相同的可写数组直接返回，不复制。
+    """
+    if array.dtype == dtype and array.flags.writeable:
+        return array
+    return array.astype(dtype)
+
+
+def _get_float_array(
+        protobuf_object,
+        field_name: str,
+        arrays: Optional[Dict[str, np.ndarray]],
+) -> np.ndarray:
+    if arrays is not None:
+        return arrays[field_name]
+    return np.array(getattr(protobuf_object, field_name), dtype=np.float32)
+
+
 class Array2D(ResponseData):
+    """
+    二维表格数据
+
+    数据按列解码，每列为一个类型化的 numpy 数组，保存在 ``columns`` 中，与 ``element_names`` 一一对应。
+    列类型由要素名称或 ``schema`` 确定，参见 ``get_element_dtype``。
+
+    Attributes
+    ----------
+    columns : List[np.ndarray]
+        各列数据
+    element_names : List[str]
+        要素名称
+    schema : Dict
+        要素类型表
+    """
     protobuf_object_type = pb.RetArray2D
+    lazy_attributes = ("columns",)
 
     def __init__(
             self,
@@ -94,51 +288,236 @@ class Array2D(ResponseData):
             element_names: List[str] = None,
             row_count: int = 0,
             col_count: int = 0,
+            columns: List[np.ndarray] = None,
+            schema: Optional[ElementSchema] = None,
+            lazy: bool = False,
     ):
-        super().__init__(request=request)
-        self.data = data
+        super().__init__(request=request, lazy=lazy)
+        self._data = data
+        self.columns = columns
         self.element_names = element_names
         self.row_count = row_count
         self.col_count = col_count
-
-    def to_pandas(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.data, columns=self.element_names)
+        self.schema = schema
+
+    @property
+    def data(self) -> Optional[np.ndarray]:
+        """
+        二维字符串数组，兼容旧版本接口，首次访问时由 ``columns`` 生成。
+        """
+        if self._data is None and self.columns is not None:
+            if len(self.columns) == 0:
+                self._data = np.empty((self.row_count, 0), dtype=str)
+            else:
+                self._data = np.stack([column.astype(str) for column in self.columns], axis=1)
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[np.ndarray]):
+        self._data = value
+
+    def to_pandas(self, parse_time: bool = False) -> pd.DataFrame:
+        """
+        转换为 ``pd.DataFrame``
+
+        Parameters
+        ----------
+        parse_time
+            是否生成 ``datetime64[ns]`` 类型的时间列 ``Datetime``，默认不生成。
+            包含 ``Datetime`` 要素时替换原有的字符串列，否则由 ``Year``、``Mon``、``Day``、``Hour``、``Min`` 等要素组成，
+            添加到最后一列。没有可用的时间要素时不添加并输出警告。参见 ``get_time_column``
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        import pandas as pd
+
+        if self.columns is None:
+            df = pd.DataFrame(self._data, columns=self.element_names)
+            columns = None
+            if parse_time:
+                columns = {
+                    name: decode_column(self._data[:, index], get_element_dtype(name, self.schema), name)
+                    for index, name in enumerate(self.element_names)
+                }
+        else:
+            df = pd.DataFrame(
+                {index: column for index, column in enumerate(self.columns)},
+                copy=False,
+            )
+            df.columns = self.element_names
+            columns = dict(zip(self.element_names, self.columns))
+
+        if parse_time:
+            times = get_time_column(columns)
+            if times is not None:
+                df[DATETIME_ELEMENT] = times
+            else:
+                logger.warning("parse_time is ignored: Datetime or Year and Mon elements are required")
         return df
 
+    def to_arrow(self):
+        """
+        转换为 ``pyarrow.Table``，直接使用按列解码的数组，不经过 ``pd.DataFrame``。
+
+        需要安装可选依赖 ``pyarrow``。
+
+        Returns
+        -------
+        pyarrow.Table
+        """
+        if self.columns is None:
+            import pyarrow as pa
+            return pa.Table.from_pandas(self.to_pandas(), preserve_index=False)
+        return columns_to_arrow(self.columns, self.element_names)
+
+    @classmethod
+    def concat(cls, arrays: List["Array2D"]) -> "Array2D":
+        """
+        按顺序拼接多个检索结果的行，例如按时间段或站点列表拆分后的多次检索。
+
+        各结果的要素名称必须相同，拼接后保持要素顺序。没有数据的结果不参与拼接，避免改变列类型。
+
+        Parameters
+        ----------
+        arrays
+            检索成功的结果列表
+
+        Returns
+        -------
+        Array2D
+        """
+        if len(arrays) == 0:
+            raise ValueError("no array to concat")
+
+        non_empty_arrays = [array for array in arrays if array.row_count > 0]
+        if len(non_empty_arrays) == 0:
+            return arrays[0]
+        if len(non_empty_arrays) == 1:
+            return non_empty_arrays[0]
+
+        first = non_empty_arrays[0]
+        for array in non_empty_arrays[1:]:
+            if array.element_names != first.element_names:
+                raise ValueError(f"element names are different: {array.element_names} != {first.element_names}")
+
+        row_count = sum(array.row_count for array in non_empty_arrays)
+        request = RequestInfo(
+            error_code=first.request.error_code,
+            error_message=first.request.error_message,
+            request_elements=first.request.request_elements,
+            request_params=first.request.request_params,
+            request_time=first.request.request_time,
+            response_time=non_empty_arrays[-1].request.response_time,
+            row_count=row_count,
+            take_time=sum(array.request.take_time for array in non_empty_arrays),
+            col_count=first.col_count,
+        )
+        columns = [
+            np.concatenate([array.columns[index] for array in non_empty_arrays])
+            for index in range(len(first.element_names))
+        ]
+        return cls(
+            request=request,
+            element_names=list(first.element_names),
+            row_count=row_count,
+            col_count=first.col_count,
+            columns=columns,
+            schema=first.schema,
+        )
+
     def load_from_protobuf_content(self, content: bytes):
+        if self.lazy:
+            # 只解析请求信息和要素名称，数据字段在首次访问时解析
+            header = _parse_header(self.protobuf_object_type, content, ("data",))
+            if not self._load_header(header):
+                return
+
+            def load_columns():
+                protobuf_object = self.protobuf_object_type()
+                protobuf_object.ParseFromString(content)
+                self._load_columns(protobuf_object)
+
+            self._defer(load_columns)
+            return
+
         protobuf_object = self.protobuf_object_type()
         protobuf_object.ParseFromString(content)
         self.load_from_protobuf_object(protobuf_object)
 
     def load_from_protobuf_object(self, ret_array_2d: pb.RetArray2D):
+        if not self._load_header(ret_array_2d):
+            return
+
+        if self.lazy:
+            self._defer(lambda: self._load_columns(ret_array_2d))
+        else:
+            self._load_columns(ret_array_2d)
+
+    def _load_header(self, ret_array_2d) -> bool:
+        """
+        读取请求信息和要素名称，请求出错时返回 False
+        """
         self.request = RequestInfo.create_from_protobuf(ret_array_2d.request)
         self.element_names = [i for i in ret_array_2d.elementNames]
         if self.request.error_code != 0:
-            return
+            return False
 
         self.row_count = ret_array_2d.request.rowCount
-        # self.col_count = ret_array_2d.request.colCount
-        total_count = len(ret_array_2d.data)
-        self.col_count = int(total_count/self.row_count)
-        assert self.col_count == ret_array_2d.request.colCount
-
-        self.data = np.array(ret_array_2d.data).reshape([self.row_count, self.col_count])
+        self.col_count = ret_array_2d.request.colCount
+        assert self.col_count == len(self.element_names)
+        self._data = None
+        return True
+
+    def _load_columns(self, ret_array_2d: pb.RetArray2D):
+        # 按列切片并直接转换为对应类型，不生成二维字符串数组
+        values = ret_array_2d.data
+        assert len(values) == self.row_count * self.col_count
+        self.columns = [
+            decode_column(
+                values[index::self.col_count],
+                get_element_dtype(name, self.schema),
+                name,
+            )
+            for index, name in enumerate(self.element_names)
+        ]
 
 
 class DataBlock(ResponseData):
     protobuf_object_type = pb.RetDataBlock
+    lazy_attributes = ("data",)
 
     def __init__(
             self,
             data_name: str = None,
             data: bytes = None,
             request: RequestInfo = None,
+            lazy: bool = False,
     ):
-        super().__init__(request=request)
+        super().__init__(request=request, lazy=lazy)
         self.data_name = data_name
         self.data = data
 
     def load_from_protobuf_content(self, content: bytes):
+        if self.lazy:
+            field_number = self.protobuf_object_type.DESCRIPTOR.fields_by_name["byteArray"].number
+            try:
+                segments, remaining_content = split_packed_fields(content, [field_number])
+            except WireFormatError:
+                pass
+            else:
+                protobuf_object = self.protobuf_object_type()
+                protobuf_object.ParseFromString(remaining_content)
+                self.request = RequestInfo.create_from_protobuf(protobuf_object.request)
+                self.data_name = protobuf_object.dataName
+
+                def load_data():
+                    self.data = b"".join(content[start:end] for start, end in segments[field_number])
+
+                self._defer(load_data)
+                return
+
         protobuf_object = self.protobuf_object_type()
         protobuf_object.ParseFromString(content)
         self.load_from_protobuf_object(protobuf_object)
@@ -149,8 +528,60 @@ class DataBlock(ResponseData):
         self.data = ret_data_block.byteArray
 
 
-class GridArray2D(ResponseData):
+class _PackedGridData(ResponseData):
+    """
+    格点数据基类，数组字段 (``packed_fields``) 以 packed float32 格式编码
+
+    延迟解码模式下只解析去除数组字段后的消息，数组字段在首次访问时从原始字节串中读取。
+    子类实现 ``_load_metadata`` 和 ``_load_arrays``。
+    """
+    # packed 格式的数组字段
+    packed_fields = ()
+
+    def load_from_protobuf_content(self, content: bytes):
+        if self.lazy:
+            header = _parse_header(self.protobuf_object_type, content, self.packed_fields)
+            if self._load_metadata(header):
+                self._defer(lambda: self._load_arrays(
+                    *_parse_packed_float_content(self.protobuf_object_type, content, self.packed_fields)
+                ))
+            return
+
+        protobuf_object, arrays = _parse_packed_float_content(
+            self.protobuf_object_type, content, self.packed_fields
+        )
+        self.load_from_protobuf_object(protobuf_object, arrays)
+
+    def load_from_protobuf_object(self, protobuf_object, arrays: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Parameters
+        ----------
+        protobuf_object
+        arrays
+            已从字节串中读取的数组字段，参见 ``load_from_protobuf_content``
+        """
+        if not self._load_metadata(protobuf_object):
+            return
+
+        if self.lazy:
+            self._defer(lambda: self._load_arrays(protobuf_object, arrays))
+        else:
+            self._load_arrays(protobuf_object, arrays)
+
+    def _load_metadata(self, protobuf_object) -> bool:
+        """
+        读取请求信息和网格信息，请求出错时返回 False
+        """
+        raise NotImplementedError()
+
+    def _load_arrays(self, protobuf_object, arrays: Optional[Dict[str, np.ndarray]]):
+        raise NotImplementedError()
+
+
+class GridArray2D(_PackedGridData):
     protobuf_object_type = pb.RetGridArray2D
+    lazy_attributes = ("data", "lats", "lons")
+    packed_fields = ("data", "lats", "lons")
 
     def __init__(
             self,
@@ -168,8 +599,11 @@ class GridArray2D(ResponseData):
             lons: List[float] = None,
             units: str = "",
             user_element_name: str = "",
+            dtype: Optional[DTypeLike] = None,
+            lazy: bool = False,
     ):
-        super().__init__(request=request)
+        super().__init__(request=request, lazy=lazy)
+        self.dtype = _get_float_dtype(dtype)
         self.data = data
         self.start_lat = start_lat
         self.start_lon = start_lon
@@ -185,21 +619,23 @@ class GridArray2D(ResponseData):
         self.user_element_name = user_element_name
 
     def to_xarray(self) -> xr.DataArray:
+        import xarray as xr
+
         coords = {}
         if len(self.lats) > 0:
             lats = self.lats
         else:
             lats = np.linspace(
                 self.start_lat, self.end_lat, self.lat_count,
-                endpoint=True
+                endpoint=True, dtype=self.dtype,
             )
 
         if len(self.lons) > 0:
-            lons = self.lats
+            lons = self.lons
         else:
             lons = np.linspace(
                 self.start_lon, self.end_lon, self.lon_count,
-                endpoint=True
+                endpoint=True, dtype=self.dtype,
             )
 
         coords["latitude"] = xr.Variable(
@@ -235,16 +671,11 @@ class GridArray2D(ResponseData):
 
         return field
 
-    def load_from_protobuf_content(self, content: bytes):
-        protobuf_object = self.protobuf_object_type()
-        protobuf_object.ParseFromString(content)
-        self.load_from_protobuf_object(protobuf_object)
-
-    def load_from_protobuf_object(self, ret_grid_array_2d: pb.RetGridArray2D):
+    def _load_metadata(self, ret_grid_array_2d: pb.RetGridArray2D) -> bool:
         self.request = RequestInfo.create_from_protobuf(ret_grid_array_2d.request)
 
         if self.request.error_code != 0:
-            return
+            return False
 
         self.start_lat = ret_grid_array_2d.startLat
         self.start_lon = ret_grid_array_2d.startLon
@@ -255,23 +686,18 @@ class GridArray2D(ResponseData):
         self.lon_step = ret_grid_array_2d.lonStep
         self.lat_step = ret_grid_array_2d.latStep
 
-        if ret_grid_array_2d.lats is not None:
-            self.lats = ret_grid_array_2d.lats
-        else:
-            self.lats = [self.start_lat + i * self.lat_step for i in range(self.lat_count)]
-
-        if ret_grid_array_2d.lons is not None:
-            self.lons = ret_grid_array_2d.lons
-        else:
-            self.lons = [self.start_lon + i * self.lon_step for i in range(self.lon_count)]
-
         self.units = ret_grid_array_2d.units
         self.user_element_name = ret_grid_array_2d.userEleName
+        return True
+
+    def _load_arrays(self, ret_grid_array_2d: pb.RetGridArray2D, arrays: Optional[Dict[str, np.ndarray]]):
+        self.lats = _as_float_array(_get_float_array(ret_grid_array_2d, "lats", arrays), self.dtype)
+        self.lons = _as_float_array(_get_float_array(ret_grid_array_2d, "lons", arrays), self.dtype)
 
+        data = _get_float_array(ret_grid_array_2d, "data", arrays)
         row_count = self.request.row_count
-        data_count = len(ret_grid_array_2d.data)
-        col_count = int(data_count/row_count)
-        self.data = np.array(ret_grid_array_2d.data).reshape([row_count, col_count])
+        col_count = int(len(data)/row_count)
+        self.data = _as_float_array(data, self.dtype).reshape([row_count, col_count])
 
 
 class FileInfo:
@@ -284,6 +710,7 @@ class FileInfo:
             file_url: str = "",
             image_base64: str = "",
             attributes: List[str] = None,
+            download_error: Optional[MusicError] = None,
     ):
         self.file_name = file_name
         self.save_path = save_path
@@ -292,6 +719,8 @@ class FileInfo:
         self.file_url = file_url
         self.image_base64 = image_base64
         self.attributes = attributes
+        # 下载结果，下载失败时为错误信息，未下载或下载成功时为 None
+        self.download_error = download_error
 
     @classmethod
     def create_from_protobuf(cls, pb_file_info: pb.FileInfo):
@@ -328,8 +757,10 @@ class FilesInfo(ResponseData):
         self.files_info = [FileInfo.create_from_protobuf(info) for info in files_info]
 
 
-class GridVector2D(ResponseData):
+class GridVector2D(_PackedGridData):
     protobuf_object_type = pb.RetGridVector2D
+    lazy_attributes = ("u_datas", "v_datas", "lats", "lons")
+    packed_fields = ("u_datas", "v_datas", "lats", "lons")
 
     def __init__(
             self,
@@ -348,8 +779,11 @@ class GridVector2D(ResponseData):
             lons: List[float] = None,
             u_element_name: str = "",
             v_element_name: str = "",
+            dtype: Optional[DTypeLike] = None,
+            lazy: bool = False,
     ):
-        super().__init__(request)
+        super().__init__(request=request, lazy=lazy)
+        self.dtype = _get_float_dtype(dtype)
         self.u_datas = u_datas
         self.v_datas = v_datas
         self.start_lat = start_lat
@@ -365,16 +799,11 @@ class GridVector2D(ResponseData):
         self.u_element_name = u_element_name
         self.v_element_name = v_element_name
 
-    def load_from_protobuf_content(self, content: bytes):
-        protobuf_object = self.protobuf_object_type()
-        protobuf_object.ParseFromString(content)
-        self.load_from_protobuf_object(protobuf_object)
-
-    def load_from_protobuf_object(self, ret_grid_vector_2d: pb.RetGridVector2D):
+    def _load_metadata(self, ret_grid_vector_2d: pb.RetGridVector2D) -> bool:
         self.request = RequestInfo.create_from_protobuf(ret_grid_vector_2d.request)
 
         if self.request.error_code != 0:
-            return
+            return False
 
         self.start_lat = ret_grid_vector_2d.startLat
         self.start_lon = ret_grid_vector_2d.startLon
@@ -385,20 +814,26 @@ class GridVector2D(ResponseData):
         self.lon_step = ret_grid_vector_2d.lonStep
         self.lat_step = ret_grid_vector_2d.latStep
 
-        self.lats = ret_grid_vector_2d.lats
-        self.lons = ret_grid_vector_2d.lons
-
         self.u_element_name = ret_grid_vector_2d.u_EleName
         self.v_element_name = ret_grid_vector_2d.v_EleName
+        return True
+
+    def _load_arrays(self, ret_grid_vector_2d: pb.RetGridVector2D, arrays: Optional[Dict[str, np.ndarray]]):
+        self.lats = _as_float_array(_get_float_array(ret_grid_vector_2d, "lats", arrays), self.dtype)
+        self.lons = _as_float_array(_get_float_array(ret_grid_vector_2d, "lons", arrays), self.dtype)
 
         row_count = self.lat_count
         col_count = self.lon_count
-        self.u_datas = np.array(ret_grid_vector_2d.u_datas).reshape([row_count, col_count])
-        self.v_datas = np.array(ret_grid_vector_2d.v_datas).reshape([row_count, col_count])
+        u_datas = _get_float_array(ret_grid_vector_2d, "u_datas", arrays)
+        v_datas = _get_float_array(ret_grid_vector_2d, "v_datas", arrays)
+        self.u_datas = _as_float_array(u_datas, self.dtype).reshape([row_count, col_count])
+        self.v_datas = _as_float_array(v_datas, self.dtype).reshape([row_count, col_count])
 
 
-class GridScalar2D(ResponseData):
+class GridScalar2D(_PackedGridData):
     protobuf_object_type = pb.RetGridScalar2D
+    lazy_attributes = ("data", "lats", "lons")
+    packed_fields = ("datas", "lats", "lons")
 
     def __init__(
             self,
@@ -416,8 +851,11 @@ class GridScalar2D(ResponseData):
             lons: List[float] = None,
             units: str = "",
             user_element_name: str = "",
+            dtype: Optional[DTypeLike] = None,
+            lazy: bool = False,
     ):
-        super().__init__(request)
+        super().__init__(request=request, lazy=lazy)
+        self.dtype = _get_float_dtype(dtype)
         self.data = data
         self.start_lat = start_lat
         self.start_lon = start_lon
@@ -432,16 +870,11 @@ class GridScalar2D(ResponseData):
         self.units = units
         self.user_element_name = user_element_name
 
-    def load_from_protobuf_content(self, content: bytes):
-        protobuf_object = self.protobuf_object_type()
-        protobuf_object.ParseFromString(content)
-        self.load_from_protobuf_object(protobuf_object)
-
-    def load_from_protobuf_object(self, ret_grid_scalar_2d: pb.RetGridScalar2D):
+    def _load_metadata(self, ret_grid_scalar_2d: pb.RetGridScalar2D) -> bool:
         self.request = RequestInfo.create_from_protobuf(ret_grid_scalar_2d.request)
 
         if self.request.error_code != 0:
-            return
+            return False
 
         self.start_lat = ret_grid_scalar_2d.startLat
         self.start_lon = ret_grid_scalar_2d.startLon
@@ -452,11 +885,15 @@ class GridScalar2D(ResponseData):
         self.lon_step = ret_grid_scalar_2d.lonStep
         self.lat_step = ret_grid_scalar_2d.latStep
 
-        self.lats = ret_grid_scalar_2d.lats
-        self.lons = ret_grid_scalar_2d.lons
-
+        self.units = ret_grid_scalar_2d.units
         self.user_element_name = ret_grid_scalar_2d.userEleName
+        return True
+
+    def _load_arrays(self, ret_grid_scalar_2d: pb.RetGridScalar2D, arrays: Optional[Dict[str, np.ndarray]]):
+        self.lats = _as_float_array(_get_float_array(ret_grid_scalar_2d, "lats", arrays), self.dtype)
+        self.lons = _as_float_array(_get_float_array(ret_grid_scalar_2d, "lons", arrays), self.dtype)
 
         row_count = self.lat_count
         col_count = self.lon_count
-        self.data = np.array(ret_grid_scalar_2d.data).reshape([row_count, col_count])
+        datas = _get_float_array(ret_grid_scalar_2d, "datas", arrays)
+        self.data = _as_float_array(datas, self.dtype).reshape([row_count, col_count])
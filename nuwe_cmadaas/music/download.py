@@ -0,0 +1,166 @@
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union, Optional, Dict, NamedTuple
+from urllib.parse import urlsplit
+
+from nuwe_cmadaas._log import logger
+
+from .connection import Connection
+from .retry import RetryPolicy, RetryStats, RequestOutcome, RetryLoop
+
+
+class DownloadTask(NamedTuple):
+    """
+    下载任务
+
+    Attributes
+    ----------
+    file_url
+        文件 URL
+    save_file
+        保存路径
+    expected_size
+        文件大小，单位字节，未知时为 None
+    """
+    file_url: str
+    save_file: Union[str, pathlib.Path]
+    expected_size: Optional[int] = None
+
+
+class DownloadExecutor:
+    """
+    并发下载多个文件。
+
+    使用线程池同时下载多个文件，并限制同一服务器 (host:port) 的并发下载数。
+    每个文件单独返回下载结果，某个文件下载失败不影响其他文件。
+
+    Attributes
+    ----------
+    connection : Connection
+        下载使用的连接对象
+    max_workers : int
+        最大并发下载数
+    max_per_host : int
+        同一服务器的最大并发下载数
+    retry_policy : RetryPolicy
+        单个文件的重试策略，默认不重试
+    retry_stats : RetryStats
+        重试统计
+    """
+    defaultMaxWorkers = 4
+
+    def __init__(
+            self,
+            connection: Connection,
+            max_workers: Optional[int] = None,
+            max_per_host: Optional[int] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            retry_stats: Optional[RetryStats] = None,
+    ):
+        if max_workers is None:
+            max_workers = DownloadExecutor.defaultMaxWorkers
+        if max_per_host is None:
+            max_per_host = max_workers
+
+        self.connection = connection
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_attempts=1)
+        if retry_stats is None:
+            retry_stats = RetryStats()
+        self.retry_policy = retry_policy
+        self.retry_stats = retry_stats
+
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = dict()
+        self._lock = threading.Lock()
+
+    def download(
+            self,
+            tasks: List[DownloadTask],
+            max_workers: Optional[int] = None,
+            resume: bool = False,
+    ) -> List[Tuple[int, Optional[str]]]:
+        """
+        下载文件列表
+
+        Parameters
+        ----------
+        tasks
+            下载任务列表，每个任务为 (文件 URL, 保存路径) 或 (文件 URL, 保存路径, 文件大小)
+        max_workers
+            最大并发下载数，默认使用 ``self.max_workers``
+        resume
+            是否启用断点续传，参见 ``Connection.download_file``
+
+        Returns
+        -------
+        List[Tuple[int, Optional[str]]]
+            与 ``tasks`` 一一对应的下载结果，每项为错误码和错误信息，成功时为 ``(0, None)``
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        tasks = [DownloadTask(*task) for task in tasks]
+
+        if len(tasks) == 0:
+            return []
+        if len(tasks) == 1 or max_workers <= 1:
+            return [self._download_one(task, resume) for task in tasks]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            futures = [executor.submit(self._download_one, task, resume) for task in tasks]
+            return [future.result() for future in futures]
+
+    def _download_one(self, task: DownloadTask, resume: bool) -> Tuple[int, Optional[str]]:
+        retry_loop = RetryLoop(self.retry_policy, self.retry_stats, f"download {task.file_url}")
+        while True:
+            retry_loop.start_attempt()
+            result = self._download_once(task, resume)
+            delay = retry_loop.get_retry_delay(get_download_outcome(result))
+            if delay is None:
+                return result
+            time.sleep(delay)
+
+    def _download_once(self, task: DownloadTask, resume: bool) -> Tuple[int, Optional[str]]:
+        file_url = task.file_url
+        with self._get_host_semaphore(file_url):
+            try:
+                return self.connection.download_file(
+                    file_url,
+                    task.save_file,
+                    resume=resume,
+                    expected_size=task.expected_size,
+                )
+            except Exception as e:
+                logger.warning(f"download error: {file_url}: {e}")
+                return Connection.otherError, f"download error: {e}"
+
+    def _get_host_semaphore(self, file_url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(file_url).netloc
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[host]
+
+
+def get_file_size(file_size: str) -> Optional[int]:
+    """
+    将 ``FileInfo.size`` 转换为字节数，无法转换时返回 None
+    """
+    try:
+        return int(file_size)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_download_outcome(result: Tuple[int, Optional[str]]) -> RequestOutcome:
+    """
+    将 ``Connection.download_file`` 的下载结果转换为 ``RequestOutcome``，用于判断是否需要重试
+    """
+    outcome = RequestOutcome()
+    outcome.error_code = result[0]
+    return outcome
@@ -0,0 +1,294 @@
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from nuwe_cmadaas._log import logger
+
+
+# 字符串类型的要素
+STRING_ELEMENTS = {
+    "Station_Id_C",
+    "Station_Id_d",
+    "Station_Name",
+    "Station_Type",
+    "Country",
+    "Province",
+    "City",
+    "Cnty",
+    "Town",
+    "Admin_Code_CHN",
+    "V_ACODE",
+    "NetCode",
+    "Datetime",
+}
+
+# 站号要素
+STATION_ID_ELEMENTS = {
+    "Station_Id_C",
+    "Station_Id_d",
+}
+
+# 整数类型的要素
+INTEGER_ELEMENTS = {
+    "Year",
+    "Mon",
+    "Day",
+    "Hour",
+    "Min",
+    "Second",
+    "Station_levl",
+}
+
+# 组成观测时间的要素，依次为年、月、日、时、分、秒
+TIME_ELEMENTS = ["Year", "Mon", "Day", "Hour", "Min", "Second"]
+
+# 字符串格式的观测时间要素，格式为 YYYYmmddHHMMSS
+DATETIME_ELEMENT = "Datetime"
+
+DATETIME_STRING_LENGTH = 14
+
+# 平年各月天数
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+ElementSchema = Dict[str, Union[str, type, np.dtype]]
+
+
+def get_element_dtype(element_name: str, schema: Optional[ElementSchema] = None) -> np.dtype:
+    """
+    返回要素的数据类型
+
+    优先使用 ``schema`` 中设置的类型，否则根据要素名称判断：
+    站号、站名、行政区划等为字符串 (``object``)，年、月、日、时、分等为 ``int32``，其余为 ``float64``。
+
+    Parameters
+    ----------
+    element_name
+        要素名称
+    schema
+        要素类型表，键为要素名称，值为 numpy 数据类型，例如 ``{"Station_Id_d": "str", "TEM": "float32"}``
+
+    Returns
+    -------
+    np.dtype
+        字符串要素返回 ``np.dtype(object)``
+    """
+    if schema is not None and element_name in schema:
+        dtype = schema[element_name]
+        if dtype in ("str", str):
+            return np.dtype(object)
+        return np.dtype(dtype)
+
+    if element_name in STRING_ELEMENTS:
+        return np.dtype(object)
+    if element_name in INTEGER_ELEMENTS:
+        return np.dtype(np.int32)
+    return np.dtype(np.float64)
+
+
+def decode_column(values: Sequence[str], dtype: np.dtype, element_name: str = "") -> np.ndarray:
+    """
+    将一列字符串转换为 ``dtype`` 类型的数组
+
+    无法转换为整数时尝试转换为 ``float64``，无法转换为数值时保留字符串。
+
+    Parameters
+    ----------
+    values
+        字符串序列
+    dtype
+        数据类型，``object`` 表示字符串
+    element_name
+        要素名称，用于日志
+
+    Returns
+    -------
+    np.ndarray
+    """
+    if dtype == np.dtype(object):
+        return np.array(values, dtype=object)
+
+    try:
+        return np.array(values, dtype=dtype)
+    except ValueError:
+        pass
+
+    if np.issubdtype(dtype, np.integer):
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            pass
+
+    logger.debug(f"element {element_name} can't be converted to {dtype}, keep as string")
+    return np.array(values, dtype=object)
+
+
+def assemble_datetime(
+        year: np.ndarray,
+        month: np.ndarray,
+        day: Optional[np.ndarray] = None,
+        hour: Optional[np.ndarray] = None,
+        minute: Optional[np.ndarray] = None,
+        second: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    由年、月、日、时、分、秒数组组成 ``datetime64[ns]`` 数组
+
+    使用整数运算向量化计算，不逐行解析。超出范围的值 (例如缺测值 999999 或 2 月 30 日) 为 NaT。
+
+    Parameters
+    ----------
+    year, month, day, hour, minute, second
+        整数或浮点数数组，长度相同。``day`` 默认为 1，``hour``、``minute`` 和 ``second`` 默认为 0
+
+    Returns
+    -------
+    np.ndarray
+        ``datetime64[ns]`` 数组
+    """
+    year = _as_number(year)
+    month = _as_number(month)
+    day = np.ones_like(year) if day is None else _as_number(day)
+    hour = np.zeros_like(year) if hour is None else _as_number(hour)
+    minute = np.zeros_like(year) if minute is None else _as_number(minute)
+    second = np.zeros_like(year) if second is None else _as_number(second)
+
+    valid = (
+        (year >= 1678) & (year <= 2261)
+        & (month >= 1) & (month <= 12)
+        & (day >= 1) & (day <= 31)
+        & (hour >= 0) & (hour <= 23)
+        & (minute >= 0) & (minute <= 59)
+        & (second >= 0) & (second <= 59)
+    )
+    # 无效值先设为 1970-01-01 00:00，计算后再设为 NaT
+    year = np.where(valid, year, 1970).astype(np.int64)
+    month = np.where(valid, month, 1).astype(np.int64)
+    day = np.where(valid, day, 1).astype(np.int64)
+    hour = np.where(valid, hour, 0).astype(np.int64)
+    minute = np.where(valid, minute, 0).astype(np.int64)
+    second = np.where(valid, second, 0).astype(np.int64)
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    valid &= day <= DAYS_IN_MONTH[month - 1] + (leap & (month == 2))
+
+    # 由公历日期计算距 1970-01-01 的天数，3 月作为每年的第一个月，闰日位于年末
+    shifted_year = year - (month <= 2)
+    era = shifted_year // 400
+    year_of_era = shifted_year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+
+    seconds = ((days * 24 + hour) * 60 + minute) * 60 + second
+    result = (seconds * 1_000_000_000).view("datetime64[ns]")
+    result[~valid] = np.datetime64("NaT")
+    return result
+
+
+def parse_datetime_strings(values: Sequence[str]) -> np.ndarray:
+    """
+    将 ``YYYYmmddHHMMSS`` 格式的时间字符串转换为 ``datetime64[ns]`` 数组
+
+    字符串转换为定长字节数组后按字符位置直接计算年、月、日、时、分、秒，不逐行解析。
+    包含非数字字符的值为 NaT。长度不是 14 位时 (例如 ``2024-01-01 00:00:00``) 使用 ``pd.to_datetime`` 解析。
+
+    Parameters
+    ----------
+    values
+        时间字符串序列
+
+    Returns
+    -------
+    np.ndarray
+        ``datetime64[ns]`` 数组
+    """
+    values = np.asarray(values, dtype=object)
+    try:
+        data = values.astype("S")
+    except (UnicodeEncodeError, ValueError, TypeError):
+        data = None
+
+    if data is None or data.dtype.itemsize != DATETIME_STRING_LENGTH:
+        import pandas as pd
+        return pd.to_datetime(pd.Series(values), errors="coerce", format="mixed").to_numpy(dtype="datetime64[ns]")
+
+    # uint8 减法溢出后非数字字符都大于 9，长度不足时补齐的 0 字节同样无效
+    digits = data.view(np.uint8).reshape(len(data), DATETIME_STRING_LENGTH) - np.uint8(ord("0"))
+    invalid = (digits > 9).any(axis=1)
+
+    def get_number(start: int, end: int) -> np.ndarray:
+        number = np.zeros(len(digits), dtype=np.int32)
+        for index in range(start, end):
+            number = number * 10 + digits[:, index]
+        return number
+
+    month = get_number(4, 6)
+    month[invalid] = 0
+    return assemble_datetime(
+        get_number(0, 4),
+        month,
+        get_number(6, 8),
+        get_number(8, 10),
+        get_number(10, 12),
+        get_number(12, 14),
+    )
+
+
+def add_time_elements(elements: str) -> str:
+    """
+    在要素列表中补充生成时间列需要的 ``Year`` 和 ``Mon`` 要素
+
+    部分资料 (例如高空定时值资料) 的默认要素只有 ``Day``、``Hour`` 和 ``Min``，缺少年月时无法生成时间列。
+    要素列表包含 ``Datetime`` 或不包含任何时间要素时不修改。
+    """
+    element_names = elements.split(",")
+    if DATETIME_ELEMENT in element_names:
+        return elements
+    if not any(name in element_names for name in TIME_ELEMENTS):
+        return elements
+    for name in ["Year", "Mon"]:
+        if name not in element_names:
+            element_names.append(name)
+    return ",".join(element_names)
+
+
+def get_time_column(columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+    """
+    由表格中的时间要素生成 ``datetime64[ns]`` 时间列
+
+    - 包含字符串要素 ``Datetime`` 时，解析该列，参见 ``parse_datetime_strings``
+    - 否则包含数值要素 ``Year`` 和 ``Mon`` 时，由 ``Year``、``Mon``、``Day``、``Hour``、``Min``、``Second`` 组成，
+      缺少的要素使用默认值，参见 ``assemble_datetime``
+
+    Parameters
+    ----------
+    columns
+        各列数据，键为要素名称
+
+    Returns
+    -------
+    Optional[np.ndarray]
+        没有可用的时间要素时返回 None
+    """
+    if DATETIME_ELEMENT in columns:
+        column = columns[DATETIME_ELEMENT]
+        if column.dtype == np.dtype(object):
+            return parse_datetime_strings(column)
+        if column.dtype.kind == "M":
+            return column.astype("datetime64[ns]")
+
+    time_columns = {}
+    for name in TIME_ELEMENTS:
+        if name in columns and columns[name].dtype.kind in "iuf":
+            time_columns[name] = columns[name]
+    if "Year" not in time_columns or "Mon" not in time_columns:
+        return None
+    return assemble_datetime(*[time_columns.get(name) for name in TIME_ELEMENTS])
+
+
+def _as_number(values) -> np.ndarray:
+    # 整数和浮点数数组直接使用，缺测值 NaN 在范围检查中为无效值
+    values = np.asarray(values)
+    if values.dtype.kind not in "iuf":
+        values = values.astype(np.float64)
+    return values
@@ -0,0 +1,199 @@
+import itertools
+import threading
+import time
+from typing import List, Optional, Iterable, Union, Tuple
+
+from nuwe_cmadaas._log import logger
+
+
+class Endpoint:
+    """
+    MUSIC 服务节点及其健康状态
+
+    Attributes
+    ----------
+    server_ip : str
+    server_port : int
+    latency : float
+        请求耗时的指数加权平均值，单位秒，没有成功请求时为 None
+    failures : int
+        连续失败次数
+    ejected_until : float
+        暂时剔除的截止时间 (``time.monotonic``)，未被剔除时为 0
+    requests : int
+        请求数
+    errors : int
+        失败请求数
+    """
+    def __init__(self, server_ip: str, server_port: int):
+        self.server_ip = server_ip
+        self.server_port = server_port
+
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def is_available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def __repr__(self):
+        return f"Endpoint({self.server_ip}:{self.server_port})"
+
+
+class EndpointPool:
+    """
+    多个 MUSIC 服务节点的负载均衡和故障转移，线程安全
+
+    每次请求前使用 ``select`` 选择节点，请求结束后使用 ``report_success`` 或 ``report_failure`` 报告结果。
+    连续失败 ``max_failures`` 次（请求耗时超过 ``slow_threshold`` 也计为失败）的节点被暂时剔除 ``eject_time`` 秒，
+    到期后重新参与选择。所有节点都被剔除时，选择最早恢复的节点。
+
+    Attributes
+    ----------
+    endpoints : List[Endpoint]
+    strategy : str
+        选择策略
+
+        * ``round_robin``：依次轮流选择
+        * ``least_latency``：选择平均耗时最短的节点，尚未成功请求的节点优先
+    max_failures : int
+        剔除节点前允许的连续失败次数
+    eject_time : float
+        剔除时间，单位秒
+    slow_threshold : float
+        慢请求阈值，单位秒，None 表示不检查
+    """
+    roundRobin = "round_robin"
+    leastLatency = "least_latency"
+
+    latencyWeight = 0.3
+
+    def __init__(
+            self,
+            endpoints: List[Endpoint],
+            strategy: Optional[str] = None,
+            max_failures: int = 3,
+            eject_time: float = 30.0,
+            slow_threshold: Optional[float] = None,
+    ):
+        if len(endpoints) == 0:
+            raise ValueError("endpoints is empty")
+        if strategy is None:
+            strategy = EndpointPool.roundRobin
+        if strategy not in (EndpointPool.roundRobin, EndpointPool.leastLatency):
+            raise ValueError(f"load balance strategy is not supported: {strategy}")
+
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self.slow_threshold = slow_threshold
+
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def select(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """
+        选择一个节点
+
+        Parameters
+        ----------
+        exclude
+            尽量不选择的节点，例如同一请求已经失败的节点。没有其他可用节点时仍可能被选中。
+
+        Returns
+        -------
+        Endpoint
+        """
+        exclude = set(exclude)
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e.is_available(now) and e not in exclude]
+            if len(candidates) == 0:
+                candidates = [e for e in self.endpoints if e.is_available(now)]
+            if len(candidates) == 0:
+                return min(self.endpoints, key=lambda e: e.ejected_until)
+
+            if self.strategy == EndpointPool.leastLatency:
+                return min(candidates, key=lambda e: -1 if e.latency is None else e.latency)
+
+            return candidates[next(self._counter) % len(candidates)]
+
+    def report_success(self, endpoint: Endpoint, latency: float):
+        """
+        报告请求成功及耗时
+        """
+        if self.slow_threshold is not None and latency > self.slow_threshold:
+            logger.warning(f"slow response from {endpoint}: {latency:.2f}s")
+            self.report_failure(endpoint)
+            with self._lock:
+                self._update_latency(endpoint, latency)
+            return
+
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures = 0
+            self._update_latency(endpoint, latency)
+
+    def report_failure(self, endpoint: Endpoint):
+        """
+        报告请求失败，连续失败次数达到 ``max_failures`` 时剔除节点
+        """
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.ejected_until = time.monotonic() + self.eject_time
+                endpoint.failures = 0
+                logger.warning(f"eject {endpoint} for {self.eject_time}s")
+
+    def _update_latency(self, endpoint: Endpoint, latency: float):
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency += EndpointPool.latencyWeight * (latency - endpoint.latency)
+
+
+def parse_endpoints(
+        servers: Union[str, List[str]],
+        default_port: Optional[int] = None,
+) -> List[Tuple[str, int]]:
+    """
+    解析节点列表
+
+    Parameters
+    ----------
+    servers
+        节点列表，每项格式为 ``host:port`` 或 ``host``，字符串形式时以逗号分隔
+    default_port
+        没有指定端口时使用的端口号
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        (ip, 端口) 列表
+
+    Examples
+    --------
+    >>> parse_endpoints("10.1.1.1:8008, 10.1.1.2", default_port=80)
+    [('10.1.1.1', 8008), ('10.1.1.2', 80)]
+    """
+    if isinstance(servers, str):
+        servers = servers.split(",")
+
+    endpoints = []
+    for server in servers:
+        server = server.strip()
+        if server == "":
+            continue
+        if ":" in server:
+            server_ip, server_port = server.rsplit(":", 1)
+            endpoints.append((server_ip, int(server_port)))
+        else:
+            if default_port is None:
+                raise ValueError(f"port is not set for server: {server}")
+            endpoints.append((server, int(default_port)))
+    return endpoints
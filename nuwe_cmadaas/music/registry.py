@@ -0,0 +1,70 @@
+"""
+进程内共享的客户端，避免每次检索都重新读取配置文件并创建客户端和连接池。
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+from nuwe_cmadaas.config import CMADaasConfig, load_cmadaas_config, _get_cedarkit_config_path
+from nuwe_cmadaas._log import logger
+
+from .client import CMADaaSClient
+
+
+_clients: Dict[Hashable, Tuple[Optional[float], CMADaaSClient]] = dict()
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(config: Optional[Union[CMADaasConfig, str, Path]] = None) -> CMADaaSClient:
+    """
+    获取进程内共享的客户端，相同的配置只创建一次客户端，共用 HTTP 连接池。
+
+    - 配置文件：以文件的绝对路径为键，文件修改时间改变后重新读取配置并创建新的客户端
+    - 配置对象：以配置内容为键
+
+    ``CMADaaSClient`` 是线程安全的，多个线程可以共用同一个客户端。
+
+    Parameters
+    ----------
+    config
+        配置，配置对象或配置文件路径，默认自动查找配置文件
+
+    Returns
+    -------
+    CMADaaSClient
+    """
+    if isinstance(config, dict):
+        key = ("config", json.dumps(config, sort_keys=True, default=str))
+        mtime = None
+    else:
+        path = Path(_get_cedarkit_config_path(config)).expanduser().resolve()
+        key = ("file", str(path))
+        mtime = path.stat().st_mtime
+
+    with _clients_lock:
+        entry = _clients.get(key, None)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        if entry is not None:
+            logger.info(f"config file is modified, create new client: {key[1]}")
+
+        if isinstance(config, dict):
+            client = CMADaaSClient(config=config)
+        else:
+            client = CMADaaSClient(config=load_cmadaas_config(key[1]))
+        # 旧的客户端可能仍在其他线程中使用，不主动关闭
+        _clients[key] = (mtime, client)
+        return client
+
+
+def clear_shared_clients():
+    """
+    删除所有共享客户端并关闭连接
+    """
+    with _clients_lock:
+        clients = [client for _, client in _clients.values()]
+        _clients.clear()
+    for client in clients:
+        client.close()
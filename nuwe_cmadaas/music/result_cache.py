@@ -0,0 +1,223 @@
+"""
+进程内的检索结果缓存，保存解码后的 ``pd.DataFrame``、``xr.DataArray`` 等对象。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from nuwe_cmadaas._log import logger
+
+from .cache import CacheStats, make_cache_key, is_cacheable_request
+from .data import MusicError
+
+
+def _is_copy_on_write() -> bool:
+    import pandas as pd
+
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def get_nbytes(value: Any) -> int:
+    """
+    估算对象占用的内存，单位字节
+    """
+    import pandas as pd
+    import xarray as xr
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, xr.DataArray):
+        return int(value.nbytes + sum(coord.nbytes for coord in value.coords.values()))
+    if isinstance(value, xr.Dataset):
+        return int(value.nbytes)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    raise TypeError(f"result type is not supported: {type(value)}")
+
+
+def _freeze(value: Any) -> Any:
+    # 缓存中的数组设为只读，防止调用者通过共享内存修改缓存
+    import pandas as pd
+    import xarray as xr
+
+    if isinstance(value, (xr.DataArray, xr.Dataset)):
+        variables = [value.variable] if isinstance(value, xr.DataArray) else list(value.data_vars.values())
+        variables += list(value.coords.values())
+        for variable in variables:
+            if isinstance(variable.data, np.ndarray):
+                variable.data.flags.writeable = False
+    elif isinstance(value, pd.DataFrame) and not _is_copy_on_write():
+        value = value.copy(deep=True)
+    return value
+
+
+def _share(value: Any) -> Any:
+    """
+    返回与缓存共享数据的新对象，修改对象本身 (例如列名、属性) 不影响缓存
+    """
+    import pandas as pd
+    import xarray as xr
+
+    if isinstance(value, (xr.DataArray, xr.Dataset)):
+        return value.copy(deep=False)
+    if isinstance(value, pd.DataFrame):
+        # copy-on-write 模式下浅复制的对象在修改时才复制数据
+        return value.copy(deep=not _is_copy_on_write())
+    return value
+
+
+class ResultCache:
+    """
+    检索结果的内存缓存，线程安全
+
+    按对象占用的内存计算缓存大小，超过 ``max_size`` 时按最近最少使用 (LRU) 顺序删除。
+    缓存没有有效期，最新时次 (``pd.Timedelta`` 时间条件) 等结果随时间变化的检索不使用缓存，参见 ``get_result_cache_key``。
+
+    缓存的对象不会被调用者修改：
+
+    - ``xr.DataArray`` 和 ``xr.Dataset`` 的数组设为只读，每次返回新的浅复制对象，原地修改数据时抛出 ``ValueError``
+    - ``pd.DataFrame`` 在 pandas 的 copy-on-write 模式 (pandas 3.0 默认开启) 下返回浅复制对象，修改时才复制数据，
+      否则返回深复制对象
+    - ``pyarrow.Table`` 本身不可修改，直接返回
+
+    Attributes
+    ----------
+    max_size : int
+        最大缓存大小，单位字节
+    stats : CacheStats
+        命中统计
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+        self._entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """
+        当前缓存大小，单位字节
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        读取缓存，不存在时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                self.stats.record("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.record("hits")
+        return _share(entry[0])
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """
+        写入缓存，返回可以交给调用者的对象。超过 ``max_size`` 的对象不缓存。
+        """
+        nbytes = get_nbytes(value)
+        if nbytes > self.max_size:
+            logger.debug(f"result is larger than cache size, skip cache: {nbytes} bytes")
+            return value
+
+        value = _freeze(value)
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._size -= old_entry[1]
+            self._entries[key] = (value, nbytes)
+            self._size += nbytes
+            self.stats.record("stores")
+
+            while self._size > self.max_size:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._size -= evicted_nbytes
+                self.stats.record("evictions")
+
+        return _share(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def get_result_cache_key(
+        function_name: str,
+        interface_id: str,
+        params: Dict,
+        server_id: str,
+        **options,
+) -> Optional[Tuple[str, str]]:
+    """
+    生成检索结果的缓存键，``options`` 为影响结果的其他参数，例如 ``dtype``
+
+    最新时次接口 (``getSurfLatestTime`` 等) 和带有 ``latestTime`` 参数的检索结果随时间变化，返回 None，不使用缓存。
+    参见 ``is_cacheable_request``
+    """
+    if not is_cacheable_request(interface_id, function_name, params):
+        return None
+    options = {f"__{key}": str(value) for key, value in options.items()}
+    return function_name, make_cache_key(interface_id, function_name, {**params, **options}, server_id)
+
+
+def get_cached_result(
+        cache: Optional[ResultCache],
+        key: Optional[Hashable],
+        retrieve: Callable[[], Any],
+) -> Any:
+    """
+    从缓存中读取结果，不存在时调用 ``retrieve`` 检索并写入缓存。``MusicError`` 不缓存。
+
+    Parameters
+    ----------
+    cache
+        结果缓存，None 表示不使用缓存
+    key
+        缓存键，None 表示不使用缓存
+    retrieve
+        检索函数
+    """
+    if cache is None or key is None:
+        return retrieve()
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = retrieve()
+    if isinstance(result, MusicError):
+        return result
+    return cache.put(key, result)
+
+
+async def get_cached_result_async(
+        cache: Optional[ResultCache],
+        key: Optional[Hashable],
+        retrieve: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    ``get_cached_result`` 的异步版本，``retrieve`` 为协程函数
+    """
+    if cache is None or key is None:
+        return await retrieve()
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = await retrieve()
+    if isinstance(result, MusicError):
+        return result
+    return cache.put(key, result)
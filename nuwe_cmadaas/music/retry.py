@@ -0,0 +1,214 @@
+import json
+import random
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Tuple, Optional, Callable, Any, Dict
+
+from nuwe_cmadaas._log import logger
+
+from .connection import Connection
+from .data import ResponseData
+
+
+@dataclass
+class RetryPolicy:
+    """
+    请求重试策略
+
+    请求失败且错误码属于可重试错误时，等待一段时间后重新请求。
+    第 n 次重试前的最长等待时间为 ``min(backoff_max, backoff_base * 2 ** (n - 1))``，
+    实际等待时间在 ``[(1 - jitter), 1]`` 倍最长等待时间之间随机选取，避免大量客户端同时重试。
+
+    Attributes
+    ----------
+    max_attempts
+        最大请求次数，包括第一次请求。为 1 时不重试。
+    retryable_error_codes
+        可重试的错误码，默认为网络请求出错 (-10001)
+    retry_gateway_errors
+        是否重试网关返回的错误 (``"flag":"slb"``)
+    backoff_base
+        第一次重试前的最长等待时间，单位秒
+    backoff_max
+        最长等待时间，单位秒
+    jitter
+        随机抖动比例，取值 0 到 1。为 0 时不抖动，为 1 时在 0 到最长等待时间之间随机选取
+    """
+    max_attempts: int = 3
+    retryable_error_codes: Tuple[int, ...] = (Connection.otherError,)
+    retry_gateway_errors: bool = True
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    jitter: float = 1.0
+
+    def should_retry(self, outcome: "RequestOutcome", attempt: int) -> bool:
+        """
+        第 ``attempt`` 次请求结果为 ``outcome`` 时是否需要重试
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if outcome.error_code in (None, 0):
+            return False
+        if outcome.is_gateway_error and self.retry_gateway_errors:
+            return True
+        return outcome.error_code in self.retryable_error_codes
+
+    def get_backoff(self, attempt: int) -> float:
+        """
+        第 ``attempt`` 次请求失败后的等待时间，单位秒
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class RetryStats:
+    """
+    重试统计，线程安全
+
+    Attributes
+    ----------
+    requests : int
+        请求数，同一请求的多次重试只计一次
+    attempts : int
+        实际发送的请求次数
+    retries : int
+        重试次数
+    retry_time : float
+        重试前等待的总时间，单位秒
+    exhausted : int
+        达到最大请求次数后仍然失败的请求数
+    error_codes : Counter
+        触发重试的错误码计数
+    """
+    def __init__(self):
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.retry_time = 0.0
+        self.exhausted = 0
+        self.error_codes = Counter()
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_attempt(self):
+        with self._lock:
+            self.attempts += 1
+
+    def record_retry(self, error_code: int, delay: float):
+        with self._lock:
+            self.retries += 1
+            self.retry_time += delay
+            self.error_codes[error_code] += 1
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return dict(
+                requests=self.requests,
+                attempts=self.attempts,
+                retries=self.retries,
+                retry_time=self.retry_time,
+                exhausted=self.exhausted,
+                error_codes=dict(self.error_codes),
+            )
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.attempts = 0
+            self.retries = 0
+            self.retry_time = 0.0
+            self.exhausted = 0
+            self.error_codes.clear()
+
+    def __repr__(self):
+        return f"RetryStats({self.to_dict()})"
+
+
+class RequestOutcome:
+    """
+    记录一次请求的错误码，用于判断是否需要重试。
+
+    包装 ``Connection.make_request`` 的回调函数，记录网络异常和网关错误。
+    成功回调返回 ``ResponseData`` 时使用其中的错误码。
+    """
+    def __init__(self):
+        self.error_code: Optional[int] = None
+        self.is_gateway_error = False
+        self.is_connection_error = False
+
+    def wrap_failure_handler(self, failure_handler: Callable[[bytes], Any]) -> Callable[[bytes], Any]:
+        def handle_failure(content: bytes):
+            self.is_gateway_error = True
+            try:
+                self.error_code = json.loads(content)["returnCode"]
+            except (ValueError, KeyError, TypeError):
+                self.error_code = Connection.otherError
+            return failure_handler(content)
+        return handle_failure
+
+    def wrap_exception_handler(self, exception_handler: Callable[[Exception], Any]) -> Callable[[Exception], Any]:
+        def handle_exception(e: Exception):
+            self.error_code = Connection.otherError
+            self.is_connection_error = True
+            return exception_handler(e)
+        return handle_exception
+
+    def update_from_result(self, result: Any):
+        if self.error_code is None and isinstance(result, ResponseData):
+            self.error_code = result.request.error_code
+
+
+class RetryLoop:
+    """
+    一个请求的重试状态，同步和异步客户端共用
+
+    每次发送请求前调用 ``start_attempt``，请求结束后使用 ``get_retry_delay`` 判断是否重试。
+    调用方只负责等待 (``time.sleep`` 或 ``asyncio.sleep``)。
+
+    .. code-block:: python
+
+        retry_loop = RetryLoop(retry_policy, retry_stats, "request")
+        while True:
+            retry_loop.start_attempt()
+            result = ...
+            delay = retry_loop.get_retry_delay(outcome)
+            if delay is None:
+                return result
+            time.sleep(delay)
+    """
+    def __init__(self, retry_policy: RetryPolicy, retry_stats: RetryStats, description: str = "request"):
+        self.retry_policy = retry_policy
+        self.retry_stats = retry_stats
+        self.description = description
+        self.attempt = 0
+        retry_stats.record_request()
+
+    def start_attempt(self):
+        self.attempt += 1
+        self.retry_stats.record_attempt()
+
+    def get_retry_delay(self, outcome: RequestOutcome) -> Optional[float]:
+        """
+        返回重试前的等待时间，单位秒。不需要重试时返回 None
+        """
+        error_code = outcome.error_code
+        if not self.retry_policy.should_retry(outcome, self.attempt):
+            if self.attempt > 1 and error_code not in (None, 0):
+                self.retry_stats.record_exhausted()
+            return None
+
+        delay = self.retry_policy.get_backoff(self.attempt)
+        logger.warning(
+            f"{self.description} error {error_code}, "
+            f"retry {self.attempt}/{self.retry_policy.max_attempts - 1} after {delay:.2f}s"
+        )
+        self.retry_stats.record_retry(error_code, delay)
+        return delay
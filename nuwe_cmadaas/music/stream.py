@@ -0,0 +1,302 @@
+"""
+流式解码 ``RetArray2D``，在接收数据的同时按行分批返回结果。
+
+``RetArray2D`` 中的数据按行依次编码为多个 ``data`` 字段 (字段编号 1)，请求信息 ``request`` (2)
+和要素名称 ``elementNames`` (3) 位于数据之后。
+从一个已知的字段起始位置开始，只有当字节串恰好在字段边界结束时 protobuf 才能解析成功，
+因此可以在已接收数据的末尾附近寻找候选边界，使用 protobuf 的 C 实现同时验证边界和解码数据，
+不需要在 Python 中逐个字段遍历。
+"""
+from typing import Iterator, AsyncIterator, Callable, List, Optional, Union, Iterable, AsyncIterable, Tuple, TYPE_CHECKING
+
+import numpy as np
+from google.protobuf.message import DecodeError
+
+from nuwe_cmadaas._log import logger
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+
+from .data import RequestInfo
+from .element import ElementSchema, get_element_dtype, decode_column
+from .wire import WIRE_LENGTH_DELIMITED, WireFormatError, _read_varint
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+Batch = Union["pd.DataFrame", np.recarray]
+
+
+class Array2DBatchReader:
+    """
+    ``RetArray2D`` 的流式解码器
+
+    使用 ``feed`` 输入接收到的数据块，返回已经完整接收的行组成的批次，全部数据接收完成后调用 ``close`` 返回剩余的行。
+    内存占用与批次大小有关，与总行数无关。
+
+    由于要素名称位于数据之后，需要提前提供要素名称以确定列数，通常与请求参数 ``elements`` 相同。
+    没有提供要素名称时只能在全部数据接收完成后返回结果。
+
+    Attributes
+    ----------
+    element_names : List[str]
+        要素名称
+    batch_size : int
+        每批的行数
+    schema : Dict
+        要素类型表，参见 ``get_element_dtype``
+    output : str
+        批次格式，``pandas`` 返回 ``pd.DataFrame``，``records`` 返回 ``np.recarray``
+    request : RequestInfo
+        请求信息，全部数据接收完成后可用
+    row_count : int
+        已返回的行数
+    """
+    defaultBatchSize = 100000
+
+    # 在已接收数据末尾的多少字节内寻找候选字段边界
+    boundarySearchSize = 4096
+
+    def __init__(
+            self,
+            element_names: Optional[List[str]] = None,
+            batch_size: Optional[int] = None,
+            schema: Optional[ElementSchema] = None,
+            output: str = "pandas",
+    ):
+        if batch_size is None:
+            batch_size = Array2DBatchReader.defaultBatchSize
+        if output not in ("pandas", "records"):
+            raise ValueError(f"output is not supported: {output}")
+
+        self.element_names = element_names
+        self.batch_size = batch_size
+        self.schema = schema
+        self.output = output
+
+        self.request: Optional[RequestInfo] = None
+        self.row_count = 0
+
+        self._buffer = bytearray()
+        self._values: List[str] = []
+        self._wire_element_names: List[str] = []
+        self._pb_request = None
+
+    def feed(self, chunk: bytes) -> List[Batch]:
+        """
+        输入一个数据块，返回已经可以输出的批次
+        """
+        self._buffer.extend(chunk)
+        cut, message = self._find_boundary()
+        if cut > 0:
+            self._add_message(message)
+            del self._buffer[:cut]
+        return self._get_batches(final=False)
+
+    def close(self) -> List[Batch]:
+        """
+        数据接收完成，返回剩余的批次，并设置 ``request``。
+
+        Raises
+        ------
+        ValueError
+            数据不完整，或者要素名称与提供的不一致
+        """
+        if len(self._buffer) > 0:
+            message = pb.RetArray2D()
+            try:
+                message.ParseFromString(bytes(self._buffer))
+            except DecodeError as e:
+                raise ValueError(f"incomplete RetArray2D message: {e}")
+            self._add_message(message)
+            self._buffer.clear()
+
+        self.request = RequestInfo()
+        if self._pb_request is not None:
+            self.request.load_protobuf(self._pb_request)
+
+        if self.element_names is None:
+            self.element_names = self._wire_element_names
+        elif len(self._wire_element_names) > 0 and self._wire_element_names != list(self.element_names):
+            raise ValueError(
+                f"element names mismatch: expected {self.element_names}, got {self._wire_element_names}"
+            )
+
+        return self._get_batches(final=True)
+
+    def _find_boundary(self) -> Tuple[int, Optional[pb.RetArray2D]]:
+        """
+        返回缓冲区中最后一个完整字段的结束位置及其之前数据的解析结果，没有完整字段时返回 ``(0, None)``
+
+        缓冲区总是从字段边界开始，因此缓冲区前缀能够被成功解析，当且仅当前缀在字段边界结束。
+        从末尾附近的每个候选位置出发跳过后续字段得到候选结束位置，再由解析结果确认。
+        """
+        buffer = self._buffer
+        end = len(buffer)
+        search_size = self.boundarySearchSize
+        while True:
+            window_start = max(0, end - search_size)
+            for candidate in range(window_start, end):
+                cut = self._follow_fields(candidate, end)
+                if cut is None or cut == 0:
+                    continue
+                message = pb.RetArray2D()
+                try:
+                    message.ParseFromString(bytes(buffer[:cut]))
+                except DecodeError:
+                    continue
+                return cut, message
+            if window_start == 0:
+                return 0, None
+            search_size *= 2
+
+    def _follow_fields(self, position: int, end: int) -> Optional[int]:
+        """
+        假设 ``position`` 为字段起始位置，依次跳过后续字段，返回最后一个完整字段的结束位置。
+        不符合 RetArray2D 编码格式时返回 None
+        """
+        buffer = self._buffer
+        last_end = position
+        try:
+            while position < end:
+                tag, position = _read_varint(buffer, position)
+                if tag & 0x07 != WIRE_LENGTH_DELIMITED or not 1 <= tag >> 3 <= 3:
+                    return None
+                length, position = _read_varint(buffer, position)
+                position += length
+                if position > end:
+                    break
+                last_end = position
+        except WireFormatError:
+            pass
+        return last_end
+
+    def _add_message(self, message: pb.RetArray2D):
+        self._values.extend(message.data)
+        self._wire_element_names.extend(message.elementNames)
+        if message.HasField("request"):
+            self._pb_request = message.request
+
+    def _get_batches(self, final: bool) -> List[Batch]:
+        if self.element_names is None:
+            return []
+
+        col_count = len(self.element_names)
+        if col_count == 0:
+            return []
+
+        batches = []
+        batch_value_count = self.batch_size * col_count
+        while len(self._values) >= batch_value_count or (final and len(self._values) > 0):
+            values = self._values[:batch_value_count]
+            del self._values[:batch_value_count]
+            if len(values) % col_count != 0:
+                raise ValueError(f"value count {len(values)} is not a multiple of column count {col_count}")
+            batches.append(self._create_batch(values, col_count))
+        return batches
+
+    def _create_batch(self, values: List[str], col_count: int) -> Batch:
+        columns = [
+            decode_column(values[index::col_count], get_element_dtype(name, self.schema), name)
+            for index, name in enumerate(self.element_names)
+        ]
+        self.row_count += len(values) // col_count
+
+        if self.output == "records":
+            return np.rec.fromarrays(columns, names=list(self.element_names))
+
+        import pandas as pd
+
+        df = pd.DataFrame({index: column for index, column in enumerate(columns)}, copy=False)
+        df.columns = self.element_names
+        return df
+
+
+class Array2DBatches:
+    """
+    ``CMADaaSClient.callAPI_to_array2D_batches`` 的返回值，遍历时发送请求并逐批返回结果。
+
+    请求出错或者数据传输中断时停止遍历，错误信息保存在 ``request`` 中，
+    因此遍历结束后应检查 ``request.error_code``，不为 0 时已返回的批次不完整。
+
+    Attributes
+    ----------
+    reader : Array2DBatchReader
+    request : RequestInfo
+        请求信息，遍历结束后可用
+    """
+    def __init__(
+            self,
+            reader: Array2DBatchReader,
+            open_stream: Callable[[], Union[Iterable[bytes], AsyncIterable[bytes]]],
+    ):
+        self.reader = reader
+        self.request = RequestInfo()
+        self._open_stream = open_stream
+
+    def __iter__(self) -> Iterator[Batch]:
+        try:
+            chunks = iter(self._open_stream())
+            first_chunk = next(chunks, b"")
+            if self._check_getway_error(first_chunk, chunks):
+                return
+            yield from self.reader.feed(first_chunk)
+            for chunk in chunks:
+                yield from self.reader.feed(chunk)
+        except Exception as e:
+            self._set_exception(e)
+            return
+
+        yield from self._close()
+
+    async def __aiter__(self) -> AsyncIterator[Batch]:
+        try:
+            chunks = self._open_stream().__aiter__()
+            first_chunk = b""
+            async for first_chunk in chunks:
+                break
+            if _is_getway_content(first_chunk):
+                content = first_chunk + b"".join([chunk async for chunk in chunks])
+                self._set_getway_error(content)
+                return
+            for batch in self.reader.feed(first_chunk):
+                yield batch
+            async for chunk in chunks:
+                for batch in self.reader.feed(chunk):
+                    yield batch
+        except Exception as e:
+            self._set_exception(e)
+            return
+
+        for batch in self._close():
+            yield batch
+
+    def _close(self) -> List[Batch]:
+        try:
+            batches = self.reader.close()
+        except ValueError as e:
+            self._set_exception(e)
+            return []
+        self.request = self.reader.request
+        return batches
+
+    def _check_getway_error(self, first_chunk: bytes, chunks: Iterator[bytes]) -> bool:
+        if not _is_getway_content(first_chunk):
+            return False
+        self._set_getway_error(first_chunk + b"".join(chunks))
+        return True
+
+    def _set_getway_error(self, content: bytes):
+        from .connection import Connection
+        self.request.error_code, self.request.error_message = Connection._parse_getway_error(content)
+        logger.warning(f"request error {self.request.error_code}: {self.request.error_message}")
+
+    def _set_exception(self, e: Exception):
+        from .connection import Connection
+        logger.warning(f"Error retrieving data: {e}")
+        self.request.error_code = Connection.otherError
+        self.request.error_message = f"Error retrieving data: {e}"
+
+
+def _is_getway_content(content: bytes) -> bool:
+    from .connection import Connection
+    return Connection._check_getway_flag(content)
@@ -0,0 +1,266 @@
+import asyncio
+import collections
+import contextlib
+import threading
+import time
+from typing import Optional, Dict, Tuple, Iterator, AsyncIterator
+
+from nuwe_cmadaas._log import logger
+
+
+class TokenBucket:
+    """
+    令牌桶限速器，线程安全
+
+    令牌以 ``rate`` 个每秒的速度加入桶中，桶中最多保存 ``burst`` 个令牌。
+    每个请求消耗一个令牌，令牌不足时需要等待。
+
+    Attributes
+    ----------
+    rate
+        每秒生成的令牌数，即长期平均的最大请求速率
+    burst
+        桶容量，即允许的最大突发请求数
+    """
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        if burst is None:
+            burst = max(1, int(rate))
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预定一个令牌，返回使用该令牌前需要等待的时间，单位秒。
+
+        令牌不足时令牌数可以为负数，表示已被预定的未来令牌，
+        因此并发调用时每个调用者得到的等待时间依次递增，不会同时醒来。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_time) * self.rate)
+            self._last_time = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        获取一个令牌，令牌不足时阻塞等待，返回等待时间
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class ConcurrencyLimit:
+    """
+    并发许可计数，线程和协程共用，线程安全
+
+    线程使用 ``acquire`` 阻塞等待。协程使用 ``acquire_async`` 等待时注册一个 ``asyncio.Future``，
+    释放许可时直接将许可交给等待的协程，并通过 ``call_soon_threadsafe`` 唤醒，不需要轮询。
+
+    Attributes
+    ----------
+    value
+        最大并发数
+    """
+    def __init__(self, value: int):
+        self.value = value
+        self._available = value
+        self._condition = threading.Condition()
+        self._async_waiters = collections.deque()
+
+    def acquire(self):
+        with self._condition:
+            while self._available <= 0:
+                self._condition.wait()
+            self._available -= 1
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._available > 0:
+                self._available -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._async_waiters.append(waiter)
+
+        future = waiter[1]
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+                    raise
+            # 许可已经交给该协程
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._condition:
+            if len(self._async_waiters) > 0:
+                loop, future = self._async_waiters.popleft()
+                loop.call_soon_threadsafe(self._wake_async_waiter, future)
+                return
+            self._available += 1
+            self._condition.notify()
+
+    def _wake_async_waiter(self, future: asyncio.Future):
+        if future.cancelled():
+            # 等待的协程已取消，归还许可
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ServerThrottle:
+    """
+    单个 MUSIC 服务的请求限速和并发控制，线程安全
+
+    同一服务 (``server_ip``, ``server_id``) 的所有客户端和线程共用一个对象，
+    使用 ``get_server_throttle`` 获取。
+
+    Attributes
+    ----------
+    rate_limit : float
+        每秒最大请求数，None 表示不限速
+    rate_burst : int
+        允许的最大突发请求数
+    max_concurrency : int
+        最大并发请求数，None 表示不限制
+    requests : int
+        已发送的请求数
+    throttled_time : float
+        因限速和并发控制而等待的总时间，单位秒
+    """
+    def __init__(
+            self,
+            rate_limit: Optional[float] = None,
+            rate_burst: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+    ):
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.max_concurrency = max_concurrency
+
+        self._bucket = None
+        if rate_limit is not None:
+            self._bucket = TokenBucket(rate_limit, rate_burst)
+
+        self._semaphore = None
+        if max_concurrency is not None:
+            self._semaphore = ConcurrencyLimit(max_concurrency)
+
+        self.requests = 0
+        self.throttled_time = 0.0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        获取一个请求许可，在 ``with`` 语句中发送请求。
+        """
+        start_time = time.monotonic()
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        try:
+            if self._bucket is not None:
+                self._bucket.acquire()
+            self._record(time.monotonic() - start_time)
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def async_slot(self) -> AsyncIterator[None]:
+        """
+        ``slot`` 的异步版本，等待时不阻塞事件循环。
+
+        与同步版本共用同一个并发计数，因此线程和协程的请求一起受到限制。
+        """
+        start_time = time.monotonic()
+        if self._semaphore is not None:
+            await self._semaphore.acquire_async()
+        try:
+            if self._bucket is not None:
+                delay = self._bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._record(time.monotonic() - start_time)
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def _record(self, wait_time: float):
+        with self._lock:
+            self.requests += 1
+            self.throttled_time += wait_time
+
+    def __repr__(self):
+        return (
+            f"ServerThrottle(rate_limit={self.rate_limit}, rate_burst={self.rate_burst}, "
+            f"max_concurrency={self.max_concurrency})"
+        )
+
+
+_server_throttles: Dict[Tuple[str, str], ServerThrottle] = dict()
+_server_throttles_lock = threading.Lock()
+
+
+def get_server_throttle(
+        server_ip: str,
+        server_id: str,
+        rate_limit: Optional[float] = None,
+        rate_burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+) -> Optional[ServerThrottle]:
+    """
+    获取 MUSIC 服务的限速对象，同一服务在进程内只创建一次。
+
+    限速参数只在第一次创建时生效。之后使用不同参数获取同一服务的限速对象时，
+    仍返回已有对象，并输出警告。
+
+    Parameters
+    ----------
+    server_ip
+    server_id
+    rate_limit
+        每秒最大请求数
+    rate_burst
+        允许的最大突发请求数，默认与 ``rate_limit`` 相同
+    max_concurrency
+        最大并发请求数
+
+    Returns
+    -------
+    Optional[ServerThrottle]
+        不限速且不限制并发时返回 None
+    """
+    if rate_limit is None and max_concurrency is None:
+        return None
+
+    key = (server_ip, server_id)
+    with _server_throttles_lock:
+        throttle = _server_throttles.get(key, None)
+        if throttle is None:
+            throttle = ServerThrottle(rate_limit, rate_burst, max_concurrency)
+            _server_throttles[key] = throttle
+        elif (
+                throttle.rate_limit != rate_limit
+                or throttle.rate_burst != rate_burst
+                or throttle.max_concurrency != max_concurrency
+        ):
+            logger.warning(f"throttle for {server_ip} {server_id} already exists, ignore new settings: {throttle}")
+    return throttle
@@ -0,0 +1,139 @@
+"""
+protobuf 编码格式的底层读取函数，用于快速解码大数组字段。
+
+protobuf 的 Python 实现解析 ``repeated float`` 字段时会为每个元素生成 Python 对象。
+格点数据的数值以 packed 格式编码，即连续存放的 little-endian float32，
+可以直接使用 ``np.frombuffer`` 读取，不需要逐个元素转换。
+"""
+from typing import Dict, List, Tuple, Iterable
+
+import numpy as np
+
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+FLOAT32_DTYPE = np.dtype("<f4")
+
+
+class WireFormatError(ValueError):
+    """
+    无法使用快速方式解码的数据，例如非 packed 格式编码的数组字段。
+    """
+    pass
+
+
+def _read_varint(content: bytes, position: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(content):
+            raise WireFormatError("truncated varint")
+        byte = content[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def split_packed_fields(
+        content: bytes,
+        field_numbers: Iterable[int],
+) -> Tuple[Dict[int, List[Tuple[int, int]]], bytes]:
+    """
+    从消息中分离 packed 格式的数组字段
+
+    只遍历消息的顶层字段，不解析字段内容。
+
+    Parameters
+    ----------
+    content
+        protobuf 消息字节串
+    field_numbers
+        需要分离的字段编号
+
+    Returns
+    -------
+    Tuple[Dict[int, List[Tuple[int, int]]], bytes]
+        第一项为每个分离字段在 ``content`` 中的数据范围 (起始位置, 结束位置) 列表，
+        第二项为去除这些字段后的消息，可以使用 ``ParseFromString`` 解析其余字段。
+
+    Raises
+    ------
+    WireFormatError
+        数据格式错误，或分离字段不是 packed 格式
+    """
+    field_numbers = set(field_numbers)
+    segments = {number: [] for number in field_numbers}
+    remaining = []
+
+    position = 0
+    end = len(content)
+    while position < end:
+        field_start = position
+        tag, position = _read_varint(content, position)
+        field_number = tag >> 3
+        wire_type = tag & 0x07
+
+        if wire_type == WIRE_VARINT:
+            _, position = _read_varint(content, position)
+        elif wire_type == WIRE_FIXED64:
+            position += 8
+        elif wire_type == WIRE_FIXED32:
+            position += 4
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            length, position = _read_varint(content, position)
+            if field_number in field_numbers:
+                segments[field_number].append((position, position + length))
+                position += length
+                continue
+            position += length
+        else:
+            raise WireFormatError(f"unsupported wire type {wire_type}")
+
+        if position > end:
+            raise WireFormatError("truncated message")
+        if field_number in field_numbers:
+            raise WireFormatError(f"field {field_number} is not packed")
+        remaining.append(content[field_start:position])
+
+    return segments, b"".join(remaining)
+
+
+def read_packed_float32(content: bytes, segments: List[Tuple[int, int]]) -> np.ndarray:
+    """
+    读取 packed 格式的 float32 数组
+
+    只有一段数据时返回与 ``content`` 共享内存的只读数组，不复制数据。
+
+    Parameters
+    ----------
+    content
+        protobuf 消息字节串
+    segments
+        数据范围列表，由 ``split_packed_fields`` 返回
+
+    Returns
+    -------
+    np.ndarray
+        float32 数组
+    """
+    arrays = []
+    for start, end in segments:
+        if (end - start) % FLOAT32_DTYPE.itemsize != 0:
+            raise WireFormatError("packed float field has invalid length")
+        arrays.append(np.frombuffer(
+            content,
+            dtype=FLOAT32_DTYPE,
+            count=(end - start) // FLOAT32_DTYPE.itemsize,
+            offset=start,
+        ))
+
+    if len(arrays) == 0:
+        return np.empty(0, dtype=FLOAT32_DTYPE)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.concatenate(arrays)
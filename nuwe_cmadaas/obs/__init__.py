@@ -1,4 +1,15 @@
-from .station import retrieve_obs_station
-from .upper_air import retrieve_obs_upper_air, download_obs_upper_air_file
-from .file import download_obs_file
-from .grid import retrieve_obs_grid
+from nuwe_cmadaas._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "retrieve_obs_station": ".station",
+    "retrieve_obs_station_async": ".station",
+    "retrieve_obs_upper_air": ".upper_air",
+    "download_obs_upper_air_file": ".upper_air",
+    "download_obs_upper_air_file_async": ".upper_air",
+    "download_obs_file": ".file",
+    "download_obs_file_async": ".file",
+    "retrieve_obs_grid": ".grid",
+    "build_profile_cube": ".profile",
+    "StationCatalog": ".catalog",
+    "load_station_catalog": ".catalog",
+})
@@ -0,0 +1,254 @@
+"""
+站点信息目录
+
+从 ``STA_INFO_SURF_CHN`` 下载站点信息并保存到本地，按 TTL 定期更新，
+使用经纬度空间索引在本地查询最近站点、半径范围和经纬度范围内的站点，不需要每次调用 ``getStaInfoInRect`` 等接口。
+"""
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from nuwe_cmadaas._log import logger
+from nuwe_cmadaas.config import CMADaasConfig
+from nuwe_cmadaas.music import MusicError, CMADaaSClient, get_or_create_client
+from nuwe_cmadaas.music.element import get_element_dtype
+
+from .util import _get_table_result
+
+
+STATION_CATALOG_DATA_CODE = "STA_INFO_SURF_CHN"
+
+STATION_CATALOG_ELEMENTS = "Station_Id_C,Station_Name,Province,City,Cnty,Lat,Lon,Alti"
+
+# 站点信息默认保存目录
+DEFAULT_CATALOG_DIR = Path(Path.home(), ".cache/nuwe_cmadaas/catalog")
+
+# 默认更新间隔，单位秒
+DEFAULT_CATALOG_TTL = 7 * 24 * 3600
+
+EARTH_RADIUS = 6371.0
+
+# StationCatalog.select 支持的区域类型，其他类型 (例如流域 basin 和地区 region) 需要由服务端筛选
+CATALOG_REGION_TYPES = ("rect", "circle", "nearest")
+
+
+class StationCatalog:
+    """
+    站点信息目录，支持最近站点、半径范围和经纬度范围查询
+
+    站点坐标转换为单位球面上的三维坐标后建立 KD 树，按球面距离查询。
+    安装 ``scipy`` 时使用 ``scipy.spatial.cKDTree``，否则使用 numpy 向量化计算所有站点的距离。
+    经纬度范围查询使用按纬度排序的数组二分查找。
+
+    Attributes
+    ----------
+    table : pd.DataFrame
+        站点信息表格，至少包含 ``Station_Id_C``、``Lat`` 和 ``Lon`` 列
+    """
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.reset_index(drop=True)
+        self._lats = self.table["Lat"].to_numpy(dtype=np.float64)
+        self._lons = self.table["Lon"].to_numpy(dtype=np.float64)
+        self._xyz = _to_xyz(self._lats, self._lons)
+        self._tree = _create_tree(self._xyz)
+
+        self._lat_order = np.argsort(self._lats, kind="stable")
+        self._sorted_lats = self._lats[self._lat_order]
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def station_ids(self) -> List[str]:
+        return self.table["Station_Id_C"].tolist()
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> pd.DataFrame:
+        """
+        查询距离 (``latitude``, ``longitude``) 最近的 ``k`` 个站点，按距离由近到远排列
+
+        ``k`` 至少为 1，超过站点数时返回所有站点，站点目录为空时返回空表格。
+
+        Returns
+        -------
+        pd.DataFrame
+            站点信息，增加 ``distance`` 列，为球面距离，单位千米
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1: {k}")
+        k = min(k, len(self))
+        if k == 0:
+            return self._get_stations(np.array([], dtype=np.intp), np.array([], dtype=np.float64))
+        point = _to_xyz(np.array([latitude]), np.array([longitude]))[0]
+        if self._tree is not None:
+            chord, indices = self._tree.query(point, k=k)
+            chord, indices = np.atleast_1d(chord), np.atleast_1d(indices)
+        else:
+            chords = np.linalg.norm(self._xyz - point, axis=1)
+            indices = np.argpartition(chords, k - 1)[:k]
+            indices = indices[np.argsort(chords[indices], kind="stable")]
+            chord = chords[indices]
+        return self._get_stations(indices, chord)
+
+    def within_radius(self, latitude: float, longitude: float, radius: float) -> pd.DataFrame:
+        """
+        查询与 (``latitude``, ``longitude``) 的球面距离不超过 ``radius`` 千米的站点，按距离由近到远排列
+
+        Returns
+        -------
+        pd.DataFrame
+            站点信息，增加 ``distance`` 列，单位千米
+        """
+        point = _to_xyz(np.array([latitude]), np.array([longitude]))[0]
+        max_chord = 2 * np.sin(min(radius / EARTH_RADIUS, np.pi) / 2)
+        if self._tree is not None:
+            indices = np.array(self._tree.query_ball_point(point, max_chord), dtype=np.intp)
+            chords = np.linalg.norm(self._xyz[indices] - point, axis=1)
+        else:
+            chords = np.linalg.norm(self._xyz - point, axis=1)
+            indices = np.flatnonzero(chords <= max_chord)
+            chords = chords[indices]
+        order = np.argsort(chords, kind="stable")
+        return self._get_stations(indices[order], chords[order])
+
+    def within_rect(
+            self,
+            start_latitude: float,
+            end_latitude: float,
+            start_longitude: float,
+            end_longitude: float,
+    ) -> pd.DataFrame:
+        """
+        查询经纬度范围内 (包括边界) 的站点，按原始顺序排列
+        """
+        min_lat, max_lat = sorted([start_latitude, end_latitude])
+        min_lon, max_lon = sorted([start_longitude, end_longitude])
+        start = np.searchsorted(self._sorted_lats, min_lat, side="left")
+        end = np.searchsorted(self._sorted_lats, max_lat, side="right")
+        indices = self._lat_order[start:end]
+        lons = self._lons[indices]
+        indices = np.sort(indices[(lons >= min_lon) & (lons <= max_lon)])
+        return self.table.iloc[indices]
+
+    def select(self, region: Dict) -> pd.DataFrame:
+        """
+        按区域筛选条件查询站点
+
+        - 经纬度范围：``{"type": "rect", "start_latitude": ..., "end_latitude": ..., "start_longitude": ..., "end_longitude": ...}``
+        - 半径范围：``{"type": "circle", "latitude": ..., "longitude": ..., "radius": ...}``，半径单位为千米
+        - 最近站点：``{"type": "nearest", "latitude": ..., "longitude": ..., "count": ...}``
+        """
+        region_type = region["type"]
+        if region_type == "rect":
+            return self.within_rect(
+                region["start_latitude"],
+                region["end_latitude"],
+                region["start_longitude"],
+                region["end_longitude"],
+            )
+        elif region_type == "circle":
+            return self.within_radius(region["latitude"], region["longitude"], region["radius"])
+        elif region_type == "nearest":
+            return self.nearest(region["latitude"], region["longitude"], region.get("count", 1))
+        else:
+            raise ValueError(f"region type is not supported by station catalog: {region_type}")
+
+    def _get_stations(self, indices: np.ndarray, chords: np.ndarray) -> pd.DataFrame:
+        stations = self.table.iloc[indices].copy()
+        stations["distance"] = 2 * EARTH_RADIUS * np.arcsin(np.clip(chords / 2, 0, 1))
+        return stations
+
+
+def load_station_catalog(
+        catalog_dir: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = None,
+        data_code: str = STATION_CATALOG_DATA_CODE,
+        elements: str = STATION_CATALOG_ELEMENTS,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[CMADaaSClient] = None,
+) -> Union[StationCatalog, MusicError]:
+    """
+    加载站点信息目录
+
+    本地文件不存在或超过 ``ttl`` 时从 CMADaaS 下载站点信息并保存为 CSV 文件，否则直接读取本地文件。
+    下载失败但存在过期的本地文件时，使用过期文件并输出警告。
+
+    Parameters
+    ----------
+    catalog_dir
+        站点信息保存目录，默认为 ``~/.cache/nuwe_cmadaas/catalog``
+    ttl
+        更新间隔，单位秒，默认为 7 天
+    data_code
+        站点信息资料代码，默认为 ``STA_INFO_SURF_CHN``
+    elements
+        站点信息要素，必须包含 ``Station_Id_C``、``Lat`` 和 ``Lon``
+    config
+        配置，配置对象或配置文件路径。默认自动查找配置文件
+    client
+        客户端对象，默认新建。如果设置则直接使用，忽略 config 参数
+
+    Returns
+    -------
+    Union[StationCatalog, MusicError]
+        下载失败且没有本地文件时返回 ``MusicError``
+    """
+    if catalog_dir is None:
+        catalog_dir = DEFAULT_CATALOG_DIR
+    if ttl is None:
+        ttl = DEFAULT_CATALOG_TTL
+    element_names = elements.split(",")
+    file_path = Path(catalog_dir, f"{data_code}.csv")
+
+    if file_path.exists() and time.time() - file_path.stat().st_mtime < ttl:
+        return StationCatalog(_read_catalog_file(file_path, element_names))
+
+    cmadaas_client = get_or_create_client(config, client)
+    result = cmadaas_client.callAPI_to_array2D(
+        "getStaInfoInRect",
+        {
+            "dataCode": data_code,
+            "elements": elements,
+            "minLat": "-90",
+            "maxLat": "90",
+            "minLon": "-180",
+            "maxLon": "180",
+        },
+    )
+    table = _get_table_result(result)
+    if isinstance(table, MusicError):
+        if file_path.exists():
+            logger.warning(f"update station catalog failed, use expired file: {file_path}")
+            return StationCatalog(_read_catalog_file(file_path, element_names))
+        return table
+
+    # 先写入临时文件再替换，避免其他进程读取到不完整的文件
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    table.to_csv(temp_path, index=False)
+    temp_path.replace(file_path)
+    logger.info(f"station catalog is saved: {file_path}")
+    return StationCatalog(table)
+
+
+def _read_catalog_file(file_path: Path, element_names: List[str]) -> pd.DataFrame:
+    dtype = {name: get_element_dtype(name) for name in element_names}
+    return pd.read_csv(file_path, dtype=dtype, keep_default_na=False, na_values=[""])
+
+
+def _to_xyz(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat = np.deg2rad(lats)
+    lon = np.deg2rad(lons)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+
+def _create_tree(xyz: np.ndarray):
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        logger.debug("scipy is not installed, use numpy to query station catalog")
+        return None
+    return cKDTree(xyz)
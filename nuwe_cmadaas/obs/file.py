@@ -1,4 +1,4 @@
-from typing import Union, List, Tuple, Optional, TypedDict
+from typing import Union, List, Tuple, Optional, Dict, TypedDict
 from pathlib import Path
 
 import pandas as pd
@@ -10,7 +10,14 @@ from nuwe_cmadaas.util import (
     get_region_params,
 )
 from nuwe_cmadaas.config import CMADaasConfig
-from nuwe_cmadaas.music import get_or_create_client, CMADaaSClient, MusicError
+from nuwe_cmadaas.music import (
+    MusicError,
+    FilesInfo,
+    CMADaaSClient,
+    AsyncCMADaaSClient,
+    get_or_create_client,
+    get_or_create_async_client,
+)
 
 from .util import _get_interface_id, InterfaceConfig
 
@@ -26,6 +33,8 @@ def download_obs_file(
         count: int = None,
         output_dir: str = "./",
         interface_data_type: str = "Surf",
+        max_workers: Optional[int] = None,
+        resume: bool = False,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
         **kwargs,
@@ -105,6 +114,10 @@ def download_obs_file(
         保存文件的目录
     interface_data_type:
         资料类型
+    max_workers:
+        最大并发下载数，默认使用客户端的 ``download_workers`` 设置
+    resume:
+        是否启用断点续传，中断的下载再次运行时从中断处继续
     config:
         配置。配置文件路径或配置对象
     client:
@@ -117,7 +130,84 @@ def download_obs_file(
 
     Returns
     -------
+    List[Path] or MusicError
+        下载成功的文件路径列表。部分文件下载失败时只返回下载成功的文件并输出警告，
+        检索出错或全部文件下载失败时返回 MusicError
     """
+    interface_id, params = _get_file_request(
+        data_code=data_code,
+        elements=elements,
+        time=time,
+        station=station,
+        region=region,
+        station_level=station_level,
+        order=order,
+        count=count,
+        interface_data_type=interface_data_type,
+        **kwargs,
+    )
+
+    cmadaas_client = get_or_create_client(config, client)
+    result = cmadaas_client.callAPI_to_downFile(
+        interface_id, params, file_dir=output_dir, max_workers=max_workers, resume=resume
+    )
+    return _get_file_result(result, output_dir)
+
+
+async def download_obs_file_async(
+        data_code: str,
+        elements: str = None,
+        time: Union[pd.Interval, pd.Timestamp, List, pd.Timedelta] = None,
+        station: Union[str, List, Tuple] = None,
+        region=None,
+        station_level: Union[str, List[str]] = None,
+        order: str = None,
+        count: int = None,
+        output_dir: str = "./",
+        interface_data_type: str = "Surf",
+        max_workers: Optional[int] = None,
+        resume: bool = False,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+        **kwargs,
+) -> Union[List[Path], MusicError]:
+    """
+    ``download_obs_file`` 的异步版本，使用 ``AsyncCMADaaSClient`` 下载观测数据文件。
+
+    参数和返回值与 ``download_obs_file`` 相同。
+    """
+    interface_id, params = _get_file_request(
+        data_code=data_code,
+        elements=elements,
+        time=time,
+        station=station,
+        region=region,
+        station_level=station_level,
+        order=order,
+        count=count,
+        interface_data_type=interface_data_type,
+        **kwargs,
+    )
+
+    async with get_or_create_async_client(config, client) as cmadaas_client:
+        result = await cmadaas_client.callAPI_to_downFile(
+            interface_id, params, file_dir=output_dir, max_workers=max_workers, resume=resume
+        )
+    return _get_file_result(result, output_dir)
+
+
+def _get_file_request(
+        data_code: str,
+        elements: Optional[str],
+        time: Union[pd.Interval, pd.Timestamp, List, pd.Timedelta],
+        station: Union[str, List, Tuple],
+        region: Optional[Dict],
+        station_level: Union[str, List[str]],
+        order: Optional[str],
+        count: Optional[int],
+        interface_data_type: str,
+        **kwargs,
+) -> Tuple[str, Dict]:
     # if elements is None:
     #     elements = STATION_DATASETS[data_code]["elements"]
 
@@ -187,18 +277,28 @@ def download_obs_file(
 
     interface_id = _get_interface_id(interface_config)
     logger.info(f"interface_id: {interface_id}")
+    return interface_id, params
 
-    cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_downFile(interface_id, params, file_dir=output_dir)
 
-    if result.request.error_code != 0:
+def _get_file_result(result: FilesInfo, output_dir: Union[str, Path]) -> Union[List[Path], MusicError]:
+    files_info = result.files_info
+    failed_files = [f for f in files_info if f.download_error is not None]
+    if result.request.error_code != 0 and len(failed_files) in (0, len(files_info)):
+        # 检索出错或全部文件下载失败
         logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
         music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
         return music_error
 
-    files_info = result.files_info
+    if len(failed_files) > 0:
+        # 部分文件下载失败时返回下载成功的文件，每个文件的错误信息保存在 FileInfo.download_error 中
+        logger.warning(
+            f"{len(failed_files)}/{len(files_info)} files failed to download: "
+            f"{', '.join(f.file_name for f in failed_files)}"
+        )
+
     file_list = []
     for f in files_info:
-        file_list.append(Path(output_dir, f.file_name))
+        if f.download_error is None:
+            file_list.append(Path(output_dir, f.file_name))
 
     return file_list
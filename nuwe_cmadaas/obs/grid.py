@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pandas as pd
 import xarray as xr
+from numpy.typing import DTypeLike
 
 from nuwe_cmadaas._log import logger
 from nuwe_cmadaas.util import (
@@ -21,6 +22,7 @@ def retrieve_obs_grid(
         parameter: Optional[str] = None,
         time: Optional[Union[pd.Interval, pd.Timestamp, List]] = None,
         region: Optional[Dict] = None,
+        dtype: Optional[DTypeLike] = None,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
         **kwargs,
@@ -60,6 +62,8 @@ def retrieve_obs_grid(
     region
         区域筛选条件：
             - 经纬度范围 (rect)
+    dtype
+        要素场的数据类型，`float64` 或 `float32`，默认使用客户端的 ``dtype`` 设置 (默认为 `float64`)
     config
         配置。配置文件路径或配置对象
     client
@@ -106,7 +110,7 @@ def retrieve_obs_grid(
     logger.info(f"interface_id: {interface_id}")
 
     cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_gridArray2D(interface_id, params)
+    result = cmadaas_client.callAPI_to_gridArray2D(interface_id, params, dtype=dtype)
 
     if result.request.error_code != 0:
         logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
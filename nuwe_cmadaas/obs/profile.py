@@ -0,0 +1,140 @@
+"""
+高空观测廓线的多维数据集
+
+将 ``retrieve_obs_upper_air`` 返回的长表格 (每行为一个站点、一个层次、一个时次) 转换为
+``(time, station, level)`` 三维的 ``xr.Dataset``。
+"""
+from typing import List, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from nuwe_cmadaas.music.element import assemble_datetime
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+
+STATION_COLUMN = "Station_Id_d"
+
+LEVEL_COLUMN = "PRS_HWC"
+
+# 组成观测时间的要素，Min 可选
+TIME_COLUMNS = ["Year", "Mon", "Day", "Hour"]
+
+OPTIONAL_TIME_COLUMNS = ["Min"]
+
+# 站点坐标要素，作为 station 维度的坐标，取每个站点的第一条记录
+STATION_COORD_COLUMNS = ["Lat", "Lon", "Alti"]
+
+
+def get_profile_cube_elements(elements: str) -> str:
+    """
+    在要素列表中补充生成数据集需要的站号、层次和时间要素
+    """
+    element_names = elements.split(",")
+    for name in [STATION_COLUMN, LEVEL_COLUMN] + TIME_COLUMNS:
+        if name not in element_names:
+            element_names.append(name)
+    return ",".join(element_names)
+
+
+def build_profile_cube(
+        table: pd.DataFrame,
+        station_column: str = STATION_COLUMN,
+        level_column: str = LEVEL_COLUMN,
+        dtype: np.dtype = np.float32,
+) -> "xr.Dataset":
+    """
+    将高空观测表格转换为 ``(time, station, level)`` 三维数据集
+
+    站号、层次和时间分别使用 ``pd.factorize`` 编码为整数序号，每个要素一次向量化赋值写入三维数组，
+    不按站点或时次分组循环。
+
+    - ``time``：由 ``Year``、``Mon``、``Day``、``Hour`` 和 ``Min`` (可选) 组成，升序
+    - ``station``：站号，升序
+    - ``level``：层次 (默认为气压 ``PRS_HWC``)，降序，即由低层到高层。层次缺失的记录被忽略
+
+    其余数值要素转换为 ``dtype`` (默认为 float32) 类型的数据变量，没有观测的位置为 NaN。
+    相同站点、层次和时次的重复记录保留最后一条。
+    ``Lat``、``Lon`` 和 ``Alti`` 作为 ``station`` 维度的坐标，取每个站点的第一条记录。
+
+    Parameters
+    ----------
+    table
+        ``retrieve_obs_upper_air`` 返回的表格
+    station_column
+        站号要素
+    level_column
+        层次要素
+    dtype
+        数据变量的类型
+
+    Returns
+    -------
+    xr.Dataset
+    """
+    import xarray as xr
+
+    times = _get_times(table)
+    level_values = pd.to_numeric(table[level_column], errors="coerce").to_numpy(dtype=np.float64)
+
+    time_codes, time_index = pd.factorize(times, sort=True)
+    station_codes, station_index = pd.factorize(table[station_column], sort=True)
+    level_codes, level_index = pd.factorize(level_values, sort=True)
+    # 气压由大到小排列
+    level_codes = np.where(level_codes >= 0, len(level_index) - 1 - level_codes, -1)
+    level_index = level_index[::-1]
+
+    mask = (time_codes >= 0) & (station_codes >= 0) & (level_codes >= 0)
+    shape = (len(time_index), len(station_index), len(level_index))
+    flat_index = np.ravel_multi_index((time_codes[mask], station_codes[mask], level_codes[mask]), shape)
+
+    key_columns = {station_column, level_column, *TIME_COLUMNS, *OPTIONAL_TIME_COLUMNS, *STATION_COORD_COLUMNS}
+    data_vars = {}
+    for name in _get_variable_columns(table, key_columns):
+        values = np.full(int(np.prod(shape)), np.nan, dtype=dtype)
+        values[flat_index] = table[name].to_numpy(dtype=dtype, na_value=np.nan)[mask]
+        data_vars[name] = (("time", "station", "level"), values.reshape(shape))
+
+    coords = {
+        "time": pd.DatetimeIndex(time_index),
+        "station": np.asarray(station_index, dtype=object),
+        "level": np.asarray(level_index),
+    }
+    first_rows = _get_first_rows(station_codes)
+    for name in STATION_COORD_COLUMNS:
+        if name in table.columns:
+            coords[name] = ("station", pd.to_numeric(table[name], errors="coerce").to_numpy()[first_rows])
+
+    dataset = xr.Dataset(data_vars, coords=coords)
+    dataset["level"].attrs["long_name"] = level_column
+    return dataset
+
+
+def _get_times(table: pd.DataFrame) -> np.ndarray:
+    missing_columns = [name for name in TIME_COLUMNS if name not in table.columns]
+    if len(missing_columns) > 0:
+        raise ValueError(f"time elements are missing: {missing_columns}")
+    return assemble_datetime(
+        table["Year"].to_numpy(),
+        table["Mon"].to_numpy(),
+        table["Day"].to_numpy(),
+        table["Hour"].to_numpy(),
+        table["Min"].to_numpy() if "Min" in table.columns else None,
+    )
+
+
+def _get_variable_columns(table: pd.DataFrame, key_columns: set) -> List[str]:
+    return [
+        name for name in table.columns
+        if name not in key_columns and pd.api.types.is_numeric_dtype(table[name].dtype)
+    ]
+
+
+def _get_first_rows(codes: np.ndarray) -> np.ndarray:
+    # 使用哈希去重，避免 np.unique 对整列排序
+    valid = np.flatnonzero(codes >= 0)
+    first = np.flatnonzero(~pd.Series(codes[valid]).duplicated().to_numpy())
+    first = first[np.argsort(codes[valid][first])]
+    return valid[first]
@@ -8,12 +8,28 @@ from nuwe_cmadaas.util import (
     get_time_string,
     get_time_range_string,
     get_region_params,
+    split_time_interval,
 )
 from nuwe_cmadaas.config import CMADaasConfig
-from nuwe_cmadaas.music import MusicError, CMADaaSClient, get_or_create_client
+from nuwe_cmadaas.music import (
+    MusicError,
+    Array2D,
+    CMADaaSClient,
+    AsyncCMADaaSClient,
+    get_or_create_client,
+    get_or_create_async_client,
+)
+from nuwe_cmadaas.music.batch import (
+    split_list_params,
+    call_array2D_batch,
+    call_array2D_batch_async,
+    NO_RECORD_ERROR_CODE,
+)
+from nuwe_cmadaas.music.result_cache import get_result_cache_key, get_cached_result, get_cached_result_async
 from nuwe_cmadaas.dataset import load_dataset_config
 
-from .util import _get_interface_id, InterfaceConfig
+from .catalog import StationCatalog, CATALOG_REGION_TYPES
+from .util import _get_interface_id, InterfaceConfig, _check_table_output, _get_table_result
 
 
 def retrieve_obs_station(
@@ -25,10 +41,16 @@ def retrieve_obs_station(
         station_level: Optional[Union[str, List[str]]] = None,
         order: str = "Station_ID_d:asc",
         count: Optional[int] = None,
+        output: str = "pandas",
+        parse_time: bool = False,
+        time_shard: Optional[Union[str, pd.Timedelta]] = None,
+        max_workers: Optional[int] = None,
+        catalog: Optional[StationCatalog] = None,
+        use_cache: bool = True,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
         **kwargs,
-) -> Union[pd.DataFrame, MusicError]:
+) -> Union[pd.DataFrame, "pyarrow.Table", MusicError]:
     """
     检索地面站点观测数据资料。
     对应 CMADaaS 中以 ``getSurfEle`` 开头的一系列地面资料接口。
@@ -99,6 +121,30 @@ def retrieve_obs_station(
         排序字段
     count
         最大返回记录数，对应接口的 limitCnt 参数
+    output
+        输出格式
+
+        - pandas: ``pd.DataFrame``
+        - arrow: ``pyarrow.Table``，需要安装可选依赖 ``pyarrow``，可以使用 ``write_parquet`` 保存为 Parquet 文件
+    parse_time
+        是否生成 ``datetime64[ns]`` 类型的时间列 ``Datetime``，只用于 pandas 输出，默认不生成。
+        由 ``Datetime`` 字符串要素或 ``Year``、``Mon``、``Day``、``Hour``、``Min`` 等要素向量化计算，参见 ``Array2D.to_pandas``
+    time_shard
+        时间段检索的拆分长度，``pandas.Timedelta`` 支持的字符串，例如 ``"1D"``，默认不拆分。
+        ``time`` 为 ``pd.Interval`` 且长度超过该值时，按该长度拆分为多个请求并发检索，结果按时间段顺序拼接，
+        每个时间段内按 ``order`` 排序，不是整体按 ``order`` 排序。分界时刻只属于后一个时间段，不会重复。
+        设置 ``count`` 时不拆分。
+    max_workers
+        拆分后的最大并发请求数，默认为 8。
+        站点列表过长 (超过 URL 长度限制) 时也会拆分为多个请求，结果按站点列表顺序拼接，
+        此时 ``count`` 对每个请求分别生效。
+    catalog
+        站点信息目录，参见 ``load_station_catalog``。设置后且未设置 ``station`` 时，
+        在本地将 ``region`` 转换为站点列表，按站号检索，不再由服务端按区域筛选。
+        此时 ``region`` 还支持半径范围 (``circle``) 和最近站点 (``nearest``)，参见 ``StationCatalog.select``。
+        流域 (``basin``) 和地区 (``region``) 仍由服务端筛选。区域内没有站点时不发送请求，返回错误码为 -1 的 ``MusicError``
+    use_cache
+        是否使用客户端的检索结果内存缓存 (``result_cache_size``)，默认使用
     config
         配置。配置文件路径或配置对象
     client
@@ -111,9 +157,139 @@ def retrieve_obs_station(
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame or pyarrow.Table or MusicError
         站点观测资料表格数据，列名为 ``elements`` 中的值
     """
+    _check_table_output(output)
+    request = _get_station_request(
+        data_code=data_code,
+        elements=elements,
+        time=time,
+        station=station,
+        region=region,
+        station_level=station_level,
+        order=order,
+        count=count,
+        catalog=catalog,
+        **kwargs,
+    )
+    if isinstance(request, MusicError):
+        return request
+    interface_id, params = request
+
+    params_list = _split_station_params(params, time, time_shard)
+
+    def retrieve():
+        if len(params_list) == 1:
+            result = cmadaas_client.callAPI_to_array2D(interface_id, params)
+        else:
+            result = call_array2D_batch(cmadaas_client, interface_id, params_list, max_workers=max_workers)
+        return _get_table_result(result, output, parse_time)
+
+    cmadaas_client = get_or_create_client(config, client)
+    return get_cached_result(
+        cmadaas_client.get_result_cache(use_cache),
+        get_result_cache_key(
+            "retrieve_obs_station",
+            interface_id,
+            params,
+            cmadaas_client.server_id,
+            output=output,
+            parse_time=parse_time,
+        ),
+        retrieve,
+    )
+
+
+async def retrieve_obs_station_async(
+        data_code: str = "SURF_CHN_MUL_HOR",
+        elements: Optional[str] = None,
+        time: Optional[Union[pd.Interval, pd.Timestamp, List, pd.Timedelta]] = None,
+        station: Optional[Union[str, List, Tuple]] = None,
+        region: Optional[Dict] = None,
+        station_level: Optional[Union[str, List[str]]] = None,
+        order: str = "Station_ID_d:asc",
+        count: Optional[int] = None,
+        output: str = "pandas",
+        parse_time: bool = False,
+        time_shard: Optional[Union[str, pd.Timedelta]] = None,
+        max_workers: Optional[int] = None,
+        catalog: Optional[StationCatalog] = None,
+        use_cache: bool = True,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+        **kwargs,
+) -> Union[pd.DataFrame, "pyarrow.Table", MusicError]:
+    """
+    ``retrieve_obs_station`` 的异步版本，使用 ``AsyncCMADaaSClient`` 检索地面站点观测数据资料。
+
+    参数和返回值与 ``retrieve_obs_station`` 相同。
+    """
+    _check_table_output(output)
+    request = _get_station_request(
+        data_code=data_code,
+        elements=elements,
+        time=time,
+        station=station,
+        region=region,
+        station_level=station_level,
+        order=order,
+        count=count,
+        catalog=catalog,
+        **kwargs,
+    )
+    if isinstance(request, MusicError):
+        return request
+    interface_id, params = request
+
+    params_list = _split_station_params(params, time, time_shard)
+
+    async def retrieve():
+        if len(params_list) == 1:
+            result = await cmadaas_client.callAPI_to_array2D(interface_id, params)
+        else:
+            result = await call_array2D_batch_async(cmadaas_client, interface_id, params_list, max_workers=max_workers)
+        return _get_table_result(result, output, parse_time)
+
+    async with get_or_create_async_client(config, client) as cmadaas_client:
+        return await get_cached_result_async(
+            cmadaas_client.get_result_cache(use_cache),
+            get_result_cache_key(
+                "retrieve_obs_station",
+                interface_id,
+                params,
+                cmadaas_client.server_id,
+                output=output,
+                parse_time=parse_time,
+            ),
+            retrieve,
+        )
+
+
+def _get_station_request(
+        data_code: str,
+        elements: Optional[str],
+        time: Optional[Union[pd.Interval, pd.Timestamp, List, pd.Timedelta]],
+        station: Optional[Union[str, List, Tuple]],
+        region: Optional[Dict],
+        station_level: Optional[Union[str, List[str]]],
+        order: str,
+        count: Optional[int],
+        catalog: Optional[StationCatalog] = None,
+        **kwargs,
+) -> Union[Tuple[str, Dict], MusicError]:
+    if catalog is not None and region is not None and station is None:
+        if region["type"] in CATALOG_REGION_TYPES:
+            station = catalog.select(region)["Station_Id_C"].tolist()
+            logger.info(f"region is converted to {len(station)} stations by station catalog")
+            if len(station) == 0:
+                # 区域内没有站点时不发送请求，与服务端没有数据时的错误码一致
+                logger.warning(f"no station in region: {region}")
+                return MusicError(code=NO_RECORD_ERROR_CODE, message="no station in region")
+            region = None
+        else:
+            logger.info(f"region type is not supported by station catalog, use server-side filter: {region['type']}")
+
     station_dataset_config = load_dataset_config("station")
     if elements is None:
         elements = station_dataset_config[data_code]["elements"]
@@ -180,14 +356,23 @@ def retrieve_obs_station(
 
     interface_id = _get_interface_id(interface_config)
     logger.info(f"interface_id: {interface_id}")
+    return interface_id, params
 
-    cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_array2D(interface_id, params)
-
-    if result.request.error_code != 0:
-        logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
-        music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
-        return music_error
 
-    df = result.to_pandas()
-    return df
+def _split_station_params(
+        params: Dict,
+        time: Optional[Union[pd.Interval, pd.Timestamp, List, pd.Timedelta]],
+        time_shard: Optional[Union[str, pd.Timedelta]],
+) -> List[Dict]:
+    """
+    按时间段和站点列表拆分请求参数，返回的参数列表按时间段、站点列表的顺序排列。
+    设置 ``limitCnt`` 时不按时间段拆分，保证返回记录数与不拆分时相同。
+    """
+    params_list = [params]
+    if isinstance(time, pd.Interval) and time_shard is not None and "limitCnt" not in params:
+        shards = split_time_interval(time, time_shard)
+        if len(shards) > 1:
+            logger.info(f"split time range into {len(shards)} requests")
+            params_list = [{**params, "timeRange": get_time_range_string(shard)} for shard in shards]
+
+    return [p for shard_params in params_list for p in split_list_params(shard_params)]
@@ -10,11 +10,15 @@ from nuwe_cmadaas.util import (
     get_region_params,
 )
 from nuwe_cmadaas.config import CMADaasConfig
-from nuwe_cmadaas.music import get_or_create_client, CMADaaSClient, MusicError
+from nuwe_cmadaas.music import get_or_create_client, CMADaaSClient, AsyncCMADaaSClient, MusicError
+from nuwe_cmadaas.music.batch import split_list_params, call_array2D_batch
+from nuwe_cmadaas.music.element import add_time_elements
+from nuwe_cmadaas.music.result_cache import get_result_cache_key, get_cached_result
 from nuwe_cmadaas.dataset import load_dataset_config
 
-from .util import _get_interface_id, _fix_params, InterfaceConfig
-from .file import download_obs_file
+from .util import _get_interface_id, _fix_params, InterfaceConfig, _check_table_output, _get_table_result
+from .file import download_obs_file, download_obs_file_async
+from .profile import build_profile_cube, get_profile_cube_elements
 
 
 def retrieve_obs_upper_air(
@@ -29,10 +33,14 @@ def retrieve_obs_upper_air(
         order: Optional[str] = None,
         count: Optional[int] = None,
         interface_data_type: Optional[str] = None,
+        output: str = "pandas",
+        parse_time: bool = False,
+        max_workers: Optional[int] = None,
+        use_cache: bool = True,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
         **kwargs,
-) -> Union[pd.DataFrame, MusicError]:
+) -> Union[pd.DataFrame, "pyarrow.Table", "xr.Dataset", MusicError]:
     """
     检索高空观测数据资料。
 
@@ -115,6 +123,23 @@ def retrieve_obs_upper_air(
         最大返回记录数，对应接口的 limitCnt 参数
     interface_data_type:
         资料类型，默认自动生成，或使用 datasets 配置文件中配置的 interface_data_type 字段
+    output:
+        输出格式
+
+        - pandas: ``pd.DataFrame``
+        - arrow: ``pyarrow.Table``，需要安装可选依赖 ``pyarrow``
+        - xarray: ``(time, station, level)`` 三维 ``xr.Dataset``，要素为 float32 类型，没有观测的位置为 NaN，
+          参见 ``build_profile_cube``。``elements`` 中缺少的站号 (``Station_Id_d``)、气压 (``PRS_HWC``)
+          和时间 (``Year``、``Mon``、``Day``、``Hour``) 要素会自动补充
+    parse_time:
+        是否生成 ``datetime64[ns]`` 类型的时间列 ``Datetime``，只用于 pandas 输出，默认不生成。
+        需要包含 ``Year`` 和 ``Mon`` 要素或 ``Datetime`` 要素，``elements`` 中缺少的 ``Year`` 和 ``Mon`` 要素会自动补充，
+        参见 ``Array2D.to_pandas``
+    max_workers:
+        站点列表过长 (超过 URL 长度限制) 时拆分为多个请求并发检索，结果按站点列表顺序拼接。
+        该参数为最大并发请求数，默认为 8
+    use_cache:
+        是否使用客户端的检索结果内存缓存 (``result_cache_size``)，默认使用
     config:
         配置。配置文件路径或配置对象
     client:
@@ -127,13 +152,20 @@ def retrieve_obs_upper_air(
 
     Returns
     -------
-    pd.DataFrame or MusicError
+    pd.DataFrame or pyarrow.Table or xr.Dataset or MusicError
         检索成功返回高空观测资料表格数据，列名为 elements 中的值。
         检索失败返回错误对象 ``MusicError``
     """
+    if output != "xarray":
+        _check_table_output(output)
+
     upper_dataset_config = load_dataset_config("upper_air")
     if elements is None:
         elements = upper_dataset_config[data_code]["elements"]
+    if output == "xarray":
+        elements = get_profile_cube_elements(elements)
+    elif parse_time:
+        elements = add_time_elements(elements)
 
     interface_config = InterfaceConfig(
         name="getUparEle",
@@ -220,15 +252,33 @@ def retrieve_obs_upper_air(
 
     params = _fix_params(interface_id, params)
 
-    cmadaas_client = get_or_create_client(config, client)
-    result = cmadaas_client.callAPI_to_array2D(interface_id, params)
-    if result.request.error_code != 0:
-        logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
-        music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
-        return music_error
+    params_list = split_list_params(params)
 
-    df = result.to_pandas()
-    return df
+    def retrieve():
+        if len(params_list) == 1:
+            result = cmadaas_client.callAPI_to_array2D(interface_id, params)
+        else:
+            result = call_array2D_batch(cmadaas_client, interface_id, params_list, max_workers=max_workers)
+        if output == "xarray":
+            table = _get_table_result(result)
+            if isinstance(table, MusicError):
+                return table
+            return build_profile_cube(table)
+        return _get_table_result(result, output, parse_time)
+
+    cmadaas_client = get_or_create_client(config, client)
+    return get_cached_result(
+        cmadaas_client.get_result_cache(use_cache),
+        get_result_cache_key(
+            "retrieve_obs_upper_air",
+            interface_id,
+            params,
+            cmadaas_client.server_id,
+            output=output,
+            parse_time=parse_time,
+        ),
+        retrieve,
+    )
 
 
 def download_obs_upper_air_file(
@@ -239,6 +289,8 @@ def download_obs_upper_air_file(
         order: str = None,
         count: int = None,
         output_dir: str = "./",
+        max_workers: Optional[int] = None,
+        resume: bool = False,
         config: Optional[Union[CMADaasConfig, str, Path]] = None,
         client: Optional[CMADaaSClient] = None,
         **kwargs,
@@ -253,6 +305,44 @@ def download_obs_upper_air_file(
         count=count,
         output_dir=output_dir,
         interface_data_type=interface_data_type,
+        max_workers=max_workers,
+        resume=resume,
+        config=config,
+        client=client,
+        **kwargs
+    )
+    return result
+
+
+async def download_obs_upper_air_file_async(
+        data_code: str,
+        elements: str = None,
+        time: Union[pd.Interval, pd.Timestamp, List, pd.Timedelta] = None,
+        station: Union[str, List, Tuple] = None,
+        order: str = None,
+        count: int = None,
+        output_dir: str = "./",
+        max_workers: Optional[int] = None,
+        resume: bool = False,
+        config: Optional[Union[CMADaasConfig, str, Path]] = None,
+        client: Optional[AsyncCMADaaSClient] = None,
+        **kwargs,
+) -> Union[List, MusicError]:
+    """
+    ``download_obs_upper_air_file`` 的异步版本，参数和返回值相同。
+    """
+    interface_data_type = "Upar"
+    result = await download_obs_file_async(
+        data_code=data_code,
+        elements=elements,
+        time=time,
+        station=station,
+        order=order,
+        count=count,
+        output_dir=output_dir,
+        interface_data_type=interface_data_type,
+        max_workers=max_workers,
+        resume=resume,
         config=config,
         client=client,
         **kwargs
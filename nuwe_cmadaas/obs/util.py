@@ -1,6 +1,13 @@
-from typing import TypedDict, Optional
+from typing import TypedDict, Optional, Union
+
+import pandas as pd
 
 from nuwe_cmadaas._log import logger
+from nuwe_cmadaas.music import Array2D, MusicError
+
+
+# 表格数据支持的输出格式
+TABLE_OUTPUTS = ("pandas", "arrow")
 
 
 class InterfaceConfig(TypedDict):
@@ -53,3 +60,23 @@ def _fix_params(interface_id, params):
         logger.warning("UparGps don't use dataCode!")
         del params["dataCode"]
     return params
+
+
+def _check_table_output(output: str):
+    if output not in TABLE_OUTPUTS:
+        raise ValueError(f"output is not supported: {output}")
+
+
+def _get_table_result(
+        result: Array2D,
+        output: str = "pandas",
+        parse_time: bool = False,
+) -> Union[pd.DataFrame, "pyarrow.Table", MusicError]:
+    if result.request.error_code != 0:
+        logger.warning(f"request error {result.request.error_code}: {result.request.error_message}")
+        music_error = MusicError(code=result.request.error_code, message=result.request.error_message)
+        return music_error
+
+    if output == "arrow":
+        return result.to_arrow()
+    return result.to_pandas(parse_time=parse_time)
@@ -15,6 +15,41 @@ def get_time_range_string(time_interval: pd.Interval) -> str:
     return f"{left}{start},{end}{right}"
 
 
+def split_time_interval(time_interval: pd.Interval, freq: typing.Union[str, pd.Timedelta]) -> typing.List[pd.Interval]:
+    """
+    将时间段按 ``freq`` 拆分为多个连续的时间段。
+
+    第一段的左端点和最后一段的右端点与 ``time_interval`` 相同，中间的分界点只属于后一段 (左闭右开)，
+    因此分界时刻的数据只检索一次。时间段长度不超过 ``freq`` 时不拆分。
+
+    Examples
+    --------
+    >>> split_time_interval(pd.Interval(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-03"), closed="both"), "1D")
+    [Interval(2024-01-01 00:00:00, 2024-01-02 00:00:00, closed='left'), Interval(2024-01-02 00:00:00, 2024-01-03 00:00:00, closed='both')]
+    """
+    freq = pd.to_timedelta(freq)
+    if time_interval.length <= freq:
+        return [time_interval]
+
+    edges = list(pd.date_range(time_interval.left, time_interval.right, freq=freq))
+    if edges[-1] != time_interval.right:
+        edges.append(time_interval.right)
+
+    closed_mapper = {
+        (True, True): "both",
+        (True, False): "left",
+        (False, True): "right",
+        (False, False): "neither",
+    }
+    shard_count = len(edges) - 1
+    shards = []
+    for index, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+        closed_left = time_interval.closed_left if index == 0 else True
+        closed_right = time_interval.closed_right if index == shard_count - 1 else False
+        shards.append(pd.Interval(start, end, closed=closed_mapper[(closed_left, closed_right)]))
+    return shards
+
+
 def get_region_params(region: typing.Dict, params: typing.Dict, interface_config: typing.Dict):
     region_type = region["type"]
     if region_type == "region":
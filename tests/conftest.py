@@ -0,0 +1,134 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Sequence
+
+import pytest
+
+from nuwe_cmadaas.music import CMADaaSClient
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+
+
+def array_2d_content(
+        rows: Sequence[Sequence[str]] = (("54511", "39.8"),),
+        element_names: Sequence[str] = ("Station_Id_d", "Lat"),
+        error_code: int = 0,
+) -> bytes:
+    """
+    生成 ``callAPI_to_array2D`` 的 protobuf 返回内容，``rows`` 中每项为一行字符串数据
+    """
+    ret = pb.RetArray2D()
+    for row in rows:
+        ret.data.extend(row)
+    ret.elementNames.extend(element_names)
+    ret.request.rowCount = len(rows)
+    ret.request.colCount = len(element_names)
+    ret.request.errorCode = error_code
+    return ret.SerializeToString()
+
+
+class MusicStubHandler(BaseHTTPRequestHandler):
+    """
+    本地模拟 MUSIC 服务，返回 ``server.responses`` 中与路径对应的内容。
+    设置 ``server.response_factory`` 时，使用其根据完整路径 (含查询参数) 生成的内容。
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            server.request_paths.append(self.path)
+            server.client_ports.add(self.client_address[1])
+            failing = server.fail_count > 0
+            if failing:
+                server.fail_count -= 1
+            server.active_count += 1
+            server.max_active_count = max(server.max_active_count, server.active_count)
+        try:
+            time.sleep(server.delay)
+            path = self.path.split("?")[0]
+            if failing:
+                body = server.fail_response
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if server.response_factory is not None:
+                body = server.response_factory(self.path)
+            elif path in server.responses:
+                body = server.responses[path]
+            else:
+                self.send_error(404)
+                return
+            range_header = self.headers.get("Range")
+            server.range_headers.append(range_header)
+            if range_header is not None and server.support_range:
+                start = int(range_header[len("bytes="):].split("-")[0])
+                if start >= len(body):
+                    self.send_error(416)
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                body = body[start:]
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active_count -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def music_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MusicStubHandler)
+    server.daemon_threads = True
+    server.responses = dict()
+    server.response_factory = None
+    server.request_count = 0
+    server.request_paths = []
+    server.fail_count = 0
+    server.fail_response = b'{"returnCode":-5001,"flag":"slb","returnMessage":"Server Busy"}'
+    server.client_ports = set()
+    server.delay = 0
+    server.support_range = True
+    server.range_headers = []
+    server.active_count = 0
+    server.max_active_count = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def create_client(music_server):
+    """
+    返回创建客户端的函数，客户端连接本地模拟 MUSIC 服务。
+
+    函数的第一个参数为客户端类型，默认为 ``CMADaaSClient``，其余关键字参数传递给客户端，覆盖默认设置。
+    """
+    def create(client_class=CMADaaSClient, **kwargs):
+        options = dict(
+            server_ip=music_server.server_address[0],
+            server_port=music_server.server_address[1],
+            server_id="NMIC_MUSIC_CMADAAS",
+            connection_timeout=3,
+            read_timeout=3,
+            user="user",
+            password="password",
+        )
+        options.update(kwargs)
+        return client_class(**options)
+
+    return create
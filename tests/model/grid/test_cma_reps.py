@@ -39,6 +39,22 @@ def test_member_field(start_date):
     assert isinstance(field, xr.DataArray)
 
 
+def test_members_field(start_date):
+    field = retrieve_model_grid(
+        REPS_CONTROL_NAME,
+        start_time=start_date,
+        forecast_time=pd.Timedelta(hours=24),
+        parameter=TEMPERATURE_NAME_FOR_CMADAAS,
+        level_type=100,
+        level=850,
+        number=range(0, 31),
+    )
+
+    assert isinstance(field, xr.DataArray)
+    assert field.dims[0] == "member"
+    assert field.sizes["member"] == 31
+
+
 def test_control_field_future_date(future_start_date):
     field = retrieve_model_grid(
         REPS_CONTROL_NAME,
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from nuwe_cmadaas.music import AsyncCMADaaSClient, MusicError
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.model import (
+    retrieve_model_grid,
+    retrieve_model_grid_async,
+    retrieve_model_grid_cube,
+    retrieve_model_grid_cube_async,
+)
+
+
+def _grid_factory(path: str) -> bytes:
+    """
+    要素值为 预报时效 * 1000 + 层次 + 成员编号 / 100，温度场单位为 K，其他要素为 m/s
+    """
+    query = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+    value = int(query["validTime"]) * 1000 + int(query["fcstLevel"]) + int(query.get("fcstMember", 0)) / 100
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = 2
+    ret.latCount = 2
+    ret.lonCount = 3
+    ret.lats.extend([30, 31])
+    ret.lons.extend([110, 111, 112])
+    ret.data.extend([value] * 6)
+    ret.units = "K" if query["fcstEle"] == "TEM" else "m/s"
+    ret.userEleName = query["fcstEle"]
+    return ret.SerializeToString()
+
+
+def test_retrieve_model_grid_cube(music_server, create_client):
+    music_server.response_factory = _grid_factory
+    music_server.delay = 0.05
+
+    with create_client() as client:
+        field = retrieve_model_grid_cube(
+            "NAFP_FOR_FTM_GRAPES_GFS_25KM_GLB",
+            parameter="TEM",
+            start_time=pd.Timestamp("2024-01-01 00:00"),
+            forecast_time=range(0, 12, 3),
+            level_type=100,
+            level=[850, 500],
+            dtype="float32",
+            client=client,
+        )
+
+    assert isinstance(field, xr.DataArray)
+    assert field.dims == ("forecast_time", "level", "latitude", "longitude")
+    assert field.shape == (4, 2, 2, 3)
+    assert field.dtype == np.float32
+    assert field.name == "TEM"
+    assert field.attrs["units"] == "K"
+    assert list(field.level.values) == [850, 500]
+    assert field.forecast_time.values[1] == pd.Timedelta(hours=3)
+    assert field.sel(forecast_time=pd.Timedelta(hours=9), level=500).values[0, 0] == 9500
+    assert music_server.request_count == 8
+    assert music_server.max_active_count > 1
+
+
+def test_retrieve_model_grid_cube_parameters(music_server, create_client):
+    music_server.response_factory = _grid_factory
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as client:
+            return await retrieve_model_grid_cube_async(
+                "NAFP_FOR_FTM_GRAPES_GFS_25KM_GLB",
+                parameter=["TEM", "WIU"],
+                start_time=pd.Timestamp("2024-01-01 00:00"),
+                forecast_time="24h",
+                level_type=100,
+                level=850,
+                client=client,
+            )
+
+    field = asyncio.run(run())
+
+    assert field.dims == ("parameter", "latitude", "longitude")
+    assert list(field.units.values) == ["K", "m/s"]
+    assert "units" not in field.attrs
+    assert (field.values == 24850).all()
+
+
+def test_retrieve_model_grid_cube_error(music_server, create_client):
+    music_server.response_factory = _grid_factory
+    music_server.fail_count = 100
+
+    with create_client() as client:
+        result = retrieve_model_grid_cube(
+            "NAFP_FOR_FTM_GRAPES_GFS_25KM_GLB",
+            parameter="TEM",
+            start_time=pd.Timestamp("2024-01-01 00:00"),
+            forecast_time=[0, 3],
+            level_type=100,
+            level=850,
+            client=client,
+        )
+
+    assert isinstance(result, MusicError)
+
+
+def test_retrieve_model_grid_members(music_server, create_client):
+    music_server.response_factory = _grid_factory
+
+    with create_client() as client:
+        field = retrieve_model_grid(
+            "NAFP_GRAPESREPS_FOR_FTM_DIS_CHN",
+            parameter="TEM",
+            start_time=pd.Timestamp("2024-01-01 00:00"),
+            forecast_time="24h",
+            level_type=100,
+            level=850,
+            number=range(0, 4),
+            client=client,
+        )
+
+    assert field.dims == ("member", "latitude", "longitude")
+    assert list(field.member.values) == [0, 1, 2, 3]
+    np.testing.assert_allclose(field.values[:, 0, 0], [24850, 24850.01, 24850.02, 24850.03])
+
+    data_codes = {}
+    for path in music_server.request_paths:
+        query = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+        data_codes[query["fcstMember"]] = query["dataCode"]
+    assert data_codes == {
+        "0": "NAFP_GRAPESREPS_FOR_FTM_CHN",
+        "1": "NAFP_GRAPESREPS_FOR_FTM_DIS_CHN",
+        "2": "NAFP_GRAPESREPS_FOR_FTM_DIS_CHN",
+        "3": "NAFP_GRAPESREPS_FOR_FTM_DIS_CHN",
+    }
+
+
+def test_retrieve_model_grid_members_order(music_server, create_client):
+    def factory(path: str) -> bytes:
+        # 编号小的成员返回得晚，结果的顺序应与请求的成员顺序一致，与返回顺序无关
+        member = int(parse_qs(urlsplit(path).query)["fcstMember"][0])
+        time.sleep(0.05 * (4 - member))
+        return _grid_factory(path)
+
+    music_server.response_factory = factory
+
+    with create_client() as client:
+        field = retrieve_model_grid(
+            "NAFP_GRAPESREPS_FOR_FTM_CHN",
+            parameter="TEM",
+            start_time=pd.Timestamp("2024-01-01 00:00"),
+            forecast_time="24h",
+            level_type=100,
+            level=850,
+            number=[3, 0, 2],
+            client=client,
+        )
+
+    # 成员维度名为 member，不再使用 number
+    assert field.dims == ("member", "latitude", "longitude")
+    assert "number" not in field.coords
+    assert list(field.member.values) == [3, 0, 2]
+    np.testing.assert_allclose(field.values[:, 0, 0], [24850.03, 24850, 24850.02])
+    assert music_server.max_active_count > 1
+
+
+def test_retrieve_model_grid_members_async(music_server, create_client):
+    music_server.response_factory = _grid_factory
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as client:
+            return await retrieve_model_grid_async(
+                "NAFP_GRAPESREPS_FOR_FTM_CHN",
+                parameter="TEM",
+                start_time=pd.Timestamp("2024-01-01 00:00"),
+                forecast_time="24h",
+                level_type=100,
+                level=850,
+                number=[0, 5],
+                client=client,
+            )
+
+    field = asyncio.run(run())
+
+    assert field.shape == (2, 2, 3)
+    assert field.member.values[1] == 5
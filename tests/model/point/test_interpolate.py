@@ -0,0 +1,79 @@
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.model import retrieve_model_point
+from nuwe_cmadaas.model.interpolate import get_interpolation_table
+
+
+LATS = np.array([32.0, 31.0, 30.0])
+LONS = np.array([110.0, 111.0, 112.0, 113.0])
+
+
+def _linear_field(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    return lats[:, np.newaxis] * 10 + lons[np.newaxis, :]
+
+
+def _grid_factory(path: str) -> bytes:
+    query = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = len(LATS)
+    ret.latCount = len(LATS)
+    ret.lonCount = len(LONS)
+    ret.lats.extend(LATS)
+    ret.lons.extend(LONS)
+    ret.data.extend((_linear_field(LATS, LONS) + int(query["validTime"]) * 1000).ravel())
+    ret.userEleName = query["fcstEle"]
+    return ret.SerializeToString()
+
+
+def test_interpolation_table():
+    points = [(30.6, 110.25), (31.0, 112.0), (33.0, 111.0)]
+    data = _linear_field(LATS, LONS)
+
+    bilinear = get_interpolation_table(LATS, LONS, points, "bilinear").interpolate(data)
+    np.testing.assert_allclose(bilinear[:2], [416.25, 422.0])
+    assert np.isnan(bilinear[2])
+
+    nearest = get_interpolation_table(LATS, LONS, points, "nearest").interpolate(data[np.newaxis])
+    np.testing.assert_allclose(nearest[0, :2], [420.0, 422.0])
+
+    assert get_interpolation_table(LATS, LONS, points, "bilinear") is get_interpolation_table(
+        LATS.tolist(), LONS, points, "bilinear"
+    )
+    with pytest.raises(ValueError):
+        get_interpolation_table(LATS, LONS, points, "cubic")
+
+
+def test_interpolation_table_global():
+    lons = np.arange(0, 360, 90.0)
+    data = _linear_field(LATS, lons)
+    values = get_interpolation_table(LATS, lons, [(31.0, 315.0), (31.0, -45.0)], "bilinear").interpolate(data)
+    np.testing.assert_allclose(values, [310 + (270 + 0) / 2] * 2)
+
+
+def test_retrieve_model_point_local(music_server, create_client):
+    music_server.response_factory = _grid_factory
+    points = [(30.5, 110.25), (31.0, 112.0)]
+
+    with create_client() as client:
+        table = retrieve_model_point(
+            "NAFP_FOR_FTM_GRAPES_GFS_25KM_GLB",
+            parameter="TEM",
+            start_time=pd.Timestamp("2024-01-01 00:00"),
+            forecast_time=[0, 3, 6],
+            level_type=100,
+            level=850,
+            point=points,
+            method="bilinear",
+            client=client,
+        )
+
+    assert music_server.request_count == 3
+    assert list(table.columns) == ["Lat", "Lon", "Validtime", "TEM"]
+    assert table.shape == (6, 4)
+    assert list(table["Validtime"]) == [0, 0, 3, 3, 6, 6]
+    np.testing.assert_allclose(table["TEM"], [415.25, 422.0, 3415.25, 3422.0, 6415.25, 6422.0])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import Array2D, write_parquet
+from nuwe_cmadaas.obs import retrieve_obs_station, retrieve_obs_upper_air
+from tests.conftest import array_2d_content
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+ELEMENT_NAMES = ["Station_Id_d", "Lat", "Year", "TEM"]
+ROWS = [
+    ("54511", "39.8", "2024", "-1.5"),
+    ("54511", "39.8", "2024", "999999"),
+    ("54527", "39.1", "2024", "0.3"),
+]
+CONTENT = array_2d_content(ROWS, ELEMENT_NAMES)
+
+
+def test_array2d_to_arrow():
+    table = Array2D.create_from_protobuf(CONTENT).to_arrow()
+    assert table.column_names == ["Station_Id_d", "Lat", "Year", "TEM"]
+    assert table.schema.field("Station_Id_d").type == pa.string()
+    assert table.schema.field("Year").type == pa.int32()
+    assert table.schema.field("TEM").type == pa.float64()
+    assert table.column("TEM").to_pylist() == [-1.5, 999999, 0.3]
+
+
+def test_write_parquet(tmp_path):
+    table = Array2D.create_from_protobuf(CONTENT).to_arrow()
+    write_parquet(table, tmp_path / "surf.parquet")
+
+    result = pq.read_table(tmp_path / "surf.parquet")
+    assert pa.types.is_dictionary(result.schema.field("Station_Id_d").type)
+    assert result.column("Station_Id_d").to_pylist() == ["54511", "54511", "54527"]
+    np.testing.assert_array_equal(result.column("Year").to_numpy(), [2024, 2024, 2024])
+
+    write_parquet(pd.DataFrame({"Station_Id_C": ["A", "A"], "TEM": [1.0, 2.0]}), tmp_path / "df.parquet")
+    result = pq.read_table(tmp_path / "df.parquet")
+    assert pa.types.is_dictionary(result.schema.field("Station_Id_C").type)
+
+
+def test_retrieve_output_arrow(music_server, create_client):
+    music_server.responses["/music-ws/api"] = CONTENT
+    client = create_client()
+    with client:
+        table = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,Lat,Year,TEM",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            output="arrow",
+            client=client,
+        )
+        assert isinstance(table, pa.Table)
+        assert table.num_rows == 3
+
+        table = retrieve_obs_upper_air(
+            "UPAR_GLB_MUL_FTM",
+            elements="Station_Id_d,Lat,Year,TEM",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            output="arrow",
+            client=client,
+        )
+        assert isinstance(table, pa.Table)
+
+        with pytest.raises(ValueError):
+            retrieve_obs_station("SURF_CHN_MUL_HOR", output="polars", client=client)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pandas as pd
+
+from nuwe_cmadaas.music import AsyncCMADaaSClient, Array2D
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.obs import retrieve_obs_station_async
+from tests.conftest import array_2d_content
+
+
+STATION_ROWS = [("54511", "39.8"), ("54527", "39.1")]
+
+
+def test_concurrent_requests(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content(STATION_ROWS)
+    music_server.delay = 0.2
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as client:
+            return await asyncio.gather(*[
+                client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+                for _ in range(50)
+            ])
+
+    results = asyncio.run(run())
+
+    assert len(results) == 50
+    assert all(isinstance(r, Array2D) and r.request.error_code == 0 for r in results)
+    assert music_server.max_active_count > 10
+
+
+def test_retrieve_obs_station_async(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content(STATION_ROWS)
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as client:
+            return await retrieve_obs_station_async(
+                "SURF_CHN_MUL_HOR",
+                elements="Station_Id_d,Lat",
+                time=pd.Timestamp("2024-01-01 00:00"),
+                client=client,
+            )
+
+    table = asyncio.run(run())
+
+    assert isinstance(table, pd.DataFrame)
+    assert table.shape == (2, 2)
+
+
+def test_call_api_to_down_file(music_server, tmp_path, create_client):
+    port = music_server.server_address[1]
+    files_info = pb.RetFilesInfo()
+    for name in ("a.grib2", "missing.grib2", "b.grib2"):
+        file_info = files_info.fileInfos.add()
+        file_info.fileName = name
+        file_info.fileUrl = f"http://127.0.0.1:{port}/files/{name}"
+    music_server.responses["/music-ws/api"] = files_info.SerializeToString()
+    music_server.responses["/files/a.grib2"] = b"a"
+    music_server.responses["/files/b.grib2"] = b"b"
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as client:
+            return await client.callAPI_to_downFile(
+                "getNafpFileByTime", {"dataCode": "NAFP_FOR_FTM_KWBC_GLB"}, tmp_path
+            )
+
+    result = asyncio.run(run())
+
+    assert [f.download_error is None for f in result.files_info] == [True, False, True]
+    assert (tmp_path / "a.grib2").read_bytes() == b"a"
+    assert (tmp_path / "b.grib2").read_bytes() == b"b"
+
+
+def test_async_retry(music_server, create_client):
+    from nuwe_cmadaas.music import RetryPolicy
+
+    music_server.responses["/music-ws/api"] = array_2d_content(STATION_ROWS)
+    music_server.fail_count = 1
+
+    async def run():
+        policy = RetryPolicy(max_attempts=2, backoff_base=0.01)
+        async with create_client(AsyncCMADaaSClient, retry_policy=policy) as client:
+            result = await client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+            return result, client.retry_stats.retries
+
+    result, retries = asyncio.run(run())
+    assert result.request.error_code == 0
+    assert retries == 1
+    assert music_server.request_count == 2
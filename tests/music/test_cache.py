@@ -0,0 +1,87 @@
+import time
+
+from nuwe_cmadaas.music import ResponseCache
+from nuwe_cmadaas.music.cache import make_cache_key, is_cacheable_request
+from tests.conftest import array_2d_content
+
+
+def test_make_cache_key():
+    key = make_cache_key("getSurfEleByTime", "callAPI_to_array2D", {"a": 1, "b": "2"}, "server")
+    assert key == make_cache_key(
+        "getSurfEleByTime", "callAPI_to_array2D", {"b": 2, "a": "1", "nonce": "x", "timestamp": "1"}, "server"
+    )
+    assert key != make_cache_key("getSurfEleByTime", "callAPI_to_array2D", {"a": 1, "b": "3"}, "server")
+    assert key != make_cache_key("getSurfEleByTime", "callAPI_to_array2D", {"a": 1, "b": "2"}, "other")
+
+
+def test_cache_eviction_and_ttl(tmp_path):
+    cache = ResponseCache(tmp_path, max_size=25, ttl={"SURF": 0.05, "default": None})
+    cache.put("a", b"0123456789", data_code="UPAR")
+    time.sleep(0.01)
+    cache.put("b", b"0123456789", data_code="UPAR")
+    time.sleep(0.01)
+    assert cache.get("a") == b"0123456789"
+
+    cache.put("c", b"0123456789", data_code="SURF")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size == 20
+    assert cache.stats.evictions == 1
+
+    time.sleep(0.06)
+    assert cache.get("c") is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.to_dict()["hits"] == 2
+
+    # 缓存目录可以被新的对象继续使用
+    assert ResponseCache(tmp_path).get("a") == b"0123456789"
+
+
+def test_client_cache(music_server, tmp_path, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    params = {"dataCode": "SURF_CHN_MUL_HOR", "elements": "Station_Id_d,Lat"}
+
+    with create_client(cache=tmp_path / "cache") as client:
+        for _ in range(3):
+            result = client.callAPI_to_array2D("getSurfEleByTime", params)
+            assert result.request.error_code == 0
+            assert result.to_pandas()["Lat"].tolist() == [39.8]
+        assert music_server.request_count == 1
+        assert client.cache.stats.hits == 2
+        assert client.cache.stats.misses == 1
+
+        client.callAPI_to_array2D("getSurfEleByTime", params, server_id="OTHER")
+        assert music_server.request_count == 2
+
+    # 错误结果不缓存
+    music_server.responses["/music-ws/api"] = array_2d_content(error_code=-1)
+    with create_client(cache=tmp_path / "cache") as client:
+        params["elements"] = "Station_Id_d"
+        for _ in range(2):
+            client.callAPI_to_array2D("getSurfEleByTime", params)
+        music_server.fail_count = 1
+        client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "UPAR_GLB_MUL_FTM"})
+        assert client.cache.stats.stores == 0
+    assert music_server.request_count == 5
+
+
+def test_is_cacheable_request():
+    assert is_cacheable_request("getSurfEleByTime", "callAPI_to_array2D", {"times": "20240101000000"})
+    assert not is_cacheable_request("getSurfLatestTime", "callAPI_to_array2D", {"latestTime": "1"})
+    assert not is_cacheable_request("getNafpLatestTime", "callAPI_to_array2D", {})
+    assert not is_cacheable_request("getSurfEleByTime", "callAPI_to_array2D", {"latestTime": "1"})
+    assert not is_cacheable_request("getNafpFileByTime", "callAPI_to_fileList", {})
+    assert not is_cacheable_request("getNafpFileByTime", "callAPI_to_saveAsFile", {})
+
+
+def test_client_cache_skip_latest_time(music_server, tmp_path, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    params = {"dataCode": "SURF_CHN_MUL_HOR", "elements": "Station_Id_d,Lat", "latestTime": "1"}
+
+    with create_client(cache=tmp_path / "cache") as client:
+        for _ in range(2):
+            result = client.callAPI_to_array2D("getSurfLatestTime", params)
+            assert result.request.error_code == 0
+        assert music_server.request_count == 2
+        assert client.cache.stats.hits == 0
+        assert client.cache.stats.stores == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from nuwe_cmadaas.music import Array2D
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from tests.conftest import array_2d_content
+
+
+def test_keep_alive_reuses_connection(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    with create_client() as client:
+        for _ in range(5):
+            result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+            assert isinstance(result, Array2D)
+            assert result.request.error_code == 0
+    assert music_server.request_count == 5
+    assert len(music_server.client_ports) == 1
+
+
+def test_no_keep_alive(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    with create_client(keep_alive=False, pool_size=2) as client:
+        assert client._connection.pool_size == 2
+        for _ in range(3):
+            client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+    assert music_server.request_count == 3
+    assert len(music_server.client_ports) == 3
+
+
+def test_grid_dtype(music_server, create_client):
+    from nuwe_cmadaas.model import retrieve_model_grid
+
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = 2
+    ret.latCount = 2
+    ret.lonCount = 2
+    ret.lats.extend([30, 31])
+    ret.lons.extend([110, 111])
+    ret.data.extend([1, 2, 3, 4])
+    music_server.responses["/music-ws/api"] = ret.SerializeToString()
+
+    with create_client(dtype="float32") as client:
+        result = client.callAPI_to_gridArray2D("getNafpEleGridByTimeAndLevelAndValidtime", {})
+        assert result.data.dtype == np.float32
+        result = client.callAPI_to_gridArray2D("getNafpEleGridByTimeAndLevelAndValidtime", {}, dtype="float64")
+        assert result.data.dtype == np.float64
+
+    with create_client() as client:
+        field = retrieve_model_grid(
+            "NAFP_FOR_FTM_HIGH_EC_GLB", "TEM",
+            start_time=pd.Timestamp("2024-01-01"),
+            forecast_time="24h",
+            level_type="pl",
+            level=850,
+            dtype="float32",
+            client=client,
+        )
+        assert field.dtype == np.float32
+        assert field.latitude.dtype == np.float32
+
+
+def test_lazy_decode(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    with create_client(lazy_decode=True) as client:
+        result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+        assert result.request.error_code == 0
+        assert not result.is_decoded
+        assert result.to_pandas().shape == (1, 2)
@@ -0,0 +1,323 @@
+import pickle
+import threading
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import Array2D, GridArray2D, GridScalar2D, GridVector2D, DataBlock
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.music.element import get_element_dtype, parse_datetime_strings
+from nuwe_cmadaas.music.wire import WireFormatError, split_packed_fields
+from tests.conftest import array_2d_content
+
+
+ELEMENT_NAMES = ["Station_Id_d", "Lat", "Year", "Hour", "TEM", "Remark"]
+ROWS = [
+    ("54511", "39.8", "2024", "0", "12.5", "a"),
+    ("54527", "39.1", "2024", "1", "999999", "b"),
+]
+CONTENT = array_2d_content(ROWS, ELEMENT_NAMES)
+
+
+def test_get_element_dtype():
+    assert get_element_dtype("Station_Id_d") == np.dtype(object)
+    assert get_element_dtype("Year") == np.dtype(np.int32)
+    assert get_element_dtype("TEM") == np.dtype(np.float64)
+    assert get_element_dtype("TEM", schema={"TEM": "float32"}) == np.dtype(np.float32)
+    assert get_element_dtype("Lat", schema={"Lat": "str"}) == np.dtype(object)
+
+
+def test_array_2d_columns():
+    result = Array2D.create_from_protobuf(CONTENT)
+    assert result.row_count == 2
+    assert result.col_count == 6
+
+    station_id, lat, year, hour, tem, remark = result.columns
+    assert station_id.dtype == object
+    assert list(station_id) == ["54511", "54527"]
+    assert lat.dtype == np.float64
+    np.testing.assert_array_equal(lat, [39.8, 39.1])
+    assert year.dtype == np.int32
+    assert hour.dtype == np.int32
+    np.testing.assert_array_equal(tem, [12.5, 999999])
+    # 无法转换为数值的列保留字符串
+    assert list(remark) == ["a", "b"]
+
+
+def test_array_2d_to_pandas():
+    df = Array2D.create_from_protobuf(CONTENT).to_pandas()
+    assert list(df.columns) == ["Station_Id_d", "Lat", "Year", "Hour", "TEM", "Remark"]
+    assert pd.api.types.is_string_dtype(df["Station_Id_d"])
+    assert df["Lat"].dtype == np.float64
+    assert df["Year"].dtype == np.int32
+    assert df["TEM"].iloc[0] == 12.5
+
+
+def test_array_2d_to_pandas_parse_time():
+    content = array_2d_content([
+        ("54511", "2024", "2", "29", "6", "12.5"),
+        ("54527", "2024", "2", "30", "6", "13.5"),
+        ("54534", "999999", "1", "1", "0", "14.5"),
+    ], ["Station_Id_d", "Year", "Mon", "Day", "Hour", "TEM"])
+    result = Array2D.create_from_protobuf(content)
+
+    df = result.to_pandas(parse_time=True)
+    assert list(df.columns) == ["Station_Id_d", "Year", "Mon", "Day", "Hour", "TEM", "Datetime"]
+    assert df["Datetime"].dtype == np.dtype("datetime64[ns]")
+    assert df["Datetime"].iloc[0] == pd.Timestamp("2024-02-29 06:00")
+    assert df["Datetime"].iloc[1:].isna().all()
+
+    assert "Datetime" not in Array2D.create_from_protobuf(CONTENT).to_pandas(parse_time=True)
+
+
+def test_array_2d_to_pandas_parse_datetime_strings():
+    content = array_2d_content([
+        ("54511", "20240101063000", "12.5"),
+        ("54527", "2024010106300x", "13.5"),
+    ], ["Station_Id_d", "Datetime", "TEM"])
+    result = Array2D.create_from_protobuf(content)
+
+    df = result.to_pandas(parse_time=True)
+    assert list(df.columns) == ["Station_Id_d", "Datetime", "TEM"]
+    assert df["Datetime"].iloc[0] == pd.Timestamp("2024-01-01 06:30")
+    assert pd.isna(df["Datetime"].iloc[1])
+    assert list(result.to_pandas()["Datetime"]) == ["20240101063000", "2024010106300x"]
+
+
+def test_parse_datetime_strings():
+    times = parse_datetime_strings(np.array(["20240229233015", "", "2024-01-01 00:00:00"], dtype=object))
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert times[0] == np.datetime64("2024-02-29T23:30:15")
+    assert np.isnat(times[1])
+
+    times = parse_datetime_strings(np.array(["2024-01-01 06:00:00", "bad"], dtype=object))
+    assert times[0] == np.datetime64("2024-01-01T06:00")
+    assert np.isnat(times[1])
+
+def test_array_2d_schema():
+    result = Array2D(schema={"Station_Id_d": "int32", "TEM": "float32"})
+    result.load_from_protobuf_content(CONTENT)
+    df = result.to_pandas()
+    assert df["Station_Id_d"].dtype == np.int32
+    assert df["TEM"].dtype == np.float32
+
+
+def test_array_2d_data():
+    result = Array2D.create_from_protobuf(CONTENT)
+    assert result.data.shape == (2, 6)
+    assert result.data[0, 0] == "54511"
+    assert result.data[1, 2] == "2024"
+
+
+def test_array_2d_empty():
+    df = Array2D.create_from_protobuf(array_2d_content([], ["Station_Id_d", "TEM"])).to_pandas()
+    assert df.shape == (0, 2)
+
+
+def _grid_array_2d_message(lat_count=3, lon_count=4) -> pb.RetGridArray2D:
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = lat_count
+    ret.request.colCount = lon_count
+    ret.startLat = 30
+    ret.endLat = 30 + lat_count - 1
+    ret.startLon = 110
+    ret.endLon = 110 + lon_count - 1
+    ret.latCount = lat_count
+    ret.lonCount = lon_count
+    ret.latStep = 1
+    ret.lonStep = 1
+    ret.lats.extend([30 + i for i in range(lat_count)])
+    ret.lons.extend([110 + i for i in range(lon_count)])
+    ret.data.extend([i * 0.1 for i in range(lat_count * lon_count)])
+    ret.units = "K"
+    ret.userEleName = "TEM"
+    return ret
+
+
+def test_grid_array_2d_fast_decode():
+    ret = _grid_array_2d_message()
+    result = GridArray2D.create_from_protobuf(ret.SerializeToString())
+
+    expected = GridArray2D()
+    expected.load_from_protobuf_object(ret)
+
+    assert result.data.dtype == np.float64
+    assert result.data.shape == (3, 4)
+    np.testing.assert_array_equal(result.data, expected.data)
+    np.testing.assert_array_equal(result.data.ravel(), np.array(ret.data))
+    np.testing.assert_array_equal(result.lats, [30, 31, 32])
+    np.testing.assert_array_equal(result.lons, [110, 111, 112, 113])
+    assert result.units == "K"
+    assert result.user_element_name == "TEM"
+
+    field = result.to_xarray()
+    np.testing.assert_array_equal(field.longitude, [110, 111, 112, 113])
+
+
+def test_split_packed_fields_unpacked():
+    # 非 packed 格式编码的数组字段: 每个元素单独编码，tag = (1 << 3) | 5
+    content = b"".join(
+        b"\x0d" + np.float32(value).tobytes() for value in (1.5, 2.5)
+    )
+    with pytest.raises(WireFormatError):
+        split_packed_fields(content, [1])
+
+    ret = pb.RetGridArray2D()
+    ret.ParseFromString(content)
+    ret.request.rowCount = 1
+    result = GridArray2D.create_from_protobuf(ret.SerializeToString() + content)
+    np.testing.assert_array_equal(result.data, [[1.5, 2.5, 1.5, 2.5]])
+
+
+def test_grid_scalar_2d():
+    ret = pb.RetGridScalar2D()
+    ret.latCount = 2
+    ret.lonCount = 2
+    ret.lats.extend([30, 31])
+    ret.lons.extend([110, 111])
+    ret.datas.extend([1, 2, 3, 4])
+    ret.units = "K"
+    result = GridScalar2D.create_from_protobuf(ret.SerializeToString())
+    np.testing.assert_array_equal(result.data, [[1, 2], [3, 4]])
+    assert result.units == "K"
+
+
+def test_grid_vector_2d():
+    ret = pb.RetGridVector2D()
+    ret.latCount = 1
+    ret.lonCount = 2
+    ret.u_datas.extend([1, 2])
+    ret.v_datas.extend([3, 4])
+    result = GridVector2D.create_from_protobuf(ret.SerializeToString())
+    np.testing.assert_array_equal(result.u_datas, [[1, 2]])
+    np.testing.assert_array_equal(result.v_datas, [[3, 4]])
+    assert len(result.lats) == 0
+
+
+def test_grid_array_2d_float32():
+    ret = _grid_array_2d_message()
+    result = GridArray2D(dtype="float32")
+    result.load_from_protobuf_content(ret.SerializeToString())
+    assert result.data.dtype == np.float32
+    assert result.lats.dtype == np.float32
+    assert result.lons.dtype == np.float32
+    assert result.data.flags.writeable
+
+    field = result.to_xarray()
+    assert field.dtype == np.float32
+    assert field.latitude.dtype == np.float32
+    assert field.longitude.dtype == np.float32
+
+    # 没有经纬度列表时生成的坐标也使用 float32
+    ret.ClearField("lats")
+    ret.ClearField("lons")
+    result = GridArray2D(dtype=np.float32)
+    result.load_from_protobuf_content(ret.SerializeToString())
+    field = result.to_xarray()
+    assert field.latitude.dtype == np.float32
+    assert field.longitude.dtype == np.float32
+
+
+def test_grid_array_2d_invalid_dtype():
+    with pytest.raises(ValueError):
+        GridArray2D(dtype="int32")
+
+
+def test_grid_array_2d_float32_memory():
+    content = _grid_array_2d_message(lat_count=181, lon_count=360).SerializeToString()
+
+    def get_peak_memory(dtype):
+        tracemalloc.start()
+        field = GridArray2D(dtype=dtype)
+        field.load_from_protobuf_content(content)
+        field = field.to_xarray()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return field.nbytes, peak
+
+    float64_bytes, float64_peak = get_peak_memory("float64")
+    float32_bytes, float32_peak = get_peak_memory("float32")
+    assert float32_bytes * 2 == float64_bytes
+    assert float32_peak < float64_peak * 0.75
+
+
+def test_array_2d_lazy():
+    result = Array2D(lazy=True)
+    result.load_from_protobuf_content(CONTENT)
+    assert result.request.error_code == 0
+    assert result.row_count == 2
+    assert result.element_names[0] == "Station_Id_d"
+    assert not result.is_decoded
+
+    df = result.to_pandas()
+    assert result.is_decoded
+    assert df["Lat"].dtype == np.float64
+    assert list(df["Station_Id_d"]) == ["54511", "54527"]
+
+
+def test_grid_array_2d_lazy():
+    content = _grid_array_2d_message().SerializeToString()
+    result = GridArray2D(lazy=True, dtype="float32")
+    result.load_from_protobuf_content(content)
+    assert result.user_element_name == "TEM"
+    assert result.lat_count == 3
+    assert not result.is_decoded
+    assert "data" not in result.__dict__
+
+    # 在其他线程中解码
+    thread = threading.Thread(target=result.decode)
+    thread.start()
+    thread.join()
+    assert result.is_decoded
+    assert result.data.shape == (3, 4)
+    assert result.data.dtype == np.float32
+    np.testing.assert_array_equal(result.lons, [110, 111, 112, 113])
+
+
+def test_lazy_defers_payload_parse():
+    # 数据字段无法解析：字符串不是合法的 UTF-8，packed float 数组长度不是 4 的倍数。
+    # 延迟解码时只解析请求信息等字段，访问数据字段时才报错
+    content = CONTENT.replace(b"54511", b"\xff\xff\xff\xff\xff")
+    with pytest.raises(Exception):
+        Array2D.create_from_protobuf(content)
+
+    result = Array2D(lazy=True)
+    result.load_from_protobuf_content(content)
+    assert result.request.error_code == 0
+    assert result.row_count == 2
+    assert result.element_names[0] == "Station_Id_d"
+    with pytest.raises(Exception):
+        result.decode()
+
+    ret = _grid_array_2d_message()
+    ret.ClearField("data")
+    content = b"\x0a\x03abc" + ret.SerializeToString()
+    with pytest.raises(Exception):
+        GridArray2D.create_from_protobuf(content)
+
+    result = GridArray2D(lazy=True)
+    result.load_from_protobuf_content(content)
+    assert result.request.row_count == 3
+    assert result.user_element_name == "TEM"
+    with pytest.raises(Exception):
+        result.decode()
+
+def test_lazy_pickle():
+    result = GridArray2D(lazy=True)
+    result.load_from_protobuf_content(_grid_array_2d_message().SerializeToString())
+    loaded = pickle.loads(pickle.dumps(result))
+    assert loaded.is_decoded
+    assert loaded.data.shape == (3, 4)
+
+
+def test_data_block_lazy():
+    ret = pb.RetDataBlock()
+    ret.dataName = "a.bin"
+    ret.byteArray = b"x" * 100
+    result = DataBlock(lazy=True)
+    result.load_from_protobuf_content(ret.SerializeToString())
+    assert result.data_name == "a.bin"
+    assert not result.is_decoded
+    assert result.data == b"x" * 100
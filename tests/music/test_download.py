@@ -0,0 +1,236 @@
+import tracemalloc
+
+from nuwe_cmadaas.model import download_model_file
+from nuwe_cmadaas.obs import download_obs_file
+from nuwe_cmadaas.music import MusicError
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.music.connection import Connection
+from nuwe_cmadaas.music.download import DownloadExecutor
+
+
+def _create_connection() -> Connection:
+    return Connection(connect_timeout=3, read_timeout=3)
+
+
+def test_download_file(music_server, tmp_path):
+    content = bytes(range(256)) * 4096
+    music_server.responses["/files/a.grib2"] = content
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+    save_file = tmp_path / "a.grib2"
+
+    connection = _create_connection()
+    result = connection.download_file(url, save_file, chunk_size=4096)
+
+    assert result == (0, None)
+    assert save_file.read_bytes() == content
+    assert not (tmp_path / "a.grib2.part").exists()
+
+
+def test_download_file_memory(music_server, tmp_path):
+    file_size = 16 * 1024 * 1024
+    chunk_size = 64 * 1024
+    music_server.responses["/files/large.grib2"] = b"\0" * file_size
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/large.grib2"
+
+    connection = _create_connection()
+    tracemalloc.start()
+    result = connection.download_file(url, tmp_path / "large.grib2", chunk_size=chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert result == (0, None)
+    assert (tmp_path / "large.grib2").stat().st_size == file_size
+    assert peak < file_size / 4
+
+
+def test_download_file_getway_error(music_server, tmp_path):
+    music_server.responses["/files/a.grib2"] = (
+        b'{"returnCode":-1004,"flag":"slb","returnMessage":"Password Error"}'
+    )
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+
+    result = _create_connection().download_file(url, tmp_path / "a.grib2")
+
+    assert result == (-1004, "Password Error")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_file_request_error(tmp_path):
+    result = _create_connection().download_file("http://127.0.0.1:1/a.grib2", tmp_path / "a.grib2")
+
+    assert result[0] == Connection.otherError
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_executor(music_server, tmp_path):
+    music_server.delay = 0.2
+    base_url = f"http://127.0.0.1:{music_server.server_address[1]}/files"
+    tasks = []
+    for i in range(6):
+        music_server.responses[f"/files/{i}.grib2"] = f"{i}".encode()
+        tasks.append((f"{base_url}/{i}.grib2", tmp_path / f"{i}.grib2"))
+    tasks.append((f"{base_url}/missing.grib2", tmp_path / "missing.grib2"))
+
+    executor = DownloadExecutor(_create_connection(), max_workers=6, max_per_host=2)
+    results = executor.download(tasks)
+
+    assert results[:6] == [(0, None)] * 6
+    assert results[6][0] == Connection.otherError
+    for i in range(6):
+        assert (tmp_path / f"{i}.grib2").read_bytes() == f"{i}".encode()
+    assert not (tmp_path / "missing.grib2").exists()
+    assert music_server.max_active_count == 2
+
+
+def test_call_api_to_down_file(music_server, tmp_path, create_client):
+    port = music_server.server_address[1]
+    files_info = pb.RetFilesInfo()
+    for name in ("a.grib2", "missing.grib2", "b.grib2"):
+        file_info = files_info.fileInfos.add()
+        file_info.fileName = name
+        file_info.fileUrl = f"http://127.0.0.1:{port}/files/{name}"
+    music_server.responses["/music-ws/api"] = files_info.SerializeToString()
+    music_server.responses["/files/a.grib2"] = b"a"
+    music_server.responses["/files/b.grib2"] = b"b"
+
+    client = create_client()
+    result = client.callAPI_to_downFile("getNafpFileByTime", {"dataCode": "NAFP_FOR_FTM_KWBC_GLB"}, tmp_path)
+
+    assert result.request.error_code == Connection.otherError
+    assert [f.download_error is None for f in result.files_info] == [True, False, True]
+    assert (tmp_path / "a.grib2").read_bytes() == b"a"
+    assert (tmp_path / "b.grib2").read_bytes() == b"b"
+
+
+def _files_info_content(port: int, file_names) -> bytes:
+    files_info = pb.RetFilesInfo()
+    for name in file_names:
+        file_info = files_info.fileInfos.add()
+        file_info.fileName = name
+        file_info.fileUrl = f"http://127.0.0.1:{port}/files/{name}"
+    return files_info.SerializeToString()
+
+
+def test_download_file_partial_failure(music_server, tmp_path, create_client):
+    port = music_server.server_address[1]
+    music_server.responses["/music-ws/api"] = _files_info_content(port, ["a.grib2", "missing.grib2", "b.grib2"])
+    music_server.responses["/files/a.grib2"] = b"a"
+    music_server.responses["/files/b.grib2"] = b"b"
+
+    (tmp_path / "model").mkdir()
+    (tmp_path / "obs").mkdir()
+    client = create_client()
+    model_files = download_model_file(
+        "NAFP_FOR_FTM_KWBC_GLB", output_dir=tmp_path / "model", client=client,
+    )
+    obs_files = download_obs_file(
+        "SURF_CHN_MUL_HOR", output_dir=tmp_path / "obs", client=client,
+    )
+
+    assert model_files == [tmp_path / "model" / "a.grib2", tmp_path / "model" / "b.grib2"]
+    assert obs_files == [tmp_path / "obs" / "a.grib2", tmp_path / "obs" / "b.grib2"]
+
+
+def test_download_file_all_failed(music_server, tmp_path, create_client):
+    port = music_server.server_address[1]
+    music_server.responses["/music-ws/api"] = _files_info_content(port, ["missing.grib2"])
+
+    client = create_client()
+    result = download_model_file("NAFP_FOR_FTM_KWBC_GLB", output_dir=tmp_path, client=client)
+
+    assert isinstance(result, MusicError)
+    assert result.code == Connection.otherError
+
+
+def test_download_file_resume(music_server, tmp_path):
+    content = bytes(range(256)) * 64
+    music_server.responses["/files/a.grib2"] = content
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+    save_file = tmp_path / "a.grib2"
+    (tmp_path / "a.grib2.part").write_bytes(content[:1000])
+
+    result = _create_connection().download_file(url, save_file, resume=True, expected_size=len(content))
+
+    assert result == (0, None)
+    assert music_server.range_headers == ["bytes=1000-"]
+    assert save_file.read_bytes() == content
+    assert not (tmp_path / "a.grib2.part").exists()
+
+    result = _create_connection().download_file(url, save_file, resume=True, expected_size=len(content))
+    assert result == (0, None)
+    assert music_server.request_count == 1
+
+
+def test_download_file_resume_complete_part(music_server, tmp_path):
+    content = bytes(range(256)) * 64
+    music_server.responses["/files/a.grib2"] = content
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+    (tmp_path / "a.grib2.part").write_bytes(content)
+
+    # 临时文件已经完整时直接完成，不请求服务器
+    result = _create_connection().download_file(url, tmp_path / "a.grib2", resume=True, expected_size=len(content))
+
+    assert result == (0, None)
+    assert music_server.request_count == 0
+    assert (tmp_path / "a.grib2").read_bytes() == content
+    assert not (tmp_path / "a.grib2.part").exists()
+
+
+def test_download_file_range_not_satisfiable(music_server, tmp_path):
+    content = bytes(range(256)) * 64
+    music_server.responses["/files/a.grib2"] = content
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+    (tmp_path / "a.grib2.part").write_bytes(content)
+
+    # 文件大小未知时服务器返回 416，删除临时文件后从头下载
+    result = _create_connection().download_file(url, tmp_path / "a.grib2", resume=True)
+
+    assert result == (0, None)
+    assert music_server.range_headers == [f"bytes={len(content)}-", None]
+    assert (tmp_path / "a.grib2").read_bytes() == content
+
+
+def test_download_file_resume_without_range_support(music_server, tmp_path):
+    content = bytes(range(256)) * 64
+    music_server.responses["/files/a.grib2"] = content
+    music_server.support_range = False
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+    (tmp_path / "a.grib2.part").write_bytes(b"\xff" * 1000)
+
+    result = _create_connection().download_file(url, tmp_path / "a.grib2", resume=True)
+
+    assert result == (0, None)
+    assert (tmp_path / "a.grib2").read_bytes() == content
+
+
+def test_download_file_size_error(music_server, tmp_path):
+    music_server.responses["/files/a.grib2"] = b"0" * 100
+    url = f"http://127.0.0.1:{music_server.server_address[1]}/files/a.grib2"
+
+    result = _create_connection().download_file(url, tmp_path / "a.grib2", resume=True, expected_size=200)
+
+    assert result[0] == Connection.otherError
+    assert not (tmp_path / "a.grib2").exists()
+    assert (tmp_path / "a.grib2.part").stat().st_size == 100
+
+
+def test_call_api_to_down_file_size_check(music_server, tmp_path, create_client):
+    port = music_server.server_address[1]
+    files_info = pb.RetFilesInfo()
+    for name, size in (("a.grib2", "1"), ("b.grib2", "10")):
+        file_info = files_info.fileInfos.add()
+        file_info.fileName = name
+        file_info.fileUrl = f"http://127.0.0.1:{port}/files/{name}"
+        file_info.size = size
+    music_server.responses["/music-ws/api"] = files_info.SerializeToString()
+    music_server.responses["/files/a.grib2"] = b"a"
+    music_server.responses["/files/b.grib2"] = b"b"
+
+    # 未启用断点续传时也检查文件大小
+    with create_client() as client:
+        result = client.callAPI_to_downFile("getNafpFileByTime", {"dataCode": "NAFP_FOR_FTM_KWBC_GLB"}, tmp_path)
+
+    assert [f.download_error is None for f in result.files_info] == [True, False]
+    assert (tmp_path / "a.grib2").read_bytes() == b"a"
+    assert not (tmp_path / "b.grib2").exists()
+    assert not (tmp_path / "b.grib2.part").exists()
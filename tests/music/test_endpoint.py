@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from nuwe_cmadaas.music import CMADaaSClient, RetryPolicy
+from nuwe_cmadaas.music.endpoint import Endpoint, EndpointPool, parse_endpoints
+from tests.conftest import array_2d_content
+
+
+def _create_client(endpoints, **kwargs) -> CMADaaSClient:
+    return CMADaaSClient(
+        server_id="NMIC_MUSIC_CMADAAS",
+        connection_timeout=1,
+        read_timeout=3,
+        user="user",
+        password="password",
+        endpoints=endpoints,
+        **kwargs,
+    )
+
+
+def test_parse_endpoints():
+    assert parse_endpoints("10.1.1.1:8008, 10.1.1.2", default_port=80) == [
+        ("10.1.1.1", 8008), ("10.1.1.2", 80)
+    ]
+    assert parse_endpoints(["10.1.1.1:8008"]) == [("10.1.1.1", 8008)]
+    with pytest.raises(ValueError):
+        parse_endpoints("10.1.1.1")
+
+
+def test_round_robin():
+    endpoints = [Endpoint("a", 1), Endpoint("b", 1), Endpoint("c", 1)]
+    pool = EndpointPool(endpoints)
+    assert [pool.select().server_ip for _ in range(6)] == ["a", "b", "c", "a", "b", "c"]
+
+
+def test_least_latency():
+    endpoints = [Endpoint("a", 1), Endpoint("b", 1)]
+    pool = EndpointPool(endpoints, strategy="least_latency")
+    pool.report_success(endpoints[0], 0.5)
+    # 没有请求过的节点优先
+    assert pool.select() is endpoints[1]
+    pool.report_success(endpoints[1], 0.1)
+    assert pool.select() is endpoints[1]
+
+
+def test_eject_failing_endpoint():
+    endpoints = [Endpoint("a", 1), Endpoint("b", 1)]
+    pool = EndpointPool(endpoints, max_failures=2, eject_time=0.1)
+    pool.report_failure(endpoints[0])
+    assert {pool.select().server_ip for _ in range(4)} == {"a", "b"}
+    pool.report_failure(endpoints[0])
+    assert {pool.select().server_ip for _ in range(4)} == {"b"}
+    time.sleep(0.1)
+    assert {pool.select().server_ip for _ in range(4)} == {"a", "b"}
+
+
+def test_slow_endpoint():
+    endpoints = [Endpoint("a", 1), Endpoint("b", 1)]
+    pool = EndpointPool(endpoints, max_failures=1, slow_threshold=1)
+    pool.report_success(endpoints[0], 2)
+    assert endpoints[0].errors == 1
+    assert {pool.select().server_ip for _ in range(4)} == {"b"}
+
+
+def test_all_endpoints_ejected():
+    endpoints = [Endpoint("a", 1), Endpoint("b", 1)]
+    pool = EndpointPool(endpoints, max_failures=1)
+    pool.report_failure(endpoints[1])
+    pool.report_failure(endpoints[0])
+    assert pool.select() is endpoints[1]
+
+
+def test_failover_to_healthy_endpoint(music_server):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    port = music_server.server_address[1]
+    policy = RetryPolicy(max_attempts=2, backoff_base=0.01)
+    # 第一个节点没有服务监听
+    with _create_client(f"127.0.0.1:1,127.0.0.1:{port}", retry_policy=policy) as client:
+        assert (client.server_ip, client.server_port) == ("127.0.0.1", 1)
+        for _ in range(4):
+            result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+            assert result.request.error_code == 0
+
+        bad, good = client.get_endpoints()
+        assert bad.errors >= 1
+        assert good.errors == 0
+    assert music_server.request_count == 4
+
+
+def test_load_config_servers(music_server):
+    port = music_server.server_address[1]
+    config = {
+        "auth": {"user": "user", "password": "password"},
+        "server": {
+            "music_servers": [f"127.0.0.1:{port}", "127.0.0.2"],
+            "music_port": 8008,
+            "music_connTimeout": 1,
+            "music_readTimeout": 3,
+            "music_ServiceId": "NMIC_MUSIC_CMADAAS",
+            "music_loadBalance": "least_latency",
+        }
+    }
+    with CMADaaSClient(config=config) as client:
+        assert (client.server_ip, client.server_port) == ("127.0.0.1", port)
+        assert [(e.server_ip, e.server_port) for e in client.get_endpoints()] == [
+            ("127.0.0.1", port), ("127.0.0.2", 8008)
+        ]
+        assert client._endpoint_pool.strategy == "least_latency"
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+
+def _get_loaded_modules(statement: str) -> set:
+    process = subprocess.run(
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(process.stdout.split())
+
+
+def test_import_package():
+    modules = _get_loaded_modules("import nuwe_cmadaas")
+    assert "pandas" not in modules
+    assert "xarray" not in modules
+
+
+def test_import_client():
+    modules = _get_loaded_modules("from nuwe_cmadaas import CMADaaSClient")
+    assert "nuwe_cmadaas.music.client" in modules
+    assert "pandas" not in modules
+    assert "xarray" not in modules
+
+
+def test_lazy_attributes():
+    import nuwe_cmadaas
+    from nuwe_cmadaas import obs
+
+    assert "retrieve_obs_station" in dir(obs)
+    assert nuwe_cmadaas.CMADaaSClient is nuwe_cmadaas.music.CMADaaSClient
@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import yaml
+
+from nuwe_cmadaas.music import get_shared_client, clear_shared_clients, get_or_create_client
+from nuwe_cmadaas.obs import retrieve_obs_station
+from tests.conftest import array_2d_content
+
+
+def _create_config(server) -> dict:
+    return {
+        "auth": {"user": "user", "password": "password"},
+        "server": {
+            "music_server": server.server_address[0],
+            "music_port": server.server_address[1],
+            "music_connTimeout": 3,
+            "music_readTimeout": 3,
+            "music_ServiceId": "NMIC_MUSIC_CMADAAS",
+        },
+    }
+
+
+def test_shared_client_from_file(music_server, tmp_path):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    config_path = tmp_path / "cedarkit.yaml"
+    config_path.write_text(yaml.safe_dump({"cmadaas": _create_config(music_server)}))
+
+    try:
+        client = get_shared_client(config_path)
+        assert get_shared_client(str(config_path)) is client
+        assert get_or_create_client(config_path) is client
+
+        for _ in range(3):
+            table = retrieve_obs_station(
+                "SURF_CHN_MUL_HOR",
+                elements="Station_Id_d,Lat",
+                time=pd.Timestamp("2024-01-01 00:00"),
+                config=config_path,
+            )
+            assert table.shape == (1, 2)
+        assert len(music_server.client_ports) == 1
+
+        stat = config_path.stat()
+        os.utime(config_path, (stat.st_atime, stat.st_mtime + 10))
+        assert get_shared_client(config_path) is not client
+    finally:
+        clear_shared_clients()
+
+
+def test_shared_client_from_config(music_server):
+    try:
+        client = get_shared_client(_create_config(music_server))
+        assert get_shared_client(_create_config(music_server)) is client
+
+        config = _create_config(music_server)
+        config["server"]["music_poolSize"] = 2
+        assert get_shared_client(config) is not client
+    finally:
+        clear_shared_clients()
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from nuwe_cmadaas.music import ResultCache
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.model import retrieve_model_grid
+from nuwe_cmadaas.obs import retrieve_obs_station
+from tests.conftest import array_2d_content
+
+
+def test_result_cache_eviction():
+    cache = ResultCache(max_size=2000)
+    frames = [pd.DataFrame({"a": np.arange(100, dtype=np.float64)}) for _ in range(3)]
+    for index, df in enumerate(frames[:2]):
+        cache.put(index, df)
+    assert cache.get(0) is not None
+
+    cache.put(2, frames[2])
+    assert len(cache) == 2
+    assert cache.get(1) is None
+    assert cache.get(0) is not None
+    assert cache.size <= cache.max_size
+    assert cache.stats.evictions == 1
+
+    cache.put(3, pd.DataFrame({"a": np.arange(1000, dtype=np.float64)}))
+    assert cache.get(3) is None
+
+
+def test_result_cache_immutable():
+    cache = ResultCache(max_size=1 << 20)
+
+    field = xr.DataArray(np.zeros((2, 2)), coords={"lat": [0, 1], "lon": [0, 1]}, dims=["lat", "lon"])
+    result = cache.put("field", field)
+    with pytest.raises(ValueError):
+        result.values[0, 0] = 1
+    result.attrs["name"] = "changed"
+    assert "name" not in cache.get("field").attrs
+    result = result.copy()
+    result.values[0, 0] = 1
+    assert cache.get("field").values[0, 0] == 0
+
+    result = cache.put("df", pd.DataFrame({"a": [1.0, 2.0]}))
+    result.loc[0, "a"] = 10
+    result["b"] = 1
+    assert cache.get("df")["a"].tolist() == [1.0, 2.0]
+    assert cache.get("df").columns.tolist() == ["a"]
+
+
+def test_result_cache_thread_safe():
+    cache = ResultCache(max_size=50 * 1000)
+
+    def run(start: int):
+        for i in range(200):
+            key = (start + i) % 300
+            if cache.get(key) is None:
+                cache.put(key, pd.DataFrame({"a": np.arange(100, dtype=np.float64)}))
+
+    threads = [threading.Thread(target=run, args=(i * 50,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.size <= cache.max_size
+    assert cache.size == sum(nbytes for _, nbytes in cache._entries.values())
+
+
+STATION_ROWS = [("54511", "39.8"), ("54527", "39.1")]
+
+
+def _grid_content() -> bytes:
+    ret = pb.RetGridArray2D()
+    ret.request.rowCount = 2
+    ret.latCount = 2
+    ret.lonCount = 2
+    ret.lats.extend([30, 31])
+    ret.lons.extend([110, 111])
+    ret.data.extend([1, 2, 3, 4])
+    return ret.SerializeToString()
+
+
+def test_retrieve_with_result_cache(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content(STATION_ROWS)
+    with create_client(result_cache_size=1 << 20) as client:
+        kwargs = dict(elements="Station_Id_d,Lat", time=pd.Timestamp("2024-01-01 00:00"), client=client)
+        first = retrieve_obs_station("SURF_CHN_MUL_HOR", **kwargs)
+        second = retrieve_obs_station("SURF_CHN_MUL_HOR", **kwargs)
+        pd.testing.assert_frame_equal(first, second)
+        assert music_server.request_count == 1
+
+        retrieve_obs_station("SURF_CHN_MUL_HOR", use_cache=False, **kwargs)
+        retrieve_obs_station("SURF_CHN_MUL_HOR", station="54511", **kwargs)
+        assert music_server.request_count == 3
+
+        music_server.responses["/music-ws/api"] = _grid_content()
+        kwargs = dict(
+            start_time=pd.Timestamp("2024-01-01"), forecast_time="24h", level_type="pl", level=850, client=client,
+        )
+        for _ in range(2):
+            field = retrieve_model_grid("NAFP_FOR_FTM_HIGH_EC_GLB", "TEM", **kwargs)
+            assert field.dtype == np.float64
+        assert music_server.request_count == 4
+
+        field = retrieve_model_grid("NAFP_FOR_FTM_HIGH_EC_GLB", "TEM", dtype="float32", **kwargs)
+        assert field.dtype == np.float32
+        assert music_server.request_count == 5
+        assert client.result_cache.stats.hits == 2
+
+
+def test_retrieve_latest_time_skip_result_cache(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content(STATION_ROWS)
+    with create_client(result_cache_size=1 << 20) as client:
+        for _ in range(2):
+            table = retrieve_obs_station("SURF_CHN_MUL_HOR", time=pd.Timedelta(hours=1), client=client)
+            assert len(table) == 2
+        assert music_server.request_count == 2
+        assert len(client.result_cache) == 0
+        assert "getSurfLatestTime" in music_server.request_paths[0]
@@ -0,0 +1,111 @@
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from nuwe_cmadaas.music import CMADaaSClient, Array2D, RetryPolicy
+from nuwe_cmadaas.music.connection import Connection
+from nuwe_cmadaas.music.retry import RequestOutcome
+from tests.conftest import array_2d_content
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=0)
+    assert [policy.get_backoff(i) for i in range(1, 5)] == [1, 2, 4, 5]
+
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=0.5)
+    for _ in range(100):
+        assert 1 <= policy.get_backoff(2) <= 2
+
+
+def test_retry_policy_should_retry():
+    policy = RetryPolicy(max_attempts=3, retry_gateway_errors=False)
+    outcome = RequestOutcome()
+    outcome.error_code = Connection.otherError
+    assert policy.should_retry(outcome, 1)
+    assert not policy.should_retry(outcome, 3)
+
+    outcome.error_code = 0
+    assert not policy.should_retry(outcome, 1)
+
+    outcome.error_code = -1004
+    outcome.is_gateway_error = True
+    assert not policy.should_retry(outcome, 1)
+
+
+def test_retry_gateway_error(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    music_server.fail_count = 2
+    policy = RetryPolicy(max_attempts=3, backoff_base=0.01)
+    with create_client(retry_policy=policy) as client:
+        result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+        assert isinstance(result, Array2D)
+        assert result.request.error_code == 0
+        assert result.data.shape == (1, 2)
+
+        stats = client.retry_stats.to_dict()
+        assert stats["requests"] == 1
+        assert stats["attempts"] == 3
+        assert stats["retries"] == 2
+        assert stats["exhausted"] == 0
+        assert stats["error_codes"] == {-5001: 2}
+
+    # 每次重试重新签名
+    queries = [parse_qs(urlsplit(path).query) for path in music_server.request_paths]
+    assert len({q["nonce"][0] for q in queries}) == 3
+    assert len({q["sign"][0] for q in queries}) == 3
+
+
+def test_retry_exhausted(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    music_server.fail_count = 5
+    policy = RetryPolicy(max_attempts=2, backoff_base=0.01)
+    with create_client(retry_policy=policy) as client:
+        result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+        assert result.request.error_code == -5001
+        assert result.request.error_message == "Server Busy"
+        assert client.retry_stats.exhausted == 1
+    assert music_server.request_count == 2
+
+
+def test_no_retry_by_default(music_server, create_client):
+    music_server.fail_count = 1
+    with create_client() as client:
+        result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+        assert result.request.error_code == -5001
+        assert client.retry_stats.retries == 0
+    assert music_server.request_count == 1
+
+
+def test_retry_connection_error():
+    policy = RetryPolicy(max_attempts=3, backoff_base=0.01)
+    # 没有服务监听的端口
+    with CMADaaSClient(
+        server_ip="127.0.0.1",
+        server_port=1,
+        server_id="NMIC_MUSIC_CMADAAS",
+        connection_timeout=1,
+        read_timeout=1,
+        user="user",
+        password="password",
+        retry_policy=policy,
+    ) as client:
+        result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+        assert result.request.error_code == Connection.otherError
+        assert client.retry_stats.attempts == 3
+        assert client.retry_stats.error_codes[Connection.otherError] == 2
+
+
+def test_retry_download(music_server, tmp_path, create_client):
+    content = b"x" * 1000
+    music_server.responses["/data/a.bin"] = content
+    music_server.fail_count = 1
+    music_server.fail_response = b"not a valid json"
+
+    policy = RetryPolicy(max_attempts=2, backoff_base=0.01)
+    with create_client(retry_policy=policy) as client:
+        base_url = f"http://127.0.0.1:{music_server.server_address[1]}"
+        results = client._download_executor.download(
+            [(f"{base_url}/data/a.bin", tmp_path / "a.bin", len(content))]
+        )
+    assert results == [(0, None)]
+    assert (tmp_path / "a.bin").read_bytes() == content
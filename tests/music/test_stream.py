@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import Array2D, Array2DBatchReader, AsyncCMADaaSClient
+from tests.conftest import array_2d_content
+
+
+ELEMENT_NAMES = ["Station_Id_d", "Lat", "Lon", "Year", "Hour", "TEM"]
+
+
+def _array_2d_content(row_count: int) -> bytes:
+    rows = [
+        (f"{54000 + i}", "39.8", "116.4", "2024", f"{i % 24}", f"{i % 300 / 10}" * (1 + i % 30))
+        for i in range(row_count)
+    ]
+    return array_2d_content(rows, ELEMENT_NAMES)
+
+
+def _read_batches(reader: Array2DBatchReader, content: bytes, chunk_size: int):
+    batches = []
+    for start in range(0, len(content), chunk_size):
+        batches.extend(reader.feed(content[start:start + chunk_size]))
+    batches.extend(reader.close())
+    return batches
+
+
+@pytest.mark.parametrize("chunk_size", [1, 13, 4096, 1 << 20])
+def test_batch_reader(chunk_size):
+    content = _array_2d_content(1000)
+    expected = Array2D.create_from_protobuf(content).to_pandas()
+
+    reader = Array2DBatchReader(ELEMENT_NAMES, batch_size=300)
+    batches = _read_batches(reader, content, chunk_size)
+
+    assert [len(batch) for batch in batches] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), expected)
+    assert batches[0]["Year"].dtype == np.int32
+    assert reader.row_count == 1000
+    assert reader.request.row_count == 1000
+
+
+def test_batch_reader_records():
+    content = _array_2d_content(10)
+    reader = Array2DBatchReader(ELEMENT_NAMES, batch_size=4, output="records")
+    batches = _read_batches(reader, content, 100)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert batches[0].Station_Id_d[0] == "54000"
+    assert batches[2].Hour[1] == 9
+
+
+def test_batch_reader_without_element_names():
+    content = _array_2d_content(10)
+    reader = Array2DBatchReader(batch_size=4)
+    batches = []
+    for start in range(0, len(content), 50):
+        assert reader.feed(content[start:start + 50]) == []
+    batches.extend(reader.close())
+    assert reader.element_names == ELEMENT_NAMES
+    assert sum(len(batch) for batch in batches) == 10
+
+
+def test_batch_reader_errors():
+    content = _array_2d_content(10)
+
+    reader = Array2DBatchReader(ELEMENT_NAMES[:-1], batch_size=4)
+    with pytest.raises(ValueError):
+        _read_batches(reader, content, 100)
+
+    reader = Array2DBatchReader(ELEMENT_NAMES, batch_size=4)
+    reader.feed(content[:-3])
+    with pytest.raises(ValueError):
+        reader.close()
+
+
+def test_call_api_to_array2d_batches(music_server, create_client):
+    content = _array_2d_content(1000)
+    music_server.responses["/music-ws/api"] = content
+    params = {"dataCode": "SURF_CHN_MUL_HOR", "elements": ",".join(ELEMENT_NAMES)}
+
+    with create_client() as client:
+        batches = client.callAPI_to_array2D_batches("getSurfEleByTime", params, batch_size=400)
+        assert music_server.request_count == 0
+        df = pd.concat(list(batches), ignore_index=True)
+        assert batches.request.error_code == 0
+        assert batches.request.row_count == 1000
+        assert "method=callAPI_to_array2D&" in music_server.request_paths[0]
+        pd.testing.assert_frame_equal(df, Array2D.create_from_protobuf(content).to_pandas())
+
+        music_server.fail_count = 1
+        batches = client.callAPI_to_array2D_batches("getSurfEleByTime", params)
+        assert list(batches) == []
+        assert batches.request.error_code == -5001
+
+    async def run():
+        async with create_client(AsyncCMADaaSClient) as async_client:
+            batches = async_client.callAPI_to_array2D_batches("getSurfEleByTime", params, batch_size=400)
+            return [batch async for batch in batches], batches.request
+
+    async_batches, request = asyncio.run(run())
+    assert [len(batch) for batch in async_batches] == [400, 400, 200]
+    assert request.error_code == 0
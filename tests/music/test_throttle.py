@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nuwe_cmadaas.music.throttle import TokenBucket, ConcurrencyLimit
+from tests.conftest import array_2d_content
+
+
+def _unique_server_id() -> str:
+    # 限速对象在进程内按服务共享，每个测试使用不同的服务 id
+    return f"TEST_{uuid.uuid4().hex}"
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[0] == 0
+    assert delays[1] == 0
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_concurrency_limit_wakes_coroutine_from_thread():
+    limit = ConcurrencyLimit(1)
+    limit.acquire()
+
+    async def run():
+        waiter = asyncio.ensure_future(limit.acquire_async())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        # 线程释放许可后直接唤醒等待的协程
+        threading.Thread(target=limit.release).start()
+        await asyncio.wait_for(waiter, timeout=1)
+        limit.release()
+
+    asyncio.run(run())
+    limit.acquire()
+    limit.release()
+
+
+def test_concurrency_limit_cancelled_waiter():
+    limit = ConcurrencyLimit(1)
+
+    async def run():
+        await limit.acquire_async()
+        waiter = asyncio.ensure_future(limit.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limit.release()
+        # 取消的协程不占用许可
+        await asyncio.wait_for(limit.acquire_async(), timeout=1)
+        limit.release()
+
+    asyncio.run(run())
+
+
+def test_rate_limit(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    with create_client(server_id=_unique_server_id(), rate_limit=20, rate_burst=1) as client:
+        start_time = time.perf_counter()
+        for _ in range(5):
+            result = client.callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+            assert result.request.error_code == 0
+        elapsed_time = time.perf_counter() - start_time
+        assert client.get_throttle().requests == 5
+    assert elapsed_time >= 0.19
+
+
+def test_max_concurrency_shared_by_clients(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content()
+    music_server.delay = 0.05
+    server_id = _unique_server_id()
+    clients = [create_client(server_id=server_id, max_concurrency=2) for _ in range(2)]
+    assert clients[0].get_throttle() is clients[1].get_throttle()
+
+    def fetch(index):
+        return clients[index % 2].callAPI_to_array2D("getSurfEleByTime", {"dataCode": "SURF_CHN_MUL_HOR"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(fetch, range(16)))
+
+    for client in clients:
+        client.close()
+    assert all(result.request.error_code == 0 for result in results)
+    assert music_server.request_count == 16
+    assert music_server.max_active_count <= 2
+
+
+def test_no_throttle_by_default(create_client):
+    with create_client(server_id=_unique_server_id()) as client:
+        assert client.get_throttle() is None
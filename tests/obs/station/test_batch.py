@@ -0,0 +1,164 @@
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import apiinterface_pb2 as pb
+from nuwe_cmadaas.music.batch import split_list_params, call_array2D_batch, MAX_LIST_PARAM_LENGTH
+from nuwe_cmadaas.music.retry import RetryPolicy
+from nuwe_cmadaas.obs import retrieve_obs_station
+from nuwe_cmadaas.util import split_time_interval
+from tests.conftest import array_2d_content
+
+
+def _get_query(path: str) -> dict:
+    return {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+
+
+def _array_2d_factory(path: str) -> bytes:
+    """
+    每个站点返回一行，时间为请求时间段的起始时间
+    """
+    query = _get_query(path)
+    station_ids = query["staIds"].split(",") if "staIds" in query else ["54511"]
+    time = query.get("timeRange", "[20240101000000,")[1:15]
+    rows = [[station_id, time, "1.5"] for station_id in station_ids]
+    return array_2d_content(rows, ["Station_Id_d", "Datetime", "TEM"])
+
+
+@pytest.mark.parametrize("closed", ["both", "left", "right", "neither"])
+def test_split_time_interval(closed):
+    interval = pd.Interval(pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-03 12:00"), closed=closed)
+    shards = split_time_interval(interval, "1D")
+
+    assert [shard.left for shard in shards] == list(pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]))
+    assert shards[-1].right == interval.right
+    assert shards[0].closed_left == interval.closed_left
+    assert shards[-1].closed_right == interval.closed_right
+
+    # 每个整点时刻只属于一个时间段
+    for time in pd.date_range(interval.left, interval.right, freq="1h"):
+        assert sum(time in shard for shard in shards) == int(time in interval)
+
+    assert split_time_interval(interval, "3D") == [interval]
+
+
+def test_split_list_params():
+    station_ids = [f"{i:05d}" for i in range(1000)]
+    params = {"dataCode": "SURF_CHN_MUL_HOR", "staIds": ",".join(station_ids)}
+    params_list = split_list_params(params)
+
+    assert len(params_list) > 1
+    assert all(len(p["staIds"]) <= MAX_LIST_PARAM_LENGTH for p in params_list)
+    assert ",".join(p["staIds"] for p in params_list) == params["staIds"]
+    assert split_list_params({"staIds": "54511"}) == [{"staIds": "54511"}]
+
+
+def test_retrieve_obs_station_time_shard(music_server, create_client):
+    music_server.response_factory = _array_2d_factory
+    music_server.delay = 0.05
+
+    with create_client() as client:
+        table = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,Datetime,TEM",
+            time=pd.Interval(pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-04 00:00"), closed="both"),
+            time_shard="1D",
+            client=client,
+        )
+
+    assert music_server.request_count == 3
+    assert music_server.max_active_count > 1
+    time_ranges = sorted(_get_query(path)["timeRange"] for path in music_server.request_paths)
+    assert time_ranges == [
+        "[20240101000000,20240102000000)",
+        "[20240102000000,20240103000000)",
+        "[20240103000000,20240104000000[",
+    ]
+    assert list(table.columns) == ["Station_Id_d", "Datetime", "TEM"]
+    assert list(table["Datetime"]) == ["20240101000000", "20240102000000", "20240103000000"]
+
+
+def test_retrieve_obs_station_no_time_shard_by_default(music_server, create_client):
+    music_server.response_factory = _array_2d_factory
+
+    with create_client() as client:
+        retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,Datetime,TEM",
+            time=pd.Interval(pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-04 00:00"), closed="both"),
+            client=client,
+        )
+
+    assert music_server.request_count == 1
+
+
+def test_retrieve_obs_station_station_chunks(music_server, create_client):
+    music_server.response_factory = _array_2d_factory
+    station_ids = [f"{50000 + i}" for i in range(1000)]
+
+    with create_client() as client:
+        table = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,Datetime,TEM",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            station=station_ids,
+            client=client,
+        )
+
+    assert music_server.request_count > 1
+    assert all(len(path) < 4096 for path in music_server.request_paths)
+    assert list(table.columns) == ["Station_Id_d", "Datetime", "TEM"]
+    assert list(table["Station_Id_d"]) == station_ids
+    assert table["TEM"].dtype.kind == "f"
+
+
+def test_call_array2D_batch_retry(music_server, create_client):
+    lock = threading.Lock()
+    failed = set()
+
+    def factory(path: str) -> bytes:
+        query = _get_query(path)
+        with lock:
+            if query["staIds"] == "54527" and "54527" not in failed:
+                failed.add("54527")
+                raise ConnectionError("shard error")
+        return _array_2d_factory(path)
+
+    music_server.response_factory = factory
+    params_list = [{"dataCode": "SURF_CHN_MUL_HOR", "staIds": station_id} for station_id in ["54511", "54527", "54534"]]
+
+    retry_policy = RetryPolicy(max_attempts=3, backoff_base=0.01)
+    with create_client(retry_policy=retry_policy) as client:
+        result = call_array2D_batch(client, "getSurfEleByTimeAndStaID", params_list)
+
+    assert result.request.error_code == 0
+    assert list(result.to_pandas()["Station_Id_d"]) == ["54511", "54527", "54534"]
+    assert music_server.request_count == 4
+
+
+def _no_record_content() -> bytes:
+    ret = pb.RetArray2D()
+    ret.request.errorCode = -1
+    ret.request.errorMessage = "query success , but no record in database"
+    return ret.SerializeToString()
+
+
+def test_call_array2D_batch_empty_shard(music_server, create_client):
+    def factory(path: str) -> bytes:
+        if _get_query(path)["staIds"] == "54527":
+            return _no_record_content()
+        return _array_2d_factory(path)
+
+    music_server.response_factory = factory
+    params_list = [{"dataCode": "SURF_CHN_MUL_HOR", "staIds": station_id} for station_id in ["54511", "54527", "54534"]]
+
+    with create_client() as client:
+        result = call_array2D_batch(client, "getSurfEleByTimeAndStaID", params_list)
+        assert result.request.error_code == 0
+        assert list(result.to_pandas()["Station_Id_d"]) == ["54511", "54534"]
+
+        music_server.response_factory = lambda path: _no_record_content()
+        result = call_array2D_batch(client, "getSurfEleByTimeAndStaID", params_list)
+        assert result.request.error_code == -1
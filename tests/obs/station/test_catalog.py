@@ -0,0 +1,165 @@
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nuwe_cmadaas.music import MusicError
+from nuwe_cmadaas.obs import StationCatalog, load_station_catalog, retrieve_obs_station
+from tests.conftest import array_2d_content
+
+
+def _create_table(count: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Station_Id_C": [f"{i:05d}" for i in range(count)],
+        "Lat": rng.uniform(18, 53, count).round(4),
+        "Lon": rng.uniform(73, 135, count).round(4),
+    })
+
+
+def _get_distance(table: pd.DataFrame, lat: float, lon: float) -> np.ndarray:
+    lat1, lon1 = np.deg2rad(lat), np.deg2rad(lon)
+    lat2, lon2 = np.deg2rad(table["Lat"].to_numpy()), np.deg2rad(table["Lon"].to_numpy())
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+@pytest.mark.parametrize("use_tree", [True, False])
+def test_station_catalog_query(use_tree):
+    table = _create_table()
+    catalog = StationCatalog(table)
+    if not use_tree:
+        catalog._tree = None
+    distance = _get_distance(table, 39.8, 116.4)
+
+    nearest = catalog.nearest(39.8, 116.4, k=5)
+    assert list(nearest["Station_Id_C"]) == list(table["Station_Id_C"].iloc[np.argsort(distance)[:5]])
+    np.testing.assert_allclose(nearest["distance"], np.sort(distance)[:5])
+
+    within = catalog.within_radius(39.8, 116.4, 300)
+    assert set(within["Station_Id_C"]) == set(table["Station_Id_C"][distance <= 300])
+    assert within["distance"].is_monotonic_increasing
+
+    rect = catalog.select({
+        "type": "rect",
+        "start_latitude": 42,
+        "end_latitude": 39,
+        "start_longitude": 115,
+        "end_longitude": 117,
+    })
+    expected = table[table["Lat"].between(39, 42) & table["Lon"].between(115, 117)]
+    assert list(rect["Station_Id_C"]) == list(expected["Station_Id_C"])
+
+
+@pytest.mark.parametrize("use_tree", [True, False])
+def test_station_catalog_nearest_edge_cases(use_tree):
+    catalog = StationCatalog(_create_table(10))
+    empty_catalog = StationCatalog(_create_table(0))
+    if not use_tree:
+        catalog._tree = None
+        empty_catalog._tree = None
+
+    for k in (0, -1):
+        with pytest.raises(ValueError):
+            catalog.nearest(30, 110, k=k)
+
+    assert len(catalog.nearest(30, 110, k=20)) == 10
+
+    nearest = empty_catalog.nearest(30, 110)
+    assert len(nearest) == 0
+    assert "distance" in nearest.columns
+
+
+def _station_info_content() -> bytes:
+    rows = [["00631", "39.8", "116.4"], ["54527", "39.1", "117.2"], ["58367", "31.4", "121.5"]]
+    return array_2d_content(rows, ["Station_Id_C", "Lat", "Lon"])
+
+
+def test_load_station_catalog(music_server, tmp_path, create_client):
+    music_server.responses["/music-ws/api"] = _station_info_content()
+
+    with create_client() as client:
+        catalog = load_station_catalog(tmp_path, elements="Station_Id_C,Lat,Lon", client=client)
+        assert catalog.station_ids == ["00631", "54527", "58367"]
+
+        catalog = load_station_catalog(tmp_path, elements="Station_Id_C,Lat,Lon", client=client)
+        assert catalog.station_ids == ["00631", "54527", "58367"]
+        assert music_server.request_count == 1
+
+        music_server.fail_count = 1
+        catalog = load_station_catalog(tmp_path, ttl=0, elements="Station_Id_C,Lat,Lon", client=client)
+        assert len(catalog) == 3
+        assert music_server.request_count == 2
+
+        music_server.fail_count = 1
+        result = load_station_catalog(tmp_path / "empty", elements="Station_Id_C,Lat,Lon", client=client)
+        assert isinstance(result, MusicError)
+
+
+def test_retrieve_obs_station_with_catalog(music_server, create_client):
+    def factory(path: str) -> bytes:
+        query = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+        station_ids = query["staIds"].split(",")
+        return array_2d_content([[station_id, "1.5"] for station_id in station_ids], ["Station_Id_d", "TEM"])
+
+    music_server.response_factory = factory
+    catalog = StationCatalog(pd.DataFrame({
+        "Station_Id_C": ["54511", "54527", "58367"],
+        "Lat": [39.8, 39.1, 31.4],
+        "Lon": [116.5, 117.2, 121.5],
+    }))
+
+    with create_client() as client:
+        table = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,TEM",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            region={"type": "circle", "latitude": 39.5, "longitude": 117.0, "radius": 100},
+            catalog=catalog,
+            client=client,
+        )
+
+    assert "getSurfEleByTimeAndStaID" in music_server.request_paths[0]
+    assert list(table["Station_Id_d"]) == ["54527", "54511"]
+
+
+def test_retrieve_obs_station_with_catalog_server_region(music_server, create_client):
+    music_server.responses["/music-ws/api"] = _station_info_content()
+    catalog = StationCatalog(pd.DataFrame({
+        "Station_Id_C": ["54511"],
+        "Lat": [39.8],
+        "Lon": [116.5],
+    }))
+
+    with create_client() as client:
+        table = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_C,Lat,Lon",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            region={"type": "region", "admin_codes": "110000"},
+            catalog=catalog,
+            client=client,
+        )
+
+    assert "getSurfEleInRegionByTime" in music_server.request_paths[0]
+    assert "adminCodes=110000" in music_server.request_paths[0]
+    assert len(table) == 3
+
+
+def test_retrieve_obs_station_with_catalog_no_station(music_server, create_client):
+    catalog = StationCatalog(_create_table(10))
+
+    with create_client() as client:
+        result = retrieve_obs_station(
+            "SURF_CHN_MUL_HOR",
+            elements="Station_Id_d,TEM",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            region={"type": "circle", "latitude": -60, "longitude": 0, "radius": 100},
+            catalog=catalog,
+            client=client,
+        )
+
+    assert isinstance(result, MusicError)
+    assert result.code == -1
+    assert music_server.request_count == 0
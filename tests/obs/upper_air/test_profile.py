@@ -0,0 +1,111 @@
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from nuwe_cmadaas.obs import build_profile_cube, retrieve_obs_upper_air
+from tests.conftest import array_2d_content
+
+
+ELEMENTS = ["Station_Id_d", "Lat", "Lon", "Year", "Mon", "Day", "Hour", "PRS_HWC", "TEM", "GPH"]
+
+ROWS = [
+    ["54511", "39.8", "116.5", "2024", "1", "1", "0", "850", "-5.5", "1500"],
+    ["54511", "39.8", "116.5", "2024", "1", "1", "0", "500", "-20.1", "5600"],
+    ["54511", "39.8", "116.5", "2024", "1", "1", "12", "850", "-4.5", "1510"],
+    ["50953", "45.8", "126.8", "2024", "1", "1", "0", "850", "-15.2", "1450"],
+    ["50953", "45.8", "126.8", "2024", "1", "1", "12", "700", "-18.0", "2900"],
+]
+
+
+def test_build_profile_cube():
+    table = pd.DataFrame(ROWS, columns=ELEMENTS)
+    for name in ["Year", "Mon", "Day", "Hour"]:
+        table[name] = table[name].astype(np.int32)
+    for name in ["Lat", "Lon", "PRS_HWC", "TEM", "GPH"]:
+        table[name] = table[name].astype(np.float64)
+
+    cube = build_profile_cube(table)
+
+    assert dict(cube.sizes) == {"time": 2, "station": 2, "level": 3}
+    assert list(cube.station.values) == ["50953", "54511"]
+    assert list(cube.level.values) == [850, 700, 500]
+    assert list(cube.time.values) == list(pd.to_datetime(["2024-01-01 00:00", "2024-01-01 12:00"]))
+    assert set(cube.data_vars) == {"TEM", "GPH"}
+    assert cube.TEM.dtype == np.float32
+    assert cube.TEM.sel(time="2024-01-01 00:00", station="54511", level=500).item() == np.float32(-20.1)
+    assert np.isnan(cube.TEM.sel(time="2024-01-01 12:00", station="54511", level=500).item())
+    assert int(cube.TEM.notnull().sum()) == len(ROWS)
+    np.testing.assert_allclose(cube.Lat.values, [45.8, 39.8])
+
+
+def test_retrieve_obs_upper_air_xarray(music_server, create_client):
+    music_server.responses["/music-ws/api"] = array_2d_content(ROWS, ELEMENTS)
+
+    with create_client() as client:
+        cube = retrieve_obs_upper_air(
+            "UPAR_CHN_MUL_FTM",
+            elements="Station_Id_d,Lat,Lon,Day,Hour,PRS_HWC,TEM,GPH",
+            time=pd.Timestamp("2024-01-01 00:00"),
+            output="xarray",
+            client=client,
+        )
+
+    assert isinstance(cube, xr.Dataset)
+    assert cube.TEM.dims == ("time", "station", "level")
+    elements = parse_qs(urlsplit(music_server.request_paths[0]).query)["elements"][0]
+    assert elements.split(",")[-2:] == ["Year", "Mon"]
+
+
+def test_retrieve_obs_upper_air_parse_time(music_server, create_client):
+    time_values = {"Year": "2024", "Mon": "1", "Day": "1", "Hour": "12", "Min": "0"}
+
+    def factory(path: str) -> bytes:
+        # 按请求的要素返回一行数据
+        element_names = parse_qs(urlsplit(path).query)["elements"][0].split(",")
+        return array_2d_content([[time_values.get(name, "1") for name in element_names]], element_names)
+
+    music_server.response_factory = factory
+
+    # 默认要素只有 Day、Hour 和 Min，自动补充 Year 和 Mon
+    with create_client() as client:
+        table = retrieve_obs_upper_air(
+            "UPAR_GLB_MUL_FTM",
+            time=pd.Timestamp("2024-01-01 12:00"),
+            parse_time=True,
+            client=client,
+        )
+
+    assert table["Datetime"].tolist() == [pd.Timestamp("2024-01-01 12:00")]
+    elements = parse_qs(urlsplit(music_server.request_paths[0]).query)["elements"][0]
+    assert elements.split(",")[-2:] == ["Year", "Mon"]
+
+
+def test_parse_time_without_time_elements(caplog):
+    from nuwe_cmadaas.music import Array2D
+
+    content = array_2d_content([["54511", "-5.5"]], ["Station_Id_d", "TEM"])
+
+    with caplog.at_level("WARNING"):
+        df = Array2D.create_from_protobuf(content).to_pandas(parse_time=True)
+
+    assert "Datetime" not in df.columns
+    assert "parse_time is ignored" in caplog.text
+
+
+def test_assemble_datetime():
+    from nuwe_cmadaas.music.element import assemble_datetime
+
+    times = assemble_datetime(
+        np.array([2024, 2024, 2023, 999999]),
+        np.array([2, 2, 12, 1]),
+        np.array([29, 30, 31, 1]),
+        np.array([23, 0, 6, 0]),
+        np.array([30, 0, 0, 0]),
+    )
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert times[0] == np.datetime64("2024-02-29T23:30")
+    assert np.isnat(times[1])
+    assert times[2] == np.datetime64("2023-12-31T06:00")
+    assert np.isnat(times[3])